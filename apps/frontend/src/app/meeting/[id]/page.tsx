@@ -29,6 +29,7 @@ export default function MeetingPage({ params }: MeetingPageProps) {
     
     const [meetingTitle, setMeetingTitle] = useState<string | null>(null);
     const [transcripts, setTranscripts] = useState<TranscriptMessage[]>([]);
+    const [partialText, setPartialText] = useState<string>("");
     const [copied, setCopied] = useState(false);
     const [transcriptMode, setTranscriptMode] = useState<"interview" | "paragraph">("interview");
     const [copiedLink, setCopiedLink] = useState(false);
@@ -39,7 +40,7 @@ export default function MeetingPage({ params }: MeetingPageProps) {
     const transcriptContainerRef = useRef<HTMLDivElement>(null);
 
 
-    const { status, lastMessage, sendBinary, canRecord, clientId, clients } = useWebSocket(id);
+    const { status, lastMessage, sendBinary, canRecord, clientId, clients, throttle, paused } = useWebSocket(id);
 
     useEffect(() => {
         async function checkMeeting() {
@@ -65,7 +66,10 @@ export default function MeetingPage({ params }: MeetingPageProps) {
             try {
                 const data = JSON.parse(lastMessage);
 
-                if (data.text) {
+                if (data.type === "partial") {
+                    setPartialText(data.text || "");
+                } else if (data.text) {
+                    setPartialText("");
                     const timestamp = new Date().toLocaleTimeString();
                     setTranscripts((prev) => [...prev, { text: data.text, timestamp }]);
 
@@ -290,6 +294,11 @@ export default function MeetingPage({ params }: MeetingPageProps) {
                                 {transcripts.map(t => t.text).join(" ")}
                             </div>
                         )}
+                        {partialText && (
+                            <div className="px-4 py-2 text-gray-500 italic leading-relaxed">
+                                {partialText}
+                            </div>
+                        )}
                     </div>
 
                     {/* Clear Transcript Button */}
@@ -372,7 +381,8 @@ export default function MeetingPage({ params }: MeetingPageProps) {
                     {/* Controls */}
                     <div className="flex flex-col items-center space-y-6">
                         {/* <MicrophoneButton /> */}
-                        <AudioChunkRecorder meetingId={id} status={status} sendBinary={sendBinary} canRecord={canRecord} />
+                        <AudioChunkRecorder meetingId={id} status={status} sendBinary={sendBinary} canRecord={canRecord}
+                            throttle={throttle} paused={paused} />
                         {/* <button
                         onClick={() => sendMessage({ type: "ping" })}
                         disabled={status !== "connected"}
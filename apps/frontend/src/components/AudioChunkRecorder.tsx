@@ -9,14 +9,30 @@ interface AudioChunkRecorderProps {
     status: "connecting" | "connected" | "disconnected";
     sendBinary: (data: ArrayBuffer) => void;
     canRecord?: boolean;
+    // ASR backlog from the server's throttle messages; audio is held back while paused
+    throttle?: string;
+    paused?: boolean;
 }
 
-export default function AudioChunkRecorder({ meetingId, status, sendBinary, canRecord = true }: AudioChunkRecorderProps) {
+export default function AudioChunkRecorder({ meetingId, status, sendBinary, canRecord = true, throttle = "ok", paused = false }: AudioChunkRecorderProps) {
     const [isRecording, setIsRecording] = useState(false);
     const audioContextRef = useRef<AudioContext | null>(null);
     const workletNodeRef = useRef<AudioWorkletNode | null>(null);
     const streamRef = useRef<MediaStream | null>(null);
     const isRecordingRef = useRef(false);
+    const pausedRef = useRef(paused);
+
+    useEffect(() => {
+        pausedRef.current = paused;
+        // Suspending the context stops capture until the ASR service catches up
+        const audioContext = audioContextRef.current;
+        if (!audioContext || audioContext.state === "closed") return;
+        if (paused) {
+            audioContext.suspend();
+        } else {
+            audioContext.resume();
+        }
+    }, [paused]);
 
     const startRecording = async () => {
 
@@ -48,7 +64,7 @@ export default function AudioChunkRecorder({ meetingId, status, sendBinary, canR
                 chunkCount++;
                 totalSamples += int16Array.length;
 
-                if (!isRecordingRef.current) return;
+                if (!isRecordingRef.current || pausedRef.current) return;
                 if (status === "connected") {
                     console.log("Sending audio chunk to server:", int16Array.length, "samples");
                     sendBinary(int16Array.buffer);
@@ -56,6 +72,9 @@ export default function AudioChunkRecorder({ meetingId, status, sendBinary, canR
             };
 
             source.connect(workletNode);
+            if (pausedRef.current) {
+                audioContext.suspend();
+            }
 
             audioContextRef.current = audioContext;
             workletNodeRef.current = workletNode;
@@ -116,9 +135,17 @@ export default function AudioChunkRecorder({ meetingId, status, sendBinary, canR
 
             <div className={`flex flex-col items-center transition-opacity duration-200 pointer-events-none"}`}>
                 <div className="relative z-10 h-12">
-                    <WaveformBars active={isRecording} className="h-8" />
+                    <WaveformBars active={isRecording && !paused} className="h-8" />
                 </div>
             </div>
+
+            <div
+                className={`text-[0.9rem] h-[1.2rem] text-center w-full transition-opacity duration-200 ${paused ? "text-red-600" : "text-yellow-600"} ${isRecording && throttle !== "ok" ? "opacity-100" : "opacity-0"}`}
+            >
+                {paused
+                    ? "Transcription is behind, recording paused"
+                    : throttle === "high" ? "Transcription is busy, it may lag" : ""}
+            </div>
         </div>
     );
 }
\ No newline at end of file
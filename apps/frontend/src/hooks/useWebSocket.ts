@@ -21,6 +21,10 @@ export function useWebSocket(meetingId: string) {
   const [clientCount, setClientCount] = useState<number>(0);
 
   const [latency, setLatency] = useState<number | null>(null);
+  // ASR backlog reported to the host: "ok", "high" or "critical"; while
+  // paused the host should stop sending audio
+  const [throttle, setThrottle] = useState<string>("ok");
+  const [paused, setPaused] = useState(false);
 
   const pingTimestamp = useRef<number | null>(null);
   const pongTimeout = useRef<NodeJS.Timeout | null>(null);
@@ -157,6 +161,11 @@ export function useWebSocket(meetingId: string) {
           if (msg.clientId) setClientId(msg.clientId);
         }
 
+        if (msg.type === "throttle") {
+          setThrottle(msg.level);
+          setPaused(Boolean(msg.paused));
+        }
+
         if (msg.type === "client_list") {
           setClients(msg.clients || []);
           setClientCount(msg.count || 0);
@@ -176,6 +185,9 @@ export function useWebSocket(meetingId: string) {
       
       if (!isCleaningUpRef.current) {
         setStatus("disconnected");
+        // A new connection starts unthrottled; the server resends any throttle
+        setThrottle("ok");
+        setPaused(false);
         clearAllTimers();
 
         // Only reconnect on unexpected closures
@@ -287,6 +299,8 @@ export function useWebSocket(meetingId: string) {
     sendMessage, 
     sendBinary, 
     latency, 
+    throttle,
+    paused,
     lastMessage, 
     canRecord,
     clientId,
@@ -1,7 +1,7 @@
-from datetime import datetime, timedelta, timezone
 import numpy as np
 import logging
-from typing import Optional
+from collections import deque
+from typing import Deque, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -10,68 +10,381 @@ try:
 except Exception:
     webrtcvad = None
 
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 320  # 20ms at 16kHz
+_FRAME_ONES = np.ones(FRAME_SAMPLES, dtype=np.float32)
+
+
+class PCMRingBuffer:
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        # Writes copy through a memoryview: a chunk is a few thousand samples,
+        # where numpy's per-call overhead costs more than the copy itself
+        self._view = memoryview(self._data)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, samples) -> None:
+        # Accepts int16 arrays or int16 memoryviews
+        n = len(samples)
+        if n == 0:
+            return
+        samples = memoryview(samples)
+        if n >= self.capacity:
+            self._view[:] = samples[n - self.capacity:]
+            self._start = 0
+            self._size = self.capacity
+            return
+
+        end = (self._start + self._size) % self.capacity
+        first = min(n, self.capacity - end)
+        self._view[end:end + first] = samples[:first]
+        if first < n:
+            self._view[:n - first] = samples[first:]
+
+        overflow = self._size + n - self.capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % self.capacity
+            self._size = self.capacity
+        else:
+            self._size += n
+
+    def views(self):
+        # At most two zero-copy slices, oldest first
+        end = self._start + self._size
+        if end <= self.capacity:
+            return (self._data[self._start:end],)
+        return (self._data[self._start:], self._data[:end - self.capacity])
+
+    def to_float32(self) -> np.ndarray:
+        out = np.empty(self._size, dtype=np.float32)
+        pos = 0
+        for view in self.views():
+            np.multiply(view, 1.0 / 32768.0, out=out[pos:pos + len(view)],
+                        casting="unsafe")
+            pos += len(view)
+        return out
+
+    def tobytes(self) -> bytes:
+        return b"".join(view.tobytes() for view in self.views())
+
+    def discard_oldest(self, n: int) -> None:
+        n = min(n, self._size)
+        self._start = (self._start + n) % self.capacity
+        self._size -= n
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+
+
+def speech_regions(mask: np.ndarray, offset: int, length: int, pad: int) -> List[Tuple[int, int]]:
+    # Converts per-frame speech flags into padded, merged sample ranges.
+    # `offset` is the phrase-relative sample where the first flagged frame starts.
+    if not mask.any():
+        return []
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * FRAME_SAMPLES + offset - pad
+    ends = np.flatnonzero(edges == -1) * FRAME_SAMPLES + offset + pad
+
+    regions: List[Tuple[int, int]] = []
+    for start, end in zip(np.clip(starts, 0, length).tolist(), np.clip(ends, 0, length).tolist()):
+        if end <= start:
+            continue
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def quietest_point(audio: np.ndarray, lo: int, hi: int, window: int = 400, hop: int = 160) -> int:
+    # Centre of the lowest-energy `window` in audio[lo:hi], scanned every `hop`
+    # samples. Window sums come from one cumulative sum, so the pass is O(n).
+    if hi - lo <= window:
+        return (lo + hi) // 2
+    squared = np.square(audio[lo:hi], dtype=np.float64)
+    cumulative = np.concatenate(([0.0], np.cumsum(squared)))
+    starts = np.arange(0, hi - lo - window + 1, hop)
+    energy = cumulative[starts + window] - cumulative[starts]
+    return lo + int(starts[np.argmin(energy)]) + window // 2
+
+
+class FrameVad:
+    # Classifies every 20ms frame on a sample clock that only advances with
+    # received audio. Frames whose RMS is under energy_threshold are marked
+    # silent without calling the (comparatively expensive) webrtcvad.
+
+    def __init__(self, vad: object, energy_threshold: float = 50.0, track_frames: int = 4096):
+        self.vad = vad
+        self.energy_threshold = energy_threshold
+        self.samples_seen = 0
+        self.frames_seen = 0
+        self.vad_calls = 0
+
+        self._min_energy = FRAME_SAMPLES * energy_threshold ** 2
+        # Scratch for the squared samples of a chunk, grown on demand
+        self._squared = np.empty(16 * FRAME_SAMPLES, dtype=np.float32)
+        # Bytes of a frame the last chunk started but did not finish
+        self._carry = b""
+        # One byte per frame, 1 for speech; a bytearray takes a chunk's list of
+        # flags without a numpy call
+        self._track = bytearray(track_frames)
+
+    def _classify(self, data: bytes, n_frames: int) -> List[bool]:
+        count = n_frames * FRAME_SAMPLES
+        if count > self._squared.size:
+            self._squared = np.empty(count, dtype=np.float32)
+        squared = self._squared[:count]
+        np.square(np.frombuffer(data, dtype=np.int16, count=count), out=squared, dtype=np.float32)
+        # Per-frame energy as one matrix-vector product, much cheaper per call
+        # than einsum or sum(axis=1) at this size
+        energy = np.matmul(squared.reshape(n_frames, FRAME_SAMPLES), _FRAME_ONES).tolist()
+        # A chunk holds a handful of frames; plain lists beat numpy calls here
+        min_energy = self._min_energy
+        loud = [i for i, e in enumerate(energy) if e >= min_energy]
+        self.vad_calls += len(loud)
+        flags = [False] * n_frames
+        is_speech = self.vad.is_speech
+        size = FRAME_SAMPLES * 2
+        for i in loud:
+            try:
+                flags[i] = bool(is_speech(data[i * size:(i + 1) * size], SAMPLE_RATE))
+            except Exception:
+                pass
+        return flags
+
+    def process(self, audio_bytes: bytes) -> Tuple[int, List[bool]]:
+        # Returns the index of the first frame completed by this chunk and
+        # one speech flag per completed frame
+        first_frame = self.frames_seen
+        self.samples_seen += len(audio_bytes) // 2
+        # Chunks rarely divide into frames; the carried-over partial frame is
+        # prepended so the whole chunk is classified in one pass
+        data = self._carry + audio_bytes
+        n_frames = len(data) // (FRAME_SAMPLES * 2)
+        self._carry = data[n_frames * FRAME_SAMPLES * 2:]
+        if not n_frames:
+            return first_frame, []
+        flags = self._classify(data, n_frames)
+
+        at = first_frame % len(self._track)
+        if at + n_frames <= len(self._track):
+            self._track[at:at + n_frames] = bytes(flags)
+        else:
+            head = len(self._track) - at
+            self._track[at:] = bytes(flags[:head])
+            self._track[:n_frames - head] = bytes(flags[head:])
+        self.frames_seen += n_frames
+        return first_frame, flags
+
+    def speech_mask(self, start_sample: int, end_sample: int) -> np.ndarray:
+        # Speech flags for the frames overlapping [start_sample, end_sample)
+        first = max(start_sample // FRAME_SAMPLES,
+                    self.frames_seen - len(self._track))
+        last = min(-(-end_sample // FRAME_SAMPLES), self.frames_seen)
+        if last <= first:
+            return np.zeros(0, dtype=bool)
+        track = np.frombuffer(self._track, dtype=bool)
+        return track[np.arange(first, last) % len(track)]
+
+    def reset(self):
+        self.samples_seen = 0
+        self.frames_seen = 0
+        self._carry = b""
+
+
 class MeetingAudioBuffer:
 
-    def __init__(self, meeting_id: str, phrase_timeout: float = 0.5, max_phrase_duration: float = 30.0, vad: Optional[object] = None):
+    def __init__(self, meeting_id: str, phrase_timeout: float = 0.5, max_phrase_duration: float = 30.0,
+                 vad: Optional[object] = None, energy_threshold: float = 50.0,
+                 trim_silence: bool = False, speech_pad: float = 0.2,
+                 soft_phrase_duration: Optional[float] = None, split_window: float = 2.0,
+                 split_overlap: float = 0.3):
         self.meeting_id = meeting_id
         self.max_phrase_duration = max_phrase_duration
         self.phrase_timeout = phrase_timeout
 
-        self.phrase_bytes = bytes()
-        self.last_audio_time = None
+        self.phrase_ring = PCMRingBuffer(
+            max(1, int(max_phrase_duration * SAMPLE_RATE)))
 
-        if vad is not None:
-            self.vad = vad
-        elif webrtcvad is not None:
-            self.vad = webrtcvad.Vad(3)
-        else:
-            class _StubVad:
-                def __init__(self, mode=3):
-                    pass
-                def is_speech(self, frame, sample_rate):
-                    return False
-            self.vad = _StubVad()
+        if vad is None:
+            if webrtcvad is not None:
+                vad = webrtcvad.Vad(3)
+            else:
+                class _StubVad:
+                    def __init__(self, mode=3):
+                        pass
+                    def is_speech(self, frame, sample_rate):
+                        return False
+                vad = _StubVad()
+        self.vad = vad
+        self.frame_vad = FrameVad(
+            vad, energy_threshold=energy_threshold,
+            track_frames=self.phrase_ring.capacity // FRAME_SAMPLES + 2)
+
+        # With trim_silence, completed phrases keep only the VAD speech regions
+        # (plus speech_pad either side) so the model can skip its own VAD pass
+        self.trim_silence = trim_silence
+        self._pad_samples = int(speech_pad * SAMPLE_RATE)
 
         self.min_audio_duration = 0.2
+        self._timeout_samples = int(phrase_timeout * SAMPLE_RATE)
+        self._min_samples = int(self.min_audio_duration * SAMPLE_RATE)
 
-        self.frame_buffer = bytes()
-        self.frame_size = 320 * 2  # 20ms at 16kHz, 2 bytes per sample
+        # Phrase boundaries are tracked as absolute sample offsets
+        self.phrase_start = 0
+        self.last_speech_end: Optional[int] = None
+        self._completed: Deque[Tuple[np.ndarray, bool]] = deque()
+        # Whether the phrase last returned continues the one before it (it was
+        # split off mid-speech and starts with split_overlap of that phrase)
+        self.continues_previous = False
+        self._continuing = False
 
-    def _has_speech_webrtc(self, audio_bytes: bytes) -> bool:
-        self.frame_buffer += audio_bytes
-        while len(self.frame_buffer) >= self.frame_size:
-            frame = self.frame_buffer[:self.frame_size]
-            self.frame_buffer = self.frame_buffer[self.frame_size:]
+        # Past soft_phrase_duration a phrase is split at the quietest point of
+        # its last split_window seconds instead of waiting for a pause or the
+        # hard max_phrase_duration cut. Disabled when None.
+        if soft_phrase_duration and soft_phrase_duration <= split_overlap + self.min_audio_duration:
+            raise ValueError("soft_phrase_duration must exceed split_overlap")
+        self._soft_samples = (int(soft_phrase_duration * SAMPLE_RATE)
+                              if soft_phrase_duration else None)
+        self._split_window = int(split_window * SAMPLE_RATE)
+        self._overlap_samples = int(split_overlap * SAMPLE_RATE)
 
-            try:
-                if self.vad.is_speech(frame, 16000):
-                    return True
-            except Exception:
-                return False
-        return False
+    @property
+    def phrase_bytes(self) -> bytes:
+        return self.phrase_ring.tobytes()
+
+    def has_speech(self) -> bool:
+        return self.last_speech_end is not None
+
+    def current_phrase(self) -> np.ndarray:
+        return self.phrase_ring.to_float32()
+
+    def _emit(self, samples: np.ndarray, end: int, chunk_start: int):
+        # Completes the current phrase with samples up to chunk offset `end`
+        self.phrase_ring.write(samples[:end])
+        audio = self.phrase_ring.to_float32()
+        if self.trim_silence:
+            audio = self._trim(audio)
+        self._completed.append((audio, self._continuing))
+        self._continuing = False
+        self.phrase_ring.clear()
+        self.phrase_start = chunk_start + end
+        self.last_speech_end = None
+
+    def _split(self):
+        # Emits the phrase up to its quietest recent point and keeps the rest,
+        # starting split_overlap earlier, as the beginning of the next phrase
+        audio = self.phrase_ring.to_float32()
+        length = len(audio)
+        lo = max(self._min_samples, self._overlap_samples, length - self._split_window)
+        point = quietest_point(audio, lo, length)
+        head = audio[:point]
+        if self.trim_silence:
+            head = self._trim(head)
+        self._completed.append((head, self._continuing))
+
+        keep_from = point - self._overlap_samples
+        self.phrase_ring.discard_oldest(keep_from)
+        self.phrase_start += keep_from
+        self._continuing = True
+        if self.last_speech_end is not None and self.last_speech_end <= self.phrase_start:
+            self.last_speech_end = None
+
+    def _trim(self, audio: np.ndarray) -> np.ndarray:
+        mask = self.speech_mask()
+        first_frame = self.phrase_start // FRAME_SAMPLES
+        offset = first_frame * FRAME_SAMPLES - self.phrase_start
+        regions = speech_regions(mask, offset, len(audio), self._pad_samples)
+        if not regions:
+            return audio
+        if len(regions) == 1:
+            start, end = regions[0]
+            return audio[start:end]
+        return np.concatenate([audio[start:end] for start, end in regions])
 
     def add_audio_chunk(self, audio_bytes: bytes) -> Optional[np.ndarray]:
-        now = datetime.now(timezone.utc)
+        samples = memoryview(audio_bytes).cast("B").cast("h")
+        chunk_start = self.frame_vad.samples_seen
+        first_frame, flags = self.frame_vad.process(audio_bytes)
+        capacity = self.phrase_ring.capacity
+
+        pos = 0
+        frame_ends = ()
+        if flags and (self.last_speech_end is not None or True in flags):
+            chunk_end = (first_frame + len(flags)) * FRAME_SAMPLES
+            anchor = self.last_speech_end
+            if anchor is None:
+                anchor = (first_frame + flags.index(True) + 1) * FRAME_SAMPLES
+            if (len(self.phrase_ring) + len(samples) < capacity
+                    and chunk_end - anchor < self._timeout_samples):
+                # Neither a hard cut nor a long enough pause can fall in this
+                # chunk, so only the last speech frame matters
+                if True in flags:
+                    self.last_speech_end = chunk_end - flags[::-1].index(True) * FRAME_SAMPLES
+            else:
+                frame_ends = range((first_frame + 1) * FRAME_SAMPLES, chunk_end + 1, FRAME_SAMPLES)
+        for frame_end, is_speech in zip(frame_ends, flags):
+            if is_speech:
+                self.last_speech_end = frame_end
+            if self.last_speech_end is None:
+                continue
+            rel = frame_end - chunk_start
+            phrase_len = len(self.phrase_ring) + rel - pos
+            if phrase_len >= capacity:
+                cut = pos + capacity - len(self.phrase_ring)
+                self._emit(samples[pos:], cut - pos, chunk_start + pos)
+                pos = cut
+                if is_speech:
+                    self.last_speech_end = frame_end
+            elif (frame_end - self.last_speech_end >= self._timeout_samples
+                  and phrase_len >= self._min_samples):
+                self._emit(samples[pos:], rel - pos, chunk_start + pos)
+                pos = rel
+
+        rest = samples[pos:]
+        if self.last_speech_end is not None:
+            free = capacity - len(self.phrase_ring)
+            if len(rest) >= free:
+                self._emit(rest, free, chunk_start + pos)
+                rest = rest[free:]
+        self.phrase_ring.write(rest)
 
-        if self._has_speech_webrtc(audio_bytes):
-            self.last_audio_time = now
+        if (self._soft_samples is not None and self.last_speech_end is not None
+                and len(self.phrase_ring) >= self._soft_samples):
+            self._split()
 
-        self.phrase_bytes += audio_bytes
+        if self.last_speech_end is None:
+            # Before any speech only a short pre-roll of silence is kept
+            excess = len(self.phrase_ring) - self._timeout_samples
+            if excess > 0:
+                self.phrase_ring.discard_oldest(excess)
+            self.phrase_start = self.frame_vad.samples_seen - len(self.phrase_ring)
 
-        phrase_duration = len(self.phrase_bytes) / (16000 * 2)
-        silence_timeout = self.last_audio_time and (
-            now - self.last_audio_time > timedelta(seconds=self.phrase_timeout))
-        max_duration_exceeded = phrase_duration >= self.max_phrase_duration
-        phrase_complete = silence_timeout or max_duration_exceeded
+        return self.pop_phrase()
 
-        if (phrase_complete and phrase_duration >= self.min_audio_duration and self.last_audio_time):
-            audio_np = np.frombuffer(
-                self.phrase_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-            self.reset_buffer()
-            return audio_np
+    def pop_phrase(self) -> Optional[np.ndarray]:
+        if not self._completed:
+            return None
+        audio, self.continues_previous = self._completed.popleft()
+        return audio
 
-        return None
+    def speech_mask(self) -> np.ndarray:
+        return self.frame_vad.speech_mask(
+            self.phrase_start, self.phrase_start + len(self.phrase_ring))
 
     def reset_buffer(self):
-        self.phrase_bytes = bytes()
-        self.frame_buffer = bytes()
+        self.phrase_ring.clear()
+        self.frame_vad.reset()
+        self.phrase_start = 0
+        self.last_speech_end = None
+        self._completed.clear()
+        self._continuing = False
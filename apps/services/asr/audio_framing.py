@@ -0,0 +1,109 @@
+import logging
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Binary audio frame sent by the orchestrator once framing is negotiated:
+#   magic "VA" | version u8 | encoding u8 | sequence u32 | sample offset u64 | payload
+# The orchestrator's audio_framing.py mirrors this layout.
+HEADER = struct.Struct("!2sBBIQ")
+MAGIC = b"VA"
+VERSION = 1
+
+# Binary messages on a multiplexed /mux connection carry their meeting:
+#   id length u8 | meeting_id (utf-8) | audio frame or raw PCM
+MUX_TAG = struct.Struct("!B")
+
+ENCODINGS = {"pcm16": 0, "mulaw": 1}
+ENCODING_NAMES = {code: name for name, code in ENCODINGS.items()}
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 32635
+
+
+def mulaw_encode(pcm: np.ndarray) -> np.ndarray:
+    x = pcm.astype(np.int32)
+    sign = (x < 0).astype(np.int32)
+    x = np.minimum(np.abs(x), _MULAW_CLIP) + _MULAW_BIAS
+    exponent = np.floor(np.log2(x)).astype(np.int32) - 7
+    mantissa = (x >> (exponent + 3)) & 0x0F
+    return (~((sign << 7) | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def mulaw_decode(data: np.ndarray) -> np.ndarray:
+    u = (~data.astype(np.int32)) & 0xFF
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    x = (((mantissa << 3) + _MULAW_BIAS) << exponent) - _MULAW_BIAS
+    return np.where(u & 0x80, -x, x).astype(np.int16)
+
+
+def encode_frame(seq: int, sample_offset: int, pcm: np.ndarray, encoding: str = "pcm16") -> bytes:
+    code = ENCODINGS[encoding]
+    payload = mulaw_encode(pcm).tobytes() if code == ENCODINGS["mulaw"] else pcm.astype("<i2").tobytes()
+    return HEADER.pack(MAGIC, VERSION, code, seq & 0xFFFFFFFF, sample_offset) + payload
+
+
+def decode_frame(data: bytes) -> Tuple[int, int, np.ndarray]:
+    magic, version, code, seq, sample_offset = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a framed audio message")
+    payload = memoryview(data)[HEADER.size:]
+    if code == ENCODINGS["mulaw"]:
+        pcm = mulaw_decode(np.frombuffer(payload, dtype=np.uint8))
+    elif code == ENCODINGS["pcm16"]:
+        pcm = np.frombuffer(payload, dtype="<i2")
+    else:
+        raise ValueError(f"Unknown audio encoding {code}")
+    return seq, sample_offset, pcm
+
+
+def unpack_mux(data: bytes) -> Tuple[str, memoryview]:
+    (length,) = MUX_TAG.unpack_from(data)
+    end = MUX_TAG.size + length
+    if length == 0 or len(data) < end:
+        raise ValueError("Multiplexed message has no meeting tag")
+    view = memoryview(data)
+    return bytes(view[MUX_TAG.size:end]).decode("utf-8"), view[end:]
+
+
+def negotiate(identify: Dict) -> Optional[Dict]:
+    # Reply to an identify message that offers framing; None keeps raw PCM
+    offer = identify.get("framing")
+    if not isinstance(offer, dict) or offer.get("version") != VERSION:
+        return None
+    for name in offer.get("encodings", ["pcm16"]):
+        if name in ENCODINGS:
+            return {"type": "protocol", "framing": VERSION, "encoding": name}
+    return None
+
+
+class FrameSequencer:
+    # Tracks sequence numbers and sample offsets of incoming frames. Missing
+    # audio is replaced with silence so the sample clock stays continuous.
+
+    def __init__(self, meeting_id: str, max_gap_samples: int = 16000 * 5):
+        self.meeting_id = meeting_id
+        self.max_gap_samples = max_gap_samples
+        self.expected_seq: Optional[int] = None
+        self.expected_offset = 0
+        self.gaps = 0
+        self.lost_samples = 0
+
+    def accept(self, data: bytes) -> np.ndarray:
+        seq, offset, pcm = decode_frame(data)
+        if self.expected_seq is not None and seq != self.expected_seq:
+            self.gaps += 1
+            logger.warning(f"Audio gap for meeting {self.meeting_id}: expected frame "
+                           f"{self.expected_seq}, got {seq}")
+
+        missing = offset - self.expected_offset if self.expected_seq is not None else 0
+        self.expected_seq = (seq + 1) & 0xFFFFFFFF
+        self.expected_offset = offset + len(pcm)
+        if 0 < missing <= self.max_gap_samples:
+            self.lost_samples += missing
+            return np.concatenate([np.zeros(missing, dtype=np.int16), pcm])
+        return pcm
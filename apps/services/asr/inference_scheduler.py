@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .metrics import RTF_BUCKETS, registry
+except ImportError:
+    from metrics import RTF_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+queue_wait_seconds = registry.histogram(
+    "asr_inference_queue_wait_seconds", "Time a phrase waits for an inference worker")
+inference_seconds = registry.histogram(
+    "asr_inference_seconds", "Model time per inference run (one phrase or one batch)")
+rtf_histogram = registry.histogram(
+    "asr_real_time_factor", "Inference time per second of audio, per run", RTF_BUCKETS)
+
+TranscribeFn = Callable[[np.ndarray, str], Optional[Dict]]
+BatchTranscribeFn = Callable[[List[Tuple[np.ndarray, str]]], List[Optional[Dict]]]
+ResultCallback = Callable[[Optional[Dict]], Awaitable[None]]
+
+# Levels of backlog advertised to clients so they can slow down before the
+# queue fills and submit() starts blocking them
+PRESSURE_OK, PRESSURE_HIGH, PRESSURE_CRITICAL = 0, 1, 2
+PRESSURE_LEVELS = ("ok", "high", "critical")
+
+
+class _Job:
+    __slots__ = ("meeting_id", "audio", "callback", "enqueued_at")
+
+    def __init__(self, meeting_id: str, audio: np.ndarray, callback: ResultCallback):
+        self.meeting_id = meeting_id
+        self.audio = audio
+        self.callback = callback
+        self.enqueued_at = time.monotonic()
+
+
+class InferenceScheduler:
+
+    def __init__(self, transcribe: TranscribeFn, max_queue: int = 32, workers: int = 1,
+                 wait_window: int = 200, transcribe_batch: Optional[BatchTranscribeFn] = None,
+                 batch_size: int = 1, max_batch_wait: float = 0.05, sample_rate: int = 16000,
+                 governor=None, high_water: float = 0.5, critical_water: float = 0.9,
+                 partial_workers: int = 1):
+        if max_queue <= 0 or workers <= 0 or batch_size <= 0:
+            raise ValueError("max_queue, workers and batch_size must be positive")
+        self.transcribe = transcribe
+        self.max_queue = max_queue
+        self.workers = workers
+        # Batching gathers phrases from different meetings for up to
+        # max_batch_wait seconds; larger values trade latency for throughput.
+        self.transcribe_batch = transcribe_batch
+        self.batch_size = batch_size if transcribe_batch else 1
+        self.max_batch_wait = max_batch_wait
+        self.sample_rate = sample_rate
+        # Told the backlog and real-time factor before every run, so it can
+        # change decoding quality for the run that follows
+        self.governor = governor
+        # Queue fill fractions at which pressure() reports high and critical
+        self.high_water = high_water
+        self.critical_water = critical_water
+        # Partials get their own threads and never queue: at most this many
+        # run at once across all meetings, and extra requests are dropped
+        self.partial_workers = partial_workers
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._partial_executor: Optional[ThreadPoolExecutor] = None
+        self._partials_running = 0
+        self._tasks = []
+        # A meeting sits in _ready only while it has queued jobs and none running,
+        # so each meeting's phrases are transcribed and delivered in order.
+        self._ready: Optional[asyncio.Queue] = None
+        self._pending: Dict[str, Deque[_Job]] = {}
+        self._running = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._depth = 0
+
+        self._waits: Deque[float] = deque(maxlen=wait_window)
+        self._batch_sizes: Deque[int] = deque(maxlen=wait_window)
+        # (inference seconds, audio seconds) of recent runs for the real-time factor
+        self._timings: Deque[Tuple[float, float]] = deque(maxlen=wait_window)
+        self._completed = 0
+        self._partials = 0
+        self._partials_dropped = 0
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._ready = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="asr-inference")
+        self._partial_executor = ThreadPoolExecutor(
+            max_workers=self.partial_workers, thread_name_prefix="asr-partial")
+        self._tasks = [asyncio.create_task(self._worker())
+                       for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._partial_executor is not None:
+            self._partial_executor.shutdown(wait=True)
+            self._partial_executor = None
+
+    async def submit(self, meeting_id: str, audio: np.ndarray, callback: ResultCallback):
+        # Blocks the caller while the queue is full (backpressure)
+        await self._slots.acquire()
+        self._depth += 1
+        job = _Job(meeting_id, audio, callback)
+        lane = self._pending.setdefault(meeting_id, deque())
+        lane.append(job)
+        if len(lane) == 1 and meeting_id not in self._running:
+            self._ready.put_nowait(meeting_id)
+
+    async def run_partial(self, fn: Callable, *args) -> Optional[Any]:
+        # Best-effort work such as partial transcripts only runs when no final
+        # phrase is waiting, so it never delays final transcriptions.
+        if (self._depth > 0 or self._partial_executor is None
+                or self._partials_running >= self.partial_workers):
+            self._partials_dropped += 1
+            return None
+        self._partials += 1
+        self._partials_running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._partial_executor, self._start_partial, fn, *args)
+        except Exception as e:
+            logger.error(f"Partial inference failed: {e}")
+            return None
+        finally:
+            self._partials_running -= 1
+
+    def _start_partial(self, fn: Callable, *args) -> Optional[Any]:
+        # Finals may have queued while this partial was being handed over
+        if self._depth > 0:
+            self._partials_dropped += 1
+            return None
+        return fn(*args)
+
+    def queue_depth(self) -> int:
+        return self._depth
+
+    def pressure(self) -> int:
+        fill = self._depth / self.max_queue
+        if fill >= self.critical_water:
+            return PRESSURE_CRITICAL
+        if fill >= self.high_water:
+            return PRESSURE_HIGH
+        return PRESSURE_OK
+
+    def recent_rtf(self) -> float:
+        # Inference time per second of audio over the recent window; below 1 keeps up
+        timings = list(self._timings)
+        audio = sum(a for _, a in timings)
+        return round(sum(e for e, _ in timings) / audio, 3) if audio else 0.0
+
+    def review_quality(self):
+        # Run before every job and on a timer, so quality is restored once the
+        # backlog drains even when no new phrases arrive. The timing window
+        # only moves with new work, so an empty queue counts as keeping up.
+        if self.governor is None:
+            return
+        self.governor.update(self._depth, self.recent_rtf() if self._depth else 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = list(self._waits)
+        return {
+            "queue_depth": self._depth,
+            "max_queue": self.max_queue,
+            "running": len(self._running),
+            "meetings_waiting": len(self._pending),
+            "completed": self._completed,
+            "partials": self._partials,
+            "partials_dropped": self._partials_dropped,
+            "wait_avg_ms": round(1000 * sum(waits) / len(waits), 2) if waits else 0.0,
+            "wait_max_ms": round(1000 * max(waits), 2) if waits else 0.0,
+            "batch_size_avg": round(sum(self._batch_sizes) / len(self._batch_sizes), 2)
+            if self._batch_sizes else 0.0,
+            "rtf": self.recent_rtf(),
+            "pressure": PRESSURE_LEVELS[self.pressure()],
+        }
+
+    def _take(self, meeting_id: str) -> Optional[_Job]:
+        lane = self._pending.get(meeting_id)
+        if not lane:
+            return None
+        job = lane.popleft()
+        if not lane:
+            self._pending.pop(meeting_id, None)
+        self._running.add(meeting_id)
+        wait = time.monotonic() - job.enqueued_at
+        self._waits.append(wait)
+        queue_wait_seconds.observe(wait)
+        return job
+
+    async def _collect_batch(self, first: _Job) -> List[_Job]:
+        jobs = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_batch_wait
+        while len(jobs) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                meeting_id = await asyncio.wait_for(self._ready.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            job = self._take(meeting_id)
+            if job is not None:
+                jobs.append(job)
+        return jobs
+
+    def _run(self, jobs: List[_Job]) -> List[Optional[Dict]]:
+        if len(jobs) == 1:
+            return [self.transcribe(jobs[0].audio, jobs[0].meeting_id)]
+        return self.transcribe_batch([(job.audio, job.meeting_id) for job in jobs])
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = self._take(await self._ready.get())
+            if job is None:
+                continue
+            jobs = [job]
+            if self.batch_size > 1:
+                jobs = await self._collect_batch(job)
+            self._batch_sizes.append(len(jobs))
+            self.review_quality()
+
+            results: List[Optional[Dict]] = [None] * len(jobs)
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self._run, jobs)
+                elapsed = time.perf_counter() - started
+                audio_seconds = sum(len(j.audio) for j in jobs) / self.sample_rate
+                self._timings.append((elapsed, audio_seconds))
+                inference_seconds.observe(elapsed)
+                if audio_seconds:
+                    rtf_histogram.observe(elapsed / audio_seconds)
+            except Exception as e:
+                logger.error(f"Inference failed for {len(jobs)} phrase(s): {e}")
+            finally:
+                self._depth -= len(jobs)
+                self._completed += len(jobs)
+                for _ in jobs:
+                    self._slots.release()
+
+            for job, result in zip(jobs, results):
+                try:
+                    await job.callback(result)
+                except Exception as e:
+                    logger.error(f"Failed to deliver transcript for meeting {job.meeting_id}: {e}")
+                finally:
+                    self._running.discard(job.meeting_id)
+                    if job.meeting_id in self._pending:
+                        self._ready.put_nowait(job.meeting_id)
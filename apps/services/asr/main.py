@@ -1,19 +1,101 @@
-from whisper_processor import whisper_processor
+from whisper_processor import drop_overlap, whisper_processor
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
-from typing import Dict
+from fastapi.responses import JSONResponse, PlainTextResponse
+from typing import Awaitable, Callable, Dict, Optional
 from audio_buffer import MeetingAudioBuffer
+from inference_scheduler import InferenceScheduler, PRESSURE_CRITICAL, PRESSURE_LEVELS, PRESSURE_OK
+from partial_transcriber import PartialTranscriber
+from audio_framing import FrameSequencer, negotiate, unpack_mux
+from metrics import LogSampler, registry
+from quality_governor import QualityGovernor
+import asyncio
 import json
+import logging
+import os
+import time
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="ASR Service")
 
 sessions = {}
 
+vad_seconds = registry.histogram(
+    "asr_vad_chunk_seconds", "VAD and phrase segmentation time per received audio chunk")
+send_seconds = registry.histogram(
+    "asr_ws_send_seconds", "Time to send one result message to the orchestrator")
+registry.gauge("asr_active_sessions", "Meetings with an open ASR session",
+               lambda: len(sessions))
+registry.gauge("asr_buffer_bytes", "PCM bytes held in phrase buffers across sessions",
+               lambda: sum(2 * len(s.buffer.phrase_ring) for s in list(sessions.values())))
+
+# Partials only run on a replica finals are not using, so they need ASR_MODEL_REPLICAS >= 2
+PARTIALS_ENABLED = os.environ.get("ASR_PARTIALS", "0") == "1"
+PARTIAL_INTERVAL = float(os.environ.get("ASR_PARTIAL_INTERVAL", "1.0"))
+PARTIAL_COMPUTE_BUDGET = float(os.environ.get("ASR_PARTIAL_COMPUTE_BUDGET", "0.25"))
+# Phrases longer than this are split at the quietest point of their last ASR_SPLIT_WINDOW seconds
+SOFT_PHRASE_SECONDS = float(os.environ.get("ASR_SOFT_PHRASE_SECONDS", "9"))
+SPLIT_WINDOW_SECONDS = float(os.environ.get("ASR_SPLIT_WINDOW_SECONDS", "2"))
+SPLIT_OVERLAP_SECONDS = float(os.environ.get("ASR_SPLIT_OVERLAP_SECONDS", "0.3"))
+# Bytes of audio each multiplexed stream may send before it is granted more credit
+MUX_WINDOW = int(os.environ.get("ASR_MUX_WINDOW_BYTES", str(256 * 1024)))
+# How often sessions are told about changes in inference pressure and the
+# quality governor is re-evaluated
+PRESSURE_INTERVAL = float(os.environ.get("ASR_PRESSURE_INTERVAL", "0.25"))
+
+governor = None
+if len(whisper_processor.tiers) > 1:
+    governor = QualityGovernor(
+        whisper_processor.tiers,
+        degrade_depth=int(os.environ.get("ASR_GOVERNOR_DEGRADE_DEPTH", "8")),
+        restore_depth=int(os.environ.get("ASR_GOVERNOR_RESTORE_DEPTH", "1")),
+        degrade_rtf=float(os.environ.get("ASR_GOVERNOR_DEGRADE_RTF", "0.8")),
+        restore_rtf=float(os.environ.get("ASR_GOVERNOR_RESTORE_RTF", "0.4")),
+        degrade_hold=float(os.environ.get("ASR_GOVERNOR_DEGRADE_HOLD", "5")),
+        restore_hold=float(os.environ.get("ASR_GOVERNOR_RESTORE_HOLD", "30")),
+        on_change=whisper_processor.set_tier,
+    )
+    registry.gauge("asr_quality_level", "Current quality tier, 0 being the best",
+                   lambda: governor.level)
+
+scheduler = InferenceScheduler(
+    whisper_processor.transcribe_audio,
+    max_queue=int(os.environ.get("ASR_INFERENCE_QUEUE_SIZE", "32")),
+    workers=int(os.environ.get("ASR_INFERENCE_WORKERS", str(whisper_processor.replicas))),
+    transcribe_batch=whisper_processor.transcribe_batch,
+    batch_size=int(os.environ.get("ASR_BATCH_SIZE", "1")),
+    max_batch_wait=float(os.environ.get("ASR_BATCH_MAX_WAIT_MS", "50")) / 1000,
+    governor=governor,
+    high_water=float(os.environ.get("ASR_PRESSURE_HIGH_WATER", "0.5")),
+    critical_water=float(os.environ.get("ASR_PRESSURE_CRITICAL_WATER", "0.9")),
+    partial_workers=int(os.environ.get("ASR_PARTIAL_WORKERS", "1")),
+)
+registry.gauge("asr_inference_queue_depth", "Phrases waiting for an inference worker",
+               scheduler.queue_depth)
+registry.gauge("asr_pressure_level", "Backlog level advertised to clients (0 ok, 1 high, 2 critical)",
+               scheduler.pressure)
+pressure_task: Optional[asyncio.Task] = None
+
+log_sampler = LogSampler(every=int(os.environ.get("LOG_SAMPLE_EVERY", "100")))
+
 
 @app.on_event("startup")
 async def startup_event():
     if not whisper_processor.load_model():
         raise RuntimeError("Failed to load Whisper model")
+    await scheduler.start()
+    global pressure_task
+    pressure_task = asyncio.create_task(watch_pressure())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if pressure_task is not None:
+        pressure_task.cancel()
+        await asyncio.gather(pressure_task, return_exceptions=True)
+    await scheduler.stop()
+    whisper_processor.transcript_sink.shutdown()
 
 
 @app.api_route("/healthz", methods=["GET", "HEAD"])
@@ -21,31 +103,298 @@ async def healthz():
     return JSONResponse(content={"status": "ok"}, status_code=200)
 
 
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/load")
+async def load():
+    # Polled by orchestrators to place meetings across ASR instances
+    return JSONResponse(content={
+        "sessions": len(sessions),
+        "queue_depth": scheduler.queue_depth(),
+        "max_queue": scheduler.max_queue,
+        "workers": scheduler.workers,
+        "rtf": scheduler.recent_rtf(),
+        "quality": whisper_processor.tier.name,
+        "pressure": PRESSURE_LEVELS[scheduler.pressure()],
+    }, status_code=200)
+
+
+@app.get("/stats")
+async def stats():
+    return JSONResponse(content={
+        "active_sessions": len(sessions),
+        "inference": scheduler.stats(),
+        "quality": governor.stats() if governor else {"tier": whisper_processor.tier.name},
+    }, status_code=200)
+
+
+class MeetingSession:
+    # Per-meeting ASR state, shared by the dedicated and the multiplexed endpoint.
+    # `send` delivers a result message back to the orchestrator.
+
+    def __init__(self, meeting_id: str, send: Callable[[dict], Awaitable[None]],
+                 credit_window: Optional[int] = None):
+        self.meeting_id = meeting_id
+        self.send = send
+        # Multiplexed streams only: bytes received but not yet granted back.
+        # Grants are withheld while inference pressure is critical.
+        self.credit_window = credit_window
+        self.unacked = 0
+        self.pressure = PRESSURE_OK
+        self.buffer = MeetingAudioBuffer(
+            meeting_id, trim_silence=not whisper_processor.internal_vad,
+            soft_phrase_duration=SOFT_PHRASE_SECONDS or None,
+            split_window=SPLIT_WINDOW_SECONDS, split_overlap=SPLIT_OVERLAP_SECONDS)
+        self.partial = PartialTranscriber(meeting_id, interval=PARTIAL_INTERVAL,
+                                          compute_budget=PARTIAL_COMPUTE_BUDGET)
+        # Raw PCM until the orchestrator negotiates sequenced framing
+        self.sequencer: Optional[FrameSequencer] = None
+        # Text of the last delivered phrase, to trim the overlap of a split phrase
+        self.last_text = ""
+        # In-flight partial decodes, held so they are not collected mid-run
+        self.partial_tasks = set()
+        # Multiplexed streams only: audio waiting to be fed, so a stream stuck
+        # on a full inference queue never stalls the connection's reader
+        self.inbox: Optional[asyncio.Queue] = None
+        self.queued = 0
+        self.feeder: Optional[asyncio.Task] = None
+
+    def negotiate(self, identify: dict) -> Optional[dict]:
+        reply = negotiate(identify)
+        if reply:
+            self.sequencer = FrameSequencer(self.meeting_id)
+        return reply
+
+    async def _timed_send(self, message: dict):
+        with send_seconds.time():
+            await self.send(message)
+
+    async def send_result(self, result, continues: bool = False):
+        if result and result.get('segments_processed', 0) > 0:
+            if continues:
+                result['text'] = drop_overlap(self.last_text, result['text'])
+                if not result['text']:
+                    return
+            self.last_text = result['text']
+            await self._timed_send(result)
+
+    async def send_continuation(self, result):
+        await self.send_result(result, continues=True)
+
+    async def report_pressure(self, level: int):
+        if level == self.pressure:
+            return
+        self.pressure = level
+        try:
+            await self.send({"type": "pressure", "level": PRESSURE_LEVELS[level],
+                             "queue_depth": scheduler.queue_depth()})
+            if level < PRESSURE_CRITICAL:
+                await self.grant_credit(force=True)
+        except Exception:
+            pass
+
+    async def grant_credit(self, force: bool = False):
+        if self.credit_window is None or self.pressure >= PRESSURE_CRITICAL:
+            return
+        if self.unacked >= self.credit_window // 4 or (force and self.unacked):
+            granted, self.unacked = self.unacked, 0
+            await self.send({"type": "credit", "bytes": granted})
+
+    async def send_partial(self, job):
+        started = time.perf_counter()
+        words = await scheduler.run_partial(
+            whisper_processor.transcribe_words, job.audio, job.prompt)
+        result = self.partial.finish(job, words, time.perf_counter() - started)
+        if result and result["text"]:
+            try:
+                await self._timed_send(result)
+            except Exception:
+                pass
+
+    async def feed(self, audio_bytes: bytes):
+        if self.sequencer is not None:
+            try:
+                audio_bytes = self.sequencer.accept(audio_bytes).tobytes()
+            except Exception as e:
+                log_sampler.log(logger, logging.WARNING, f"malformed:{self.meeting_id}",
+                                f"Dropping malformed audio frame for meeting {self.meeting_id}: {e}")
+                return
+        buffer = self.buffer
+        with vad_seconds.time():
+            audio_np = buffer.add_audio_chunk(audio_bytes)
+        if audio_np is not None:
+            self.partial.reset()
+        while audio_np is not None:
+            callback = self.send_continuation if buffer.continues_previous else self.send_result
+            await scheduler.submit(self.meeting_id, audio_np, callback)
+            audio_np = buffer.pop_phrase()
+        if (PARTIALS_ENABLED and buffer.has_speech()
+                and self.partial.due(len(buffer.phrase_ring))):
+            task = asyncio.create_task(self.send_partial(self.partial.begin(buffer.current_phrase())))
+            self.partial_tasks.add(task)
+            task.add_done_callback(self.partial_tasks.discard)
+
+    def offer(self, payload: bytes, size: int) -> bool:
+        # Called by the mux reader and never waits. A stream that sends past
+        # its credit has the extra audio shed rather than queued.
+        if self.queued + self.unacked + size > self.credit_window:
+            return False
+        if self.feeder is None:
+            self.inbox = asyncio.Queue()
+            self.feeder = asyncio.create_task(self._drain())
+        self.queued += size
+        self.inbox.put_nowait((payload, size))
+        return True
+
+    async def _drain(self):
+        # Credit is granted back only once audio has been handed to the buffer
+        while True:
+            payload, size = await self.inbox.get()
+            try:
+                await self.feed(payload)
+            except Exception as e:
+                logger.error(f"Failed to process audio for meeting {self.meeting_id}: {e}")
+            self.queued -= size
+            self.unacked += size
+            try:
+                await self.grant_credit()
+            except Exception:
+                return
+
+    def close(self):
+        if self.feeder is not None:
+            self.feeder.cancel()
+            self.feeder = None
+        for task in list(self.partial_tasks):
+            task.cancel()
+        self.partial_tasks.clear()
+        if sessions.get(self.meeting_id) is self:
+            sessions.pop(self.meeting_id, None)
+        whisper_processor.transcript_sink.close_meeting(self.meeting_id)
+
+
+async def watch_pressure():
+    while True:
+        await asyncio.sleep(PRESSURE_INTERVAL)
+        scheduler.review_quality()
+        level = scheduler.pressure()
+        for session in list(sessions.values()):
+            # One broken session must not stop updates for the others
+            try:
+                await session.report_pressure(level)
+            except Exception as e:
+                log_sampler.log(logger, logging.WARNING, f"pressure:{session.meeting_id}",
+                                f"Pressure update failed for meeting {session.meeting_id}: {e}")
+
+
 @app.websocket("/process/{meeting_id}")
 async def websocket_asr_process(websocket: WebSocket, meeting_id: str):
     await websocket.accept()
-    sessions[meeting_id] = {
-        "ws": websocket,
-        "buffer": MeetingAudioBuffer(meeting_id),
-    }
-    buffer = sessions[meeting_id]["buffer"]
+
+    async def send(message: dict):
+        await websocket.send_text(json.dumps(message))
+
+    session = sessions[meeting_id] = MeetingSession(meeting_id, send)
 
     try:
         while True:
             message = await websocket.receive()
-            if "bytes" in message:
-                audio_np = buffer.add_audio_chunk(message["bytes"])
-                if audio_np is not None:
-                    result = whisper_processor.transcribe_audio(
-                        audio_np, meeting_id)
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text"):
+                try:
+                    reply = session.negotiate(json.loads(message["text"]))
+                except Exception:
+                    reply = None
+                if reply:
+                    await websocket.send_text(json.dumps(reply))
+            elif message.get("bytes"):
+                await session.feed(message["bytes"])
 
-                    if result and result.get('segments_processed', 0) > 0:
-                        await websocket.send_text(json.dumps(result))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.close()
+
+
+@app.websocket("/mux")
+async def websocket_asr_mux(websocket: WebSocket):
+    # Many meetings over one connection. Control messages are JSON text
+    # ({"type": "open" | "close", "meeting_id": ...}); audio is binary, tagged
+    # with its meeting. Each stream may have MUX_WINDOW bytes in flight and is
+    # granted more credit once its audio has been handed to the buffer, unless
+    # inference pressure is critical. The reader only queues audio on its
+    # stream, so one stream waiting on inference cannot hold up the others.
+    await websocket.accept()
+    streams: Dict[str, MeetingSession] = {}
+    send_lock = asyncio.Lock()
+
+    async def send_json(message: dict):
+        async with send_lock:
+            await websocket.send_text(json.dumps(message))
+
+    def stream_sender(meeting_id: str):
+        async def send(message: dict):
+            await send_json({**message, "meeting_id": meeting_id})
+        return send
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except Exception:
+                    continue
+                meeting_id = control.get("meeting_id")
+                if not meeting_id:
+                    continue
+                if control.get("type") == "open":
+                    session = streams.get(meeting_id)
+                    if session is None:
+                        session = MeetingSession(meeting_id, stream_sender(meeting_id),
+                                                 credit_window=MUX_WINDOW)
+                        streams[meeting_id] = sessions[meeting_id] = session
+                    reply = session.negotiate(control)
+                    session.unacked = 0
+                    await send_json({
+                        "type": "opened",
+                        "meeting_id": meeting_id,
+                        "encoding": reply["encoding"] if reply else None,
+                        "credit": MUX_WINDOW,
+                    })
+                elif control.get("type") == "close":
+                    session = streams.pop(meeting_id, None)
+                    if session is not None:
+                        session.close()
+            elif message.get("bytes"):
+                data = message["bytes"]
+                try:
+                    meeting_id, payload = unpack_mux(data)
+                except Exception as e:
+                    log_sampler.log(logger, logging.WARNING, "untagged",
+                                    f"Dropping untagged multiplexed message: {e}")
+                    continue
+                session = streams.get(meeting_id)
+                if session is None:
+                    log_sampler.log(logger, logging.WARNING, f"unopened:{meeting_id}",
+                                    f"Audio for unopened stream {meeting_id}")
+                    continue
+                if not session.offer(payload, len(data)):
+                    log_sampler.log(logger, logging.WARNING, f"overrun:{meeting_id}",
+                                    f"Dropping audio past the credit window for stream {meeting_id}")
 
     except WebSocketDisconnect:
         pass
     finally:
-        sessions.pop(meeting_id, None)
+        for session in streams.values():
+            session.close()
+
 
 if __name__ == "__main__":
     import uvicorn
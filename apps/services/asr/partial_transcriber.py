@@ -0,0 +1,98 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# (word, start seconds, end seconds) relative to the decoded window
+Word = Tuple[str, float, float]
+
+
+def _norm(word: str) -> str:
+    return word.strip().lower().strip(".,!?;:\"'")
+
+
+def agreed_prefix(previous: List[Word], current: List[Word]) -> int:
+    n = 0
+    for a, b in zip(previous, current):
+        if _norm(a[0]) != _norm(b[0]):
+            break
+        n += 1
+    return n
+
+
+class PartialJob:
+    __slots__ = ("token", "start_sample", "audio", "prompt")
+
+    def __init__(self, token: int, start_sample: int, audio: np.ndarray, prompt: str):
+        self.token = token
+        self.start_sample = start_sample
+        self.audio = audio
+        self.prompt = prompt
+
+
+class PartialTranscriber:
+    # Re-decodes the uncommitted tail of the in-progress phrase and commits
+    # words once two consecutive hypotheses agree on them (local agreement).
+    # Committed audio is dropped from the window, so it is never re-decoded.
+
+    def __init__(self, meeting_id: str, interval: float = 1.0, max_window: float = 10.0,
+                 compute_budget: float = 0.25):
+        self.meeting_id = meeting_id
+        self.interval_samples = int(interval * SAMPLE_RATE)
+        self.max_window_samples = int(max_window * SAMPLE_RATE)
+        # Partial decoding may use at most this fraction of phrase audio time
+        self.compute_budget = compute_budget
+
+        self.in_flight = False
+        self._token = 0
+        self.reset()
+
+    def reset(self):
+        self._token += 1
+        self.committed: List[str] = []
+        self.committed_until = 0
+        self._hypothesis: List[Word] = []
+        self._last_decoded = 0
+        self._compute_used = 0.0
+
+    def due(self, phrase_samples: int) -> bool:
+        if self.in_flight:
+            return False
+        if phrase_samples - self._last_decoded < self.interval_samples:
+            return False
+        return self._compute_used <= self.compute_budget * phrase_samples / SAMPLE_RATE
+
+    def begin(self, phrase_audio: np.ndarray) -> PartialJob:
+        self.in_flight = True
+        self._last_decoded = len(phrase_audio)
+        start = max(self.committed_until, len(phrase_audio) - self.max_window_samples)
+        return PartialJob(self._token, start, phrase_audio[start:], " ".join(self.committed))
+
+    def finish(self, job: PartialJob, words: Optional[List[Word]],
+               elapsed: float = 0.0) -> Optional[Dict]:
+        self.in_flight = False
+        if job.token != self._token:
+            # Phrase was finalized while this partial was decoding
+            return None
+        self._compute_used += elapsed
+        if words is None:
+            return None
+
+        offset = job.start_sample / SAMPLE_RATE
+        current = [(w, start + offset, end + offset) for w, start, end in words]
+        previous = [w for w in self._hypothesis if w[1] >= offset]
+        n = agreed_prefix(previous, current)
+        if n:
+            self.committed.extend(w.strip() for w, _, _ in current[:n])
+            self.committed_until = int(current[n - 1][2] * SAMPLE_RATE)
+        self._hypothesis = current[n:]
+
+        committed = " ".join(self.committed)
+        tentative = " ".join(w.strip() for w, _, _ in self._hypothesis)
+        return {
+            'type': 'partial',
+            'committed': committed,
+            'tentative': tentative,
+            'text': " ".join(t for t in (committed, tentative) if t),
+        }
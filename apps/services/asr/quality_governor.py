@@ -0,0 +1,126 @@
+import logging
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+try:
+    from .metrics import registry
+except ImportError:
+    from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+tier_changes = registry.counter(
+    "asr_quality_tier_changes_total", "Quality tier changes made by the latency governor")
+
+
+class QualityTier(NamedTuple):
+    name: str
+    beam_size: int
+    word_timestamps: bool
+    # None decodes with the service's main model
+    model: Optional[str] = None
+
+
+# Ordered best first; each step trades accuracy for decode speed. None of
+# these loads a second model; a smaller-model tier such as
+# "tiny:1:0:tiny.en" is opt-in through ASR_QUALITY_TIERS, since it is loaded
+# and warmed for every replica at startup.
+DEFAULT_TIERS = (
+    QualityTier("full", 3, True),
+    QualityTier("fast", 1, True),
+    QualityTier("lean", 1, False),
+)
+
+
+def parse_tiers(spec: Optional[str]) -> List[QualityTier]:
+    # "name:beam:word_timestamps[:model]" entries, comma separated, best first
+    if not spec:
+        return list(DEFAULT_TIERS)
+    tiers = []
+    for entry in spec.split(","):
+        parts = entry.strip().split(":")
+        if len(parts) not in (3, 4):
+            raise ValueError(f"Invalid quality tier {entry!r}")
+        name, beam, words = parts[:3]
+        model = parts[3] if len(parts) == 4 and parts[3] else None
+        tiers.append(QualityTier(name, int(beam), words == "1", model))
+    return tiers
+
+
+class QualityGovernor:
+    # Steps down one tier at a time while the inference backlog or the recent
+    # real-time factor is over its degrade threshold, and back up only after
+    # both have stayed under their (lower) restore thresholds for restore_hold
+    # seconds. The gap between the thresholds and the asymmetric hold times
+    # keep the tier from flapping around a single operating point.
+
+    def __init__(self, tiers: Sequence[QualityTier] = DEFAULT_TIERS,
+                 degrade_depth: int = 8, restore_depth: int = 1,
+                 degrade_rtf: float = 0.8, restore_rtf: float = 0.4,
+                 degrade_hold: float = 5.0, restore_hold: float = 30.0,
+                 on_change: Optional[Callable[[QualityTier], None]] = None):
+        if not tiers:
+            raise ValueError("At least one quality tier is required")
+        if restore_depth > degrade_depth or restore_rtf > degrade_rtf:
+            raise ValueError("Restore thresholds must not exceed degrade thresholds")
+        self.tiers = list(tiers)
+        self.degrade_depth = degrade_depth
+        self.restore_depth = restore_depth
+        self.degrade_rtf = degrade_rtf
+        self.restore_rtf = restore_rtf
+        self.degrade_hold = degrade_hold
+        self.restore_hold = restore_hold
+        self.on_change = on_change
+
+        self.level = 0
+        self._changed_at = float("-inf")
+        self._calm_since: Optional[float] = None
+        self.degrades = 0
+        self.restores = 0
+
+    @property
+    def tier(self) -> QualityTier:
+        return self.tiers[self.level]
+
+    def update(self, depth: int, rtf: float, now: Optional[float] = None) -> QualityTier:
+        now = time.monotonic() if now is None else now
+        overloaded = depth >= self.degrade_depth or rtf >= self.degrade_rtf
+        calm = depth <= self.restore_depth and rtf <= self.restore_rtf
+
+        if calm:
+            if self._calm_since is None:
+                self._calm_since = now
+        else:
+            self._calm_since = None
+
+        if overloaded and self.level < len(self.tiers) - 1:
+            # The previous step needs a moment to show up in the backlog
+            if now - self._changed_at >= self.degrade_hold:
+                self._step(1, now, depth, rtf)
+        elif calm and self.level > 0:
+            if now - max(self._calm_since, self._changed_at) >= self.restore_hold:
+                self._step(-1, now, depth, rtf)
+        return self.tier
+
+    def _step(self, direction: int, now: float, depth: int, rtf: float):
+        previous = self.tier
+        self.level += direction
+        self._changed_at = now
+        if direction > 0:
+            self.degrades += 1
+            tier_changes.inc(direction="degrade")
+        else:
+            self.restores += 1
+            tier_changes.inc(direction="restore")
+        logger.warning(f"Quality tier {previous.name} -> {self.tier.name} "
+                       f"(queue depth {depth}, rtf {rtf:.2f})")
+        if self.on_change is not None:
+            self.on_change(self.tier)
+
+    def stats(self) -> dict:
+        return {
+            "tier": self.tier.name,
+            "level": self.level,
+            "degrades": self.degrades,
+            "restores": self.restores,
+        }
@@ -0,0 +1,138 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+_WRITE = 0
+_CLOSE = 1
+_FLUSH = 2
+_STOP = 3
+
+
+class TranscriptSink:
+    # Appends transcript lines from a single writer thread. Lines are buffered
+    # per meeting and flushed on an interval or byte threshold; open handles
+    # are kept in an LRU so file descriptor use stays bounded.
+
+    def __init__(self, directory: str, max_open: int = 128, flush_interval: float = 1.0,
+                 flush_bytes: int = 64 * 1024):
+        self.directory = directory
+        self.max_open = max_open
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Writer-thread state
+        self._handles: "OrderedDict[str, TextIO]" = OrderedDict()
+        self._pending: Dict[str, List[str]] = {}
+        self._pending_bytes: Dict[str, int] = {}
+
+    def path_for(self, meeting_id: str) -> str:
+        return os.path.join(self.directory, f"{meeting_id}.txt")
+
+    def write(self, meeting_id: str, line: str) -> None:
+        self._ensure_started()
+        self._queue.put((_WRITE, meeting_id, line))
+
+    def close_meeting(self, meeting_id: str) -> None:
+        if self._thread is not None:
+            self._queue.put((_CLOSE, meeting_id, None))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, None, done))
+        return done.wait(timeout)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put((_STOP, None, None))
+        thread.join(timeout)
+
+    def open_handles(self) -> int:
+        return len(self._handles)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="transcript-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                op, meeting_id, arg = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                op = None
+
+            try:
+                if op == _WRITE:
+                    self._pending.setdefault(meeting_id, []).append(arg)
+                    size = self._pending_bytes.get(meeting_id, 0) + len(arg)
+                    self._pending_bytes[meeting_id] = size
+                    if size >= self.flush_bytes:
+                        self._flush_meeting(meeting_id)
+                elif op == _CLOSE:
+                    self._flush_meeting(meeting_id)
+                    handle = self._handles.pop(meeting_id, None)
+                    if handle is not None:
+                        handle.close()
+                elif op == _FLUSH:
+                    self._flush_all()
+                    arg.set()
+                elif op == _STOP:
+                    self._flush_all()
+                    for handle in self._handles.values():
+                        handle.close()
+                    self._handles.clear()
+                    return
+            except Exception as e:
+                logger.error(f"Transcript sink error for meeting {meeting_id}: {e}")
+
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_all()
+                last_flush = time.monotonic()
+
+    def _handle(self, meeting_id: str) -> TextIO:
+        handle = self._handles.get(meeting_id)
+        if handle is not None:
+            self._handles.move_to_end(meeting_id)
+            return handle
+        while len(self._handles) >= self.max_open:
+            _, idle = self._handles.popitem(last=False)
+            idle.close()
+        handle = open(self.path_for(meeting_id), "a", encoding="utf-8")
+        self._handles[meeting_id] = handle
+        return handle
+
+    def _flush_meeting(self, meeting_id: str):
+        lines = self._pending.pop(meeting_id, None)
+        self._pending_bytes.pop(meeting_id, None)
+        if not lines:
+            return
+        handle = self._handle(meeting_id)
+        handle.write("".join(lines))
+        handle.flush()
+
+    def _flush_all(self):
+        for meeting_id in list(self._pending):
+            try:
+                self._flush_meeting(meeting_id)
+            except Exception as e:
+                logger.error(f"Failed to flush transcript for meeting {meeting_id}: {e}")
@@ -1,47 +1,184 @@
+import logging
 import os
+import queue
 import numpy as np
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Sequence, Tuple
+
+try:
+    from .transcript_sink import TranscriptSink
+    from .quality_governor import QualityTier, parse_tiers
+except ImportError:
+    from transcript_sink import TranscriptSink
+    from quality_governor import QualityTier, parse_tiers
+
+logger = logging.getLogger(__name__)
+
 WhisperModel = None
+BatchedInferencePipeline = None
+
+CPU_COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def drop_overlap(previous: str, text: str, max_words: int = 8) -> str:
+    # A phrase split off mid-speech starts with audio the previous phrase
+    # ended with; drop the longest run of leading words that repeats its end
+    def norm(word):
+        return word.strip(".,!?;:\"'").lower()
+
+    before = [norm(w) for w in previous.split()[-max_words:]]
+    words = text.split()
+    for n in range(min(len(before), len(words)), 0, -1):
+        if before[-n:] == [norm(w) for w in words[:n]]:
+            return " ".join(words[n:])
+    return text
+
+
+def detect_device() -> str:
+    try:
+        import ctranslate2
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+
+class _Replica:
+    __slots__ = ("model", "batched", "alternates")
+
+    def __init__(self, model, batched, alternates: Optional[Dict[str, "_Replica"]] = None):
+        self.model = model
+        self.batched = batched
+        # Smaller models used by degraded quality tiers, keyed by model name
+        self.alternates = alternates or {}
+
+    def for_tier(self, tier: QualityTier) -> "_Replica":
+        return self.alternates.get(tier.model, self) if tier.model else self
 
 
 class WhisperProcessor:
 
-    def __init__(self, model_name: str = "base.en", transcripts_dir: str = "transcripts"):
+    def __init__(self, model_name: str = "base.en", transcripts_dir: str = "transcripts",
+                 device: str = "auto", compute_type: Optional[str] = None,
+                 cpu_threads: Optional[int] = None, replicas: int = 1, warmup: bool = True,
+                 internal_vad: bool = True, tiers: Optional[Sequence[QualityTier]] = None):
         self.model_name = model_name
         self.model = None
+        self.batched_model = None
         self.transcripts_dir = transcripts_dir
-        self.compute_type = "float32"
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.replicas = max(1, replicas)
+        self.warmup = warmup
+        # Disable when callers already pass VAD-trimmed audio
+        self.internal_vad = internal_vad
+        # Decoding settings, switched by the latency governor; the first is the default
+        self.tiers = list(tiers or parse_tiers(None)[:1])
+        self.tier = self.tiers[0]
+        self._pool: Optional[queue.Queue] = None
 
         os.makedirs(self.transcripts_dir, exist_ok=True)
+        self.transcript_sink = TranscriptSink(self.transcripts_dir)
+
+    def _runtime_options(self) -> Dict:
+        device = detect_device() if self.device == "auto" else self.device
+        compute_type = self.compute_type or ("float16" if device == "cuda" else "int8")
+        # Split the cores between replicas so they don't oversubscribe the CPU
+        cpu_threads = self.cpu_threads or max(1, available_cores() // self.replicas)
+        return {
+            "device": device,
+            "compute_type": compute_type,
+            "cpu_threads": cpu_threads if device == "cpu" else 0,
+            "num_workers": 1,
+        }
 
     def load_model(self):
         try:
             from faster_whisper import WhisperModel
         except Exception:
             return False
-            
+
         try:
-            import torch
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            if device == "cuda":
-                self.compute_type = "float16"
-
-            self.model = WhisperModel(
-                self.model_name,
-                device=device,
-                compute_type=self.compute_type,
-                num_workers=1
-            )
+            options = self._runtime_options()
+            self.device = options["device"]
+            self.compute_type = options["compute_type"]
+            self.cpu_threads = options["cpu_threads"]
+
+            # Tier models are loaded up front; switching tiers happens under
+            # load, which is no time to read a model from disk
+            alternate_names = {t.model for t in self.tiers
+                               if t.model and t.model != self.model_name}
+            pool = queue.Queue()
+            for _ in range(self.replicas):
+                replica = self._load_replica(WhisperModel, self.model_name, options)
+                for name in alternate_names:
+                    replica.alternates[name] = self._load_replica(WhisperModel, name, options)
+                pool.put(replica)
+
+            first = pool.queue[0]
+            self.model, self.batched_model = first.model, first.batched
+            self._pool = pool
             return True
         except Exception:
             return False
 
+    def _load_replica(self, model_cls, model_name: str, options: Dict) -> _Replica:
+        model = model_cls(model_name, **options)
+        try:
+            from faster_whisper import BatchedInferencePipeline
+            batched = BatchedInferencePipeline(model=model)
+        except Exception:
+            batched = None
+        replica = _Replica(model, batched)
+        if self.warmup:
+            self._warm_up(replica)
+        return replica
+
+    def set_tier(self, tier: QualityTier) -> None:
+        self.tier = tier
+
+    def _warm_up(self, replica: _Replica) -> None:
+        # One short decode so the first real phrase doesn't pay for lazy init
+        segments, _ = replica.model.transcribe(
+            np.zeros(16000, dtype=np.float32), language="en", beam_size=1,
+            vad_filter=False, without_timestamps=True)
+        for _ in segments:
+            pass
+
+    @contextmanager
+    def _replica(self, spare: bool = False):
+        # Spare requests (partials) never wait, and never take the last idle
+        # replica, so a final phrase never queues behind one. They get None
+        # instead; with a single replica that is always the case.
+        if self._pool is None:
+            yield None if spare else _Replica(self.model, self.batched_model)
+            return
+        if spare:
+            with self._pool.mutex:
+                replica = self._pool._get() if self._pool._qsize() > 1 else None
+            if replica is None:
+                yield None
+                return
+        else:
+            replica = self._pool.get()
+        try:
+            yield replica
+        finally:
+            self._pool.put(replica)
+
     def is_ready(self) -> bool:
         return self.model is not None
 
     def get_transcript_path(self, meeting_id: str) -> str:
-        return os.path.join(self.transcripts_dir, f"{meeting_id}.txt")
+        return self.transcript_sink.path_for(meeting_id)
 
     def post_process_text(self, text: str) -> str:
         if not text:
@@ -54,64 +191,162 @@ class WhisperProcessor:
         return text
 
     def save_to_file(self, meeting_id: str, text: str, timestamp: datetime) -> None:
-        file_path = self.get_transcript_path(meeting_id)
         line = f"[{timestamp.strftime('%H:%M:%S')}] {text}\n"
-        with open(file_path, "a", encoding="utf-8") as f:
-            f.write(line)
+        self.transcript_sink.write(meeting_id, line)
+
+    def _prepare_audio(self, audio_np: np.ndarray) -> np.ndarray:
+        audio_data = audio_np.astype(np.float32)
+        max_val = np.abs(audio_data).max()
+        if max_val > 1.0:
+            audio_data = audio_data / max_val
+        return audio_data
+
+    def _build_result(self, meeting_id: str, texts: List[str], audio_duration: float,
+                      language_confidence: float, tier: QualityTier) -> Dict:
+        segment_texts = []
+        now = datetime.now(timezone.utc)
+
+        for raw in texts:
+            text = self.post_process_text(raw)
+            if not text:
+                continue
+            self.save_to_file(meeting_id, text, now)
+            logger.debug(f"Transcript [{now.strftime('%H:%M:%S')}] {meeting_id}: {text}")
+            segment_texts.append(text)
+
+        combined_text = " ".join(segment_texts)
+        return {
+            'type': 'transcript',
+            'segments_processed': len(segment_texts),
+            'audio_duration': audio_duration,
+            'language_confidence': language_confidence,
+            'quality': tier.name,
+            'text': combined_text,
+        }
 
     def transcribe_audio(self, audio_np: np.ndarray, meeting_id: str) -> Optional[Dict]:
         if not self.is_ready() or len(audio_np) == 0:
             return None
 
+        tier = self.tier
         try:
-            audio_data = audio_np.astype(np.float32)
-            max_val = np.abs(audio_data).max()
-            if max_val > 1.0:
-                audio_data = audio_data / max_val
-
-            segments, info = self.model.transcribe(
-                audio_data,
-                language="en",
-                task="transcribe",
-                # VAD
-                vad_filter=True,
-                vad_parameters=dict(
-                    min_silence_duration_ms=500,  # Minimum silence before split
-                    threshold=0.5,                # Voice activity threshold
-                ),
-                # Quality
-                beam_size=3,                    # Balance between speed and accuracy
-                temperature=0.0,                # More focused transcription
-                compression_ratio_threshold=2.4,  # Filter out repetitive segments
-                log_prob_threshold=-1.0,        # Filter low-confidence segments
-                no_speech_threshold=0.6,        # Filter silence
-                # Context
-                condition_on_previous_text=True,
-                # Segment length
-                word_timestamps=True,           # Get word-level timestamps
-            )
-
-            segment_texts = []
-            now = datetime.now(timezone.utc)
-
-            for segment in segments:
-                text = self.post_process_text(segment.text)
-                if not text:
-                    continue
-                self.save_to_file(meeting_id, text, now)
-                print(f"Transcript [{now.strftime('%H:%M:%S')}]: {text}")
-                segment_texts.append(text)
-
-            combined_text = " ".join(segment_texts)
-            return {
-                'type': 'transcript',
-                'segments_processed': len(segment_texts),
-                'audio_duration': len(audio_data) / 16000,
-                'language_confidence': info.language_probability,
-                'text': combined_text,
-            }
+            audio_data = self._prepare_audio(audio_np)
+
+            with self._replica() as replica:
+                segments, info = replica.for_tier(tier).model.transcribe(
+                    audio_data,
+                    language="en",
+                    task="transcribe",
+                    # VAD
+                    vad_filter=self.internal_vad,
+                    vad_parameters=dict(
+                        min_silence_duration_ms=500,  # Minimum silence before split
+                        threshold=0.5,                # Voice activity threshold
+                    ),
+                    # Quality
+                    beam_size=tier.beam_size,       # Balance between speed and accuracy
+                    temperature=0.0,                # More focused transcription
+                    compression_ratio_threshold=2.4,  # Filter out repetitive segments
+                    log_prob_threshold=-1.0,        # Filter low-confidence segments
+                    no_speech_threshold=0.6,        # Filter silence
+                    # Context
+                    condition_on_previous_text=True,
+                    # Segment length
+                    word_timestamps=tier.word_timestamps,  # Word-level timestamps
+                )
+
+                # Segments decode lazily, so the replica is held while iterating
+                texts = [segment.text for segment in segments]
+            return self._build_result(
+                meeting_id, texts, len(audio_data) / 16000, info.language_probability, tier)
 
         except Exception:
             return None
 
-whisper_processor = WhisperProcessor()
\ No newline at end of file
+    def transcribe_words(self, audio_np: np.ndarray, prompt: str = "") -> Optional[List[Tuple[str, float, float]]]:
+        # Cheap greedy pass used for partial transcripts; nothing is saved.
+        # Skipped unless a replica is spare.
+        if not self.is_ready() or len(audio_np) == 0:
+            return None
+
+        try:
+            with self._replica(spare=True) as replica:
+                if replica is None:
+                    return None
+                segments, _ = replica.model.transcribe(
+                    self._prepare_audio(audio_np),
+                    language="en",
+                    task="transcribe",
+                    vad_filter=False,
+                    beam_size=1,
+                    temperature=0.0,
+                    condition_on_previous_text=False,
+                    initial_prompt=prompt or None,
+                    word_timestamps=True,
+                )
+                return [(word.word, word.start, word.end)
+                        for segment in segments for word in (segment.words or [])]
+        except Exception:
+            return None
+
+    def transcribe_batch(self, items: List[Tuple[np.ndarray, str]]) -> List[Optional[Dict]]:
+        # Phrases from different meetings are laid end to end and decoded as one
+        # batch, with clip_timestamps marking where each meeting's audio lives.
+        if self.batched_model is None or len(items) <= 1:
+            return [self.transcribe_audio(audio_np, meeting_id) for audio_np, meeting_id in items]
+
+        tier = self.tier
+        clips = []
+        bounds = []
+        offset = 0.0
+        for audio_np, _ in items:
+            audio_data = self._prepare_audio(audio_np) if len(audio_np) else audio_np
+            duration = len(audio_data) / 16000
+            clips.append(audio_data)
+            bounds.append((offset, offset + duration))
+            offset += duration
+
+        try:
+            with self._replica() as replica:
+                segments, info = replica.for_tier(tier).batched.transcribe(
+                    np.concatenate(clips).astype(np.float32),
+                    language="en",
+                    task="transcribe",
+                    vad_filter=False,
+                    clip_timestamps=[{"start": start, "end": end}
+                                     for start, end in bounds if end > start],
+                    batch_size=len(items),
+                    beam_size=tier.beam_size,
+                    temperature=0.0,
+                    compression_ratio_threshold=2.4,
+                    log_prob_threshold=-1.0,
+                    no_speech_threshold=0.6,
+                    word_timestamps=False,
+                )
+
+                texts: List[List[str]] = [[] for _ in items]
+                for segment in segments:
+                    for i, (start, end) in enumerate(bounds):
+                        if start <= segment.start < end:
+                            texts[i].append(segment.text)
+                            break
+        except Exception:
+            return [None] * len(items)
+
+        return [
+            self._build_result(meeting_id, texts[i], bounds[i][1] - bounds[i][0],
+                               info.language_probability, tier)
+            if bounds[i][1] > bounds[i][0] else None
+            for i, (_, meeting_id) in enumerate(items)
+        ]
+
+whisper_processor = WhisperProcessor(
+    model_name=os.environ.get("ASR_MODEL", "base.en"),
+    device=os.environ.get("ASR_DEVICE", "auto"),
+    compute_type=os.environ.get("ASR_COMPUTE_TYPE") or None,
+    cpu_threads=int(os.environ.get("ASR_CPU_THREADS", "0")) or None,
+    replicas=int(os.environ.get("ASR_MODEL_REPLICAS", "1")),
+    internal_vad=os.environ.get("ASR_INTERNAL_VAD", "1") == "1",
+    tiers=parse_tiers(os.environ.get("ASR_QUALITY_TIERS"))
+    if os.environ.get("ASR_QUALITY_GOVERNOR", "0") == "1" else None,
+)
@@ -1,40 +1,121 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 import websockets
 import asyncio
 import logging
-from typing import Dict, Optional, Callable, Awaitable
-import os
+import zlib
+from typing import Dict, List, Optional, Callable, Awaitable, Set
 import json
+import numpy as np
+from apps.services.orchestrator.audio_framing import encode_frame, framing_offer, pack_mux
 
 logger = logging.getLogger(__name__)
 
 BroadcastCallback = Callable[[str, str], Awaitable[None]]
+ThrottleCallback = Callable[[str, str], Awaitable[None]]
+
+BYTES_PER_MS = 16000 * 2 // 1000
+
+
+class AudioStream:
+    # Per-meeting coalescing state for audio headed to the ASR service
+    __slots__ = ("buffer", "seq", "sample_offset", "encoding", "flush_handle", "credit",
+                 "pressure", "silence_run")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.seq = 0
+        self.sample_offset = 0
+        # None until the ASR service accepts framing; raw PCM is sent meanwhile
+        self.encoding: Optional[str] = None
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        # Bytes the ASR service will still accept on a multiplexed stream;
+        # None means the transport has no flow control
+        self.credit: Optional[int] = None
+        # Inference backlog last advertised by the ASR service for this meeting
+        self.pressure = "ok"
+        # Bytes of consecutive silence received while under pressure
+        self.silence_run = 0
 
 
 class ASRClient:
-    def __init__(self, asr_service_url: str = None):
+    # Under "high" pressure audio is sent in coalesce_factor times larger
+    # batches and silence beyond silence_hangover_ms is not sent at all; the
+    # hangover still lets the ASR side end the phrase. Under "critical"
+    # pressure nothing is sent and the buffer is capped at max_buffer_ms.
+
+    def __init__(self, asr_service_url: str = None, batch_ms: int = None,
+                 max_delay_ms: int = None, encoding: str = None, max_buffer_ms: int = None,
+                 coalesce_factor: int = None, silence_rms: float = None,
+                 silence_hangover_ms: int = None):
         if asr_service_url is None:
             asr_service_url = os.environ.get("ASR_SERVICE_URL")
         if not asr_service_url:
             raise ValueError("ASR_SERVICE_URL environment variable is not set")
         self.asr_service_url = asr_service_url
         self.connections: Dict[str, websockets.WebSocketClientProtocol] = {}
+        self.streams: Dict[str, AudioStream] = {}
         self._broadcast_callback: Optional[BroadcastCallback] = None
 
+        if batch_ms is None:
+            batch_ms = int(os.environ.get("ASR_AUDIO_BATCH_MS", "160"))
+        if max_delay_ms is None:
+            max_delay_ms = int(os.environ.get("ASR_AUDIO_MAX_DELAY_MS", "200"))
+        self.batch_bytes = max(2, batch_ms * BYTES_PER_MS)
+        self.max_delay = max_delay_ms / 1000
+        self.encoding = encoding or os.environ.get("ASR_AUDIO_ENCODING", "pcm16")
+        if max_buffer_ms is None:
+            max_buffer_ms = int(os.environ.get("ASR_AUDIO_MAX_BUFFER_MS", "5000"))
+        self.max_buffer_bytes = max(self.batch_bytes, max_buffer_ms * BYTES_PER_MS)
+        self.dropped_bytes = 0
+
+        if coalesce_factor is None:
+            coalesce_factor = int(os.environ.get("ASR_PRESSURE_COALESCE_FACTOR", "4"))
+        if silence_rms is None:
+            silence_rms = float(os.environ.get("ASR_SILENCE_RMS", "100"))
+        if silence_hangover_ms is None:
+            silence_hangover_ms = int(os.environ.get("ASR_SILENCE_HANGOVER_MS", "800"))
+        self.coalesce_factor = max(1, coalesce_factor)
+        self.silence_rms = silence_rms
+        self.silence_hangover_bytes = silence_hangover_ms * BYTES_PER_MS
+        self.shed_bytes = 0
+        self._throttle_callback: Optional[ThrottleCallback] = None
+
     def set_broadcast_callback(self, cb: BroadcastCallback):
         self._broadcast_callback = cb
 
+    def set_throttle_callback(self, cb: ThrottleCallback):
+        self._throttle_callback = cb
+
+    def buffered_bytes(self) -> int:
+        return sum(len(stream.buffer) for stream in list(self.streams.values()))
+
+    def flow_stats(self) -> Dict[str, int]:
+        streams = list(self.streams.values())
+        return {
+            "buffered_bytes": sum(len(stream.buffer) for stream in streams),
+            "dropped_bytes": self.dropped_bytes,
+            "shed_bytes": self.shed_bytes,
+            "throttled_meetings": sum(1 for stream in streams if stream.pressure != "ok"),
+        }
+
     async def connect_to_meeting(self, meeting_id: str) -> bool:
         if meeting_id in self.connections and not self.connections[meeting_id].closed:
             return True
         try:
             logger.info(f"Connecting to ASR service at {self.asr_service_url}/process/{meeting_id}")
             ws_url = f"{self.asr_service_url}/process/{meeting_id}"
-            self.connections[meeting_id] = await websockets.connect(ws_url)
+            ws = await websockets.connect(ws_url)
+            self.connections[meeting_id] = ws
+            stream = self.streams[meeting_id] = AudioStream()
 
-            await self.connections[meeting_id].send(json.dumps({
+            await ws.send(json.dumps({
                 "type": "identify",
-                "clientId": f"asr_service_{meeting_id}"
+                "clientId": f"asr_service_{meeting_id}",
+                "framing": framing_offer(self.encoding),
             }))
+            await self._negotiate(meeting_id, ws, stream)
 
             asyncio.create_task(self.listen_for_messages(meeting_id))
             logger.info(f"Connected to ASR service for meeting {meeting_id}")
@@ -44,11 +125,114 @@ class ASRClient:
                 f"Failed to connect to ASR service for meeting {meeting_id}: {e}")
             return False
 
+    async def _negotiate(self, meeting_id: str, ws, stream: AudioStream, timeout: float = 1.0):
+        # Older ASR services never answer, in which case raw PCM is kept
+        try:
+            reply = await asyncio.wait_for(ws.recv(), timeout)
+        except asyncio.TimeoutError:
+            return
+        try:
+            data = json.loads(reply)
+        except Exception:
+            data = {}
+        if data.get("type") == "protocol":
+            stream.encoding = data.get("encoding", "pcm16")
+        elif self._broadcast_callback:
+            await self._broadcast_callback(meeting_id, reply)
+
     async def send_audio(self, meeting_id: str, audio_bytes: bytes) -> bool:
-        if meeting_id not in self.connections and not await self.connect_to_meeting(meeting_id):
+        if meeting_id not in self.streams and not await self.connect_to_meeting(meeting_id):
+            return False
+        stream = self.streams.get(meeting_id)
+        if stream is None:
+            return False
+
+        if stream.pressure != "ok" and self._shed_silence(stream, audio_bytes):
+            self.shed_bytes += len(audio_bytes)
+            return True
+
+        stream.buffer += audio_bytes
+        overflow = len(stream.buffer) - self.max_buffer_bytes
+        if overflow > 0:
+            # Held back by flow control for too long; drop the oldest audio. The
+            # sample offset still advances so the ASR side fills the gap with silence.
+            overflow += overflow % 2
+            del stream.buffer[:overflow]
+            stream.sample_offset += overflow // 2
+            if self.dropped_bytes == 0:
+                logger.warning(f"ASR stream for meeting {meeting_id} is backed up; dropping audio")
+            self.dropped_bytes += overflow
+        factor = 1 if stream.pressure == "ok" else self.coalesce_factor
+        if len(stream.buffer) >= self.batch_bytes * factor:
+            return await self.flush_audio(meeting_id)
+        if stream.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            stream.flush_handle = loop.call_later(
+                self.max_delay * factor, lambda: asyncio.create_task(self.flush_audio(meeting_id)))
+        return True
+
+    def _shed_silence(self, stream: AudioStream, audio_bytes: bytes) -> bool:
+        # The sample offset is not advanced for shed audio: the ASR side sees
+        # the hangover followed directly by the next speech
+        samples = np.frombuffer(audio_bytes, dtype=np.int16, count=len(audio_bytes) // 2)
+        if len(samples) == 0:
+            return False
+        if np.sqrt(np.square(samples, dtype=np.float32).mean()) >= self.silence_rms:
+            stream.silence_run = 0
+            return False
+        stream.silence_run += len(audio_bytes)
+        return stream.silence_run > self.silence_hangover_bytes
+
+    async def _apply_pressure(self, meeting_id: str, level: str):
+        stream = self.streams.get(meeting_id)
+        if stream is None or stream.pressure == level:
+            return
+        logger.info(f"ASR pressure for meeting {meeting_id}: {stream.pressure} -> {level}")
+        stream.pressure = level
+        stream.silence_run = 0
+        if self._throttle_callback:
+            try:
+                await self._throttle_callback(meeting_id, level)
+            except Exception as e:
+                logger.error(f"Failed to report throttling for meeting {meeting_id}: {e}")
+        if level != "critical" and stream.buffer:
+            await self.flush_audio(meeting_id)
+
+    async def flush_audio(self, meeting_id: str) -> bool:
+        stream = self.streams.get(meeting_id)
+        if stream is None:
+            return False
+        if stream.flush_handle is not None:
+            stream.flush_handle.cancel()
+            stream.flush_handle = None
+
+        # Keep whole int16 samples; an odd trailing byte waits for the next chunk
+        size = len(stream.buffer) - len(stream.buffer) % 2
+        if size == 0:
+            return True
+        if stream.credit is not None and stream.credit <= 0:
+            # Out of credit; audio waits in the buffer until the ASR side grants more
+            return True
+        if stream.pressure == "critical":
+            # Paused until the ASR side reports its backlog has come down
+            return True
+        pcm = bytes(stream.buffer[:size])
+        del stream.buffer[:size]
+
+        if stream.encoding is None:
+            payload = pcm
+        else:
+            payload = encode_frame(stream.seq, stream.sample_offset, pcm, stream.encoding)
+            stream.seq += 1
+        stream.sample_offset += size // 2
+        return await self._send_payload(meeting_id, stream, payload)
+
+    async def _send_payload(self, meeting_id: str, stream: AudioStream, payload: bytes) -> bool:
+        ws = self.connections.get(meeting_id)
+        if ws is None:
             return False
         try:
-            await self.connections[meeting_id].send(audio_bytes)
+            await ws.send(payload)
             return True
         except Exception as e:
             await self.disconnect_meeting(meeting_id)
@@ -60,6 +244,13 @@ class ASRClient:
             return
         try:
             async for message in ws:
+                try:
+                    data = json.loads(message)
+                except (TypeError, ValueError):
+                    data = None
+                if isinstance(data, dict) and data.get("type") == "pressure":
+                    await self._apply_pressure(meeting_id, data.get("level", "ok"))
+                    continue
                 if self._broadcast_callback:
                     await self._broadcast_callback(meeting_id, message)
         except Exception as e:
@@ -68,6 +259,9 @@ class ASRClient:
             await self.disconnect_meeting(meeting_id)
 
     async def disconnect_meeting(self, meeting_id: str):
+        stream = self.streams.pop(meeting_id, None)
+        if stream is not None and stream.flush_handle is not None:
+            stream.flush_handle.cancel()
         ws = self.connections.pop(meeting_id, None)
         if ws:
             try:
@@ -75,5 +269,192 @@ class ASRClient:
             except:
                 pass
 
+    async def close(self):
+        for meeting_id in list(self.streams):
+            await self.disconnect_meeting(meeting_id)
+
+
+class MuxConnection:
+    # One long-lived websocket to the ASR service's /mux endpoint. It
+    # reconnects with backoff and reopens every stream it was carrying.
+
+    def __init__(self, client: "ASRMuxClient", url: str, index: int,
+                 reconnect_delay: float = 0.5, max_reconnect_delay: float = 10.0):
+        self.client = client
+        self.url = url
+        self.index = index
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.meetings: Set[str] = set()
+        self.ws = None
+        self.connects = 0
+        self._connected: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._connected = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def wait_connected(self, timeout: float) -> bool:
+        self.start()
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def send(self, payload) -> bool:
+        ws = self.ws
+        if ws is None:
+            return False
+        try:
+            await ws.send(payload)
+            return True
+        except Exception as e:
+            logger.warning(f"ASR mux connection {self.index} send failed: {e}")
+            return False
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    self.ws = ws
+                    self.connects += 1
+                    delay = self.reconnect_delay
+                    logger.info(f"ASR mux connection {self.index} established "
+                                f"({len(self.meetings)} stream(s) to reopen)")
+                    for meeting_id in list(self.meetings):
+                        await self.client._send_open(self, meeting_id)
+                    self._connected.set()
+                    async for message in ws:
+                        await self.client._on_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"ASR mux connection {self.index} lost: {e}")
+            finally:
+                self.ws = None
+                self._connected.clear()
+                # Hold audio while reconnecting; the reopen grants fresh credit
+                for meeting_id in self.meetings:
+                    stream = self.client.streams.get(meeting_id)
+                    if stream is not None:
+                        stream.credit = 0
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+
+class ASRMuxClient(ASRClient):
+    # Carries every meeting over a fixed pool of multiplexed connections
+    # instead of one websocket and listener task per meeting.
+
+    def __init__(self, asr_service_url: str = None, pool_size: int = None,
+                 open_timeout: float = 2.0, **kwargs):
+        super().__init__(asr_service_url, **kwargs)
+        if pool_size is None:
+            pool_size = int(os.environ.get("ASR_MUX_CONNECTIONS", "2"))
+        self.open_timeout = open_timeout
+        self.pool: List[MuxConnection] = [
+            MuxConnection(self, f"{self.asr_service_url}/mux", i)
+            for i in range(max(1, pool_size))
+        ]
+        self._opening: Dict[str, asyncio.Future] = {}
+
+    def _connection_for(self, meeting_id: str) -> MuxConnection:
+        return self.pool[zlib.crc32(meeting_id.encode("utf-8")) % len(self.pool)]
+
+    async def connect_to_meeting(self, meeting_id: str) -> bool:
+        if meeting_id in self.streams:
+            return True
+        conn = self._connection_for(meeting_id)
+        if not await conn.wait_connected(self.open_timeout):
+            logger.error(f"No ASR mux connection available for meeting {meeting_id}")
+            return False
+
+        stream = self.streams[meeting_id] = AudioStream()
+        stream.credit = 0
+        conn.meetings.add(meeting_id)
+        opened = self._opening[meeting_id] = asyncio.get_running_loop().create_future()
+        try:
+            if await self._send_open(conn, meeting_id):
+                await asyncio.wait_for(opened, self.open_timeout)
+                logger.info(f"Opened ASR stream for meeting {meeting_id} on connection {conn.index}")
+                return True
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._opening.pop(meeting_id, None)
+        logger.error(f"Failed to open ASR stream for meeting {meeting_id}")
+        self.streams.pop(meeting_id, None)
+        conn.meetings.discard(meeting_id)
+        return False
+
+    async def _send_open(self, conn: MuxConnection, meeting_id: str) -> bool:
+        stream = self.streams.get(meeting_id)
+        if stream is not None:
+            # No audio until the ASR side grants credit for the (re)opened stream
+            stream.credit = 0
+        return await conn.send(json.dumps({
+            "type": "open",
+            "meeting_id": meeting_id,
+            "framing": framing_offer(self.encoding),
+        }))
+
+    async def _on_message(self, message: str):
+        try:
+            data = json.loads(message)
+        except Exception:
+            logger.warning("Ignoring malformed message on ASR mux connection")
+            return
+        meeting_id = data.get("meeting_id")
+        stream = self.streams.get(meeting_id)
+        kind = data.get("type")
+
+        if kind == "credit":
+            if stream is not None:
+                stream.credit += int(data.get("bytes", 0))
+                if stream.buffer and stream.flush_handle is None:
+                    await self.flush_audio(meeting_id)
+        elif kind == "opened":
+            if stream is not None:
+                stream.encoding = data.get("encoding")
+                stream.credit = int(data.get("credit", 0))
+            opened = self._opening.get(meeting_id)
+            if opened is not None and not opened.done():
+                opened.set_result(True)
+            if stream is not None and stream.buffer:
+                await self.flush_audio(meeting_id)
+        elif kind == "pressure":
+            await self._apply_pressure(meeting_id, data.get("level", "ok"))
+        elif meeting_id and self._broadcast_callback:
+            await self._broadcast_callback(meeting_id, message)
+
+    async def _send_payload(self, meeting_id: str, stream: AudioStream, payload: bytes) -> bool:
+        data = pack_mux(meeting_id, payload)
+        if not await self._connection_for(meeting_id).send(data):
+            return False
+        stream.credit -= len(data)
+        return True
+
+    async def disconnect_meeting(self, meeting_id: str):
+        stream = self.streams.pop(meeting_id, None)
+        if stream is None:
+            return
+        if stream.flush_handle is not None:
+            stream.flush_handle.cancel()
+        conn = self._connection_for(meeting_id)
+        conn.meetings.discard(meeting_id)
+        await conn.send(json.dumps({"type": "close", "meeting_id": meeting_id}))
 
-asr_client = ASRClient()
+    async def close(self):
+        await super().close()
+        for conn in self.pool:
+            await conn.stop()
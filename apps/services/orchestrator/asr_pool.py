@@ -0,0 +1,204 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional
+from apps.services.orchestrator.asr_client import ASRClient, ASRMuxClient, BroadcastCallback, ThrottleCallback
+
+logger = logging.getLogger(__name__)
+
+
+def load_weight(load: Dict[str, Any]) -> float:
+    # Busy instances (many sessions decoding slowly, or a backed-up inference
+    # queue) attract proportionally fewer new meetings
+    rtf = max(float(load.get("rtf") or 0.0), 0.05)
+    pressure = load.get("sessions", 0) * rtf + load.get("queue_depth", 0)
+    return 1.0 / (1.0 + pressure)
+
+
+def rendezvous_score(meeting_id: str, url: str, weight: float) -> float:
+    # Weighted rendezvous hashing: removing an instance only moves its own meetings
+    digest = hashlib.blake2b(f"{meeting_id}|{url}".encode("utf-8"), digest_size=8).digest()
+    u = (int.from_bytes(digest, "big") + 0.5) / 2 ** 64
+    return -weight / math.log(u)
+
+
+class ASREndpoint:
+
+    def __init__(self, url: str, client: ASRClient):
+        self.url = url
+        self.client = client
+        self.alive = True
+        self.failures = 0
+        self.load: Dict[str, Any] = {}
+        self.weight = 1.0
+
+    @property
+    def load_url(self) -> str:
+        base = self.url.replace("wss://", "https://", 1).replace("ws://", "http://", 1)
+        return f"{base.rstrip('/')}/load"
+
+
+class ShardedASRClient:
+    # Spreads meetings over several ASR instances. A meeting stays on the
+    # instance it was placed on; instances that stop answering /load are
+    # marked dead and their meetings are re-placed on the survivors.
+
+    def __init__(self, urls: List[str], make_client: Callable[[str], ASRClient] = None,
+                 poll_interval: float = None, poll_timeout: float = 1.0, max_failures: int = 2):
+        if not urls:
+            raise ValueError("At least one ASR endpoint is required")
+        make_client = make_client or ASRClient
+        self.endpoints = [ASREndpoint(url, make_client(url)) for url in urls]
+        if poll_interval is None:
+            poll_interval = float(os.environ.get("ASR_LOAD_POLL_INTERVAL", "2.0"))
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+        self.max_failures = max_failures
+        self.placements: Dict[str, ASREndpoint] = {}
+        self.failovers = 0
+        self._poller: Optional[asyncio.Task] = None
+
+    def set_broadcast_callback(self, cb: BroadcastCallback):
+        for endpoint in self.endpoints:
+            endpoint.client.set_broadcast_callback(cb)
+
+    def set_throttle_callback(self, cb: ThrottleCallback):
+        for endpoint in self.endpoints:
+            endpoint.client.set_throttle_callback(cb)
+
+    def start(self):
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll())
+
+    def rank(self, meeting_id: str) -> List[ASREndpoint]:
+        alive = [e for e in self.endpoints if e.alive]
+        return sorted(alive, key=lambda e: rendezvous_score(meeting_id, e.url, e.weight),
+                      reverse=True)
+
+    async def connect_to_meeting(self, meeting_id: str) -> bool:
+        self.start()
+        endpoint = self.placements.get(meeting_id)
+        if endpoint is not None and meeting_id in endpoint.client.streams:
+            return True
+        for endpoint in self.rank(meeting_id):
+            if await endpoint.client.connect_to_meeting(meeting_id):
+                self.placements[meeting_id] = endpoint
+                logger.info(f"Placed meeting {meeting_id} on ASR instance {endpoint.url}")
+                return True
+            logger.warning(f"ASR instance {endpoint.url} refused meeting {meeting_id}")
+        self.placements.pop(meeting_id, None)
+        return False
+
+    async def send_audio(self, meeting_id: str, audio_bytes: bytes) -> bool:
+        endpoint = self.placements.get(meeting_id)
+        if endpoint is None or meeting_id not in endpoint.client.streams:
+            if not await self.connect_to_meeting(meeting_id):
+                return False
+            endpoint = self.placements[meeting_id]
+        return await endpoint.client.send_audio(meeting_id, audio_bytes)
+
+    async def flush_audio(self, meeting_id: str) -> bool:
+        endpoint = self.placements.get(meeting_id)
+        return endpoint is not None and await endpoint.client.flush_audio(meeting_id)
+
+    async def disconnect_meeting(self, meeting_id: str):
+        endpoint = self.placements.pop(meeting_id, None)
+        if endpoint is not None:
+            await endpoint.client.disconnect_meeting(meeting_id)
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+        for endpoint in self.endpoints:
+            await endpoint.client.close()
+
+    def buffered_bytes(self) -> int:
+        return sum(e.client.buffered_bytes() for e in self.endpoints)
+
+    def flow_stats(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for endpoint in self.endpoints:
+            for key, value in endpoint.client.flow_stats().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "failovers": self.failovers,
+            "endpoints": [{
+                "url": e.url,
+                "alive": e.alive,
+                "weight": round(e.weight, 3),
+                "meetings": sum(1 for p in self.placements.values() if p is e),
+                "load": e.load,
+            } for e in self.endpoints],
+        }
+
+    def _fetch_load(self, endpoint: ASREndpoint) -> Dict[str, Any]:
+        with urllib.request.urlopen(endpoint.load_url, timeout=self.poll_timeout) as response:
+            return json.loads(response.read())
+
+    async def _probe(self, endpoint: ASREndpoint):
+        try:
+            endpoint.load = await asyncio.to_thread(self._fetch_load, endpoint)
+        except Exception as e:
+            endpoint.failures += 1
+            if endpoint.alive and endpoint.failures >= self.max_failures:
+                logger.error(f"ASR instance {endpoint.url} is unreachable: {e}")
+                endpoint.alive = False
+                await self._failover(endpoint)
+            return
+        endpoint.failures = 0
+        endpoint.weight = load_weight(endpoint.load)
+        if not endpoint.alive:
+            logger.info(f"ASR instance {endpoint.url} is back")
+            endpoint.alive = True
+
+    async def _failover(self, dead: ASREndpoint):
+        moved = [m for m, endpoint in self.placements.items() if endpoint is dead]
+        for meeting_id in moved:
+            self.placements.pop(meeting_id, None)
+            try:
+                await dead.client.disconnect_meeting(meeting_id)
+            except Exception:
+                pass
+            if await self.connect_to_meeting(meeting_id):
+                self.failovers += 1
+            else:
+                logger.error(f"No ASR instance available for meeting {meeting_id}")
+        if moved:
+            logger.warning(f"Moved {len(moved)} meeting(s) off ASR instance {dead.url}")
+
+    async def _poll(self):
+        while True:
+            await asyncio.gather(*(self._probe(e) for e in self.endpoints))
+            await asyncio.sleep(self.poll_interval)
+
+
+def create_asr_client():
+    # ASR_SERVICE_URLS (comma separated) shards meetings across instances.
+    # One websocket per meeting by default, which every ASR version accepts;
+    # ASR_MUX_CONNECTIONS > 0 multiplexes meetings over that many connections
+    # and needs ASR instances that serve /mux.
+    urls = [u.strip() for u in os.environ.get("ASR_SERVICE_URLS", "").split(",") if u.strip()]
+    pool_size = int(os.environ.get("ASR_MUX_CONNECTIONS", "0"))
+
+    def make_client(url: str = None) -> ASRClient:
+        if pool_size > 0:
+            return ASRMuxClient(url, pool_size=pool_size)
+        return ASRClient(url)
+
+    if len(urls) > 1:
+        return ShardedASRClient(urls, make_client)
+    return make_client(urls[0] if urls else None)
+
+
+asr_client = create_asr_client()
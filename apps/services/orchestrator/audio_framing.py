@@ -0,0 +1,48 @@
+import struct
+
+import numpy as np
+
+# Mirrors the frame layout decoded by the ASR service's audio_framing.py:
+#   magic "VA" | version u8 | encoding u8 | sequence u32 | sample offset u64 | payload
+HEADER = struct.Struct("!2sBBIQ")
+MAGIC = b"VA"
+VERSION = 1
+
+# Binary messages on a multiplexed connection are prefixed with their meeting:
+#   id length u8 | meeting_id (utf-8) | audio frame or raw PCM
+MUX_TAG = struct.Struct("!B")
+
+ENCODINGS = {"pcm16": 0, "mulaw": 1}
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 32635
+
+
+def mulaw_encode(pcm: np.ndarray) -> np.ndarray:
+    x = pcm.astype(np.int32)
+    sign = (x < 0).astype(np.int32)
+    x = np.minimum(np.abs(x), _MULAW_CLIP) + _MULAW_BIAS
+    exponent = np.floor(np.log2(x)).astype(np.int32) - 7
+    mantissa = (x >> (exponent + 3)) & 0x0F
+    return (~((sign << 7) | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def encode_frame(seq: int, sample_offset: int, pcm_bytes: bytes, encoding: str = "pcm16") -> bytes:
+    code = ENCODINGS[encoding]
+    if code == ENCODINGS["mulaw"]:
+        payload = mulaw_encode(np.frombuffer(pcm_bytes, dtype="<i2")).tobytes()
+    else:
+        payload = pcm_bytes
+    return HEADER.pack(MAGIC, VERSION, code, seq & 0xFFFFFFFF, sample_offset) + payload
+
+
+def framing_offer(encoding: str = "pcm16") -> dict:
+    encodings = [encoding] + [name for name in ENCODINGS if name != encoding]
+    return {"version": VERSION, "encodings": encodings}
+
+
+def pack_mux(meeting_id: str, payload: bytes) -> bytes:
+    tag = meeting_id.encode("utf-8")
+    if not 0 < len(tag) < 256:
+        raise ValueError(f"Cannot tag meeting id of {len(tag)} bytes")
+    return MUX_TAG.pack(len(tag)) + tag + payload
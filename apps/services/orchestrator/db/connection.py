@@ -1,5 +1,10 @@
 import os
+import asyncio
+import functools
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
 
 try:
     from pymongo.mongo_client import MongoClient
@@ -12,7 +17,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
 MONGODB_URI = os.getenv("MONGODB_URI")
@@ -23,22 +28,128 @@ DB_NAME = os.getenv("DB_NAME")
 if not DB_NAME:
     raise ValueError("DB_NAME environment variable is not set")
 
-if ServerApi is not None:
-    client = MongoClient(MONGODB_URI, server_api=ServerApi('1'), serverSelectionTimeoutMS=5000)
-else:
-    client = MongoClient(MONGODB_URI)
+# Every database call from the event loop runs on this many threads; the
+# driver's connection pool is sized to match so no thread waits on a socket
+DB_THREADS = int(os.environ.get("MONGO_THREADS", "8"))
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", str(DB_THREADS + 4)))
+
+# Created on first use (or in the app's lifespan), not at import
+client = None
+_owns_client = False
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_client():
+    global client, _owns_client
+    if client is None:
+        if ServerApi is not None:
+            client = MongoClient(MONGODB_URI, server_api=ServerApi('1'),
+                                 serverSelectionTimeoutMS=5000, maxPoolSize=MONGO_MAX_POOL_SIZE)
+        else:
+            client = MongoClient(MONGODB_URI)
+        _owns_client = True
+    return client
 
 def connect_to_mongodb():
     try:
-        client.admin.command('ping')
+        mongo = get_client()
+        mongo.admin.command('ping')
         logger.info("Connected to MongoDB")
-        return client
+        return mongo
     except Exception as e:
         logger.error(f"Could not connect to MongoDB: {e}")
         return None
-    
+
 def get_db():
-    return client[DB_NAME]
+    return get_client()[DB_NAME]
+
+
+def _db_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="mongo")
+    return _executor
+
+async def run_db(fn: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor(), functools.partial(fn, *args, **kwargs))
+
+def in_db_pool(fn: Callable) -> Callable:
+    # Async counterpart of a blocking data-access function
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_db(fn, *args, **kwargs)
+    return wrapper
+
+async def iterate_in_db_pool(rows: Iterable, batch_size: int = 500) -> AsyncIterator:
+    # Drains a blocking cursor a batch per pool call, so streaming a long
+    # result never holds a thread between batches
+    iterator = iter(rows)
+
+    def next_batch():
+        batch = []
+        for row in iterator:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                break
+        return batch
+
+    while True:
+        batch = await run_db(next_batch)
+        for row in batch:
+            yield row
+        if len(batch) < batch_size:
+            return
+
+async def open_db():
+    _db_executor()
+    if await run_db(connect_to_mongodb) is not None:
+        db_health.record(True)
+
+async def close_db():
+    global _executor, client, _owns_client
+    executor, _executor = _executor, None
+    if executor is not None:
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+    if _owns_client and client is not None:
+        client.close()
+        client = None
+        _owns_client = False
+
+
+class HealthCache:
+    # /health is polled by load balancers and orchestration; the ping result
+    # is reused for ttl seconds and concurrent probes share one ping
+
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self.healthy = False
+        self.checked_at = float("-inf")
+        self.pings = 0
+        self._inflight: Optional[asyncio.Future] = None
+
+    def record(self, healthy: bool):
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+
+    async def check(self) -> bool:
+        if time.monotonic() - self.checked_at < self.ttl:
+            return self.healthy
+        loop = asyncio.get_running_loop()
+        if self._inflight is None or self._inflight.get_loop() is not loop:
+            self._inflight = asyncio.ensure_future(self._ping())
+        return await asyncio.shield(self._inflight)
+
+    async def _ping(self) -> bool:
+        try:
+            self.pings += 1
+            self.record(await run_db(connect_to_mongodb) is not None)
+            return self.healthy
+        finally:
+            self._inflight = None
+
+
+db_health = HealthCache(ttl=float(os.environ.get("HEALTH_CACHE_SECONDS", "5")))
 
 if __name__ == "__main__":
-    connect_to_mongodb()
\ No newline at end of file
+    connect_to_mongodb()
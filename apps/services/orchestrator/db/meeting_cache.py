@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Stored for ids Mongo doesn't know, so polling for them stays off the database
+_MISSING = object()
+
+
+class MeetingCache:
+    # TTL + LRU cache of meeting metadata in front of get_meeting_by_id.
+    # Writers invalidate explicitly; the TTL only bounds staleness from
+    # writes made by other processes.
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0, negative_ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Each invalidation stamps its meeting with a fresh counter value, so a
+        # lookup that raced a write to that meeting is not cached while lookups
+        # of other meetings are unaffected. Stamps are kept for the most recent
+        # max_entries invalidations; older meetings share _floor.
+        self._counter = 0
+        self._stamps: "OrderedDict[str, int]" = OrderedDict()
+        self._floor = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+
+    def generation(self, meeting_id: str) -> int:
+        with self._lock:
+            return self._stamps.get(meeting_id, self._floor)
+
+    def get(self, meeting_id: str) -> Tuple[bool, Optional[Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(meeting_id)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[meeting_id]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(meeting_id)
+            self.hits += 1
+            if entry[0] is _MISSING:
+                self.negative_hits += 1
+                return True, None
+            return True, entry[0]
+
+    def put(self, meeting_id: str, meeting: Optional[Any], generation: int = None):
+        ttl = self.ttl if meeting is not None else self.negative_ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._stamps.get(meeting_id, self._floor):
+                return
+            value = meeting if meeting is not None else _MISSING
+            self._entries[meeting_id] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(meeting_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, meeting_id: str):
+        with self._lock:
+            self._counter += 1
+            self._stamps[meeting_id] = self._counter
+            self._stamps.move_to_end(meeting_id)
+            while len(self._stamps) > max(self.max_entries, 1):
+                _, stamp = self._stamps.popitem(last=False)
+                self._floor = max(self._floor, stamp)
+            self._entries.pop(meeting_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._counter += 1
+            self._floor = self._counter
+            self._stamps.clear()
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+meeting_cache = MeetingCache(
+    max_entries=int(os.environ.get("MEETING_CACHE_SIZE", "10000")),
+    ttl=float(os.environ.get("MEETING_CACHE_TTL", "30")),
+    negative_ttl=float(os.environ.get("MEETING_CACHE_NEGATIVE_TTL", "5")),
+)
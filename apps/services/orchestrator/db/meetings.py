@@ -1,8 +1,10 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
-from datetime import datetime, timezone
-from apps.services.orchestrator.db.connection import get_db
+from datetime import datetime, timedelta, timezone
+from typing import List
+from apps.services.orchestrator.db.connection import get_db, in_db_pool, run_db
+from apps.services.orchestrator.db.meeting_cache import meeting_cache
 from apps.services.orchestrator.models.meeting import Meeting
 
 def create_meeting(title):
@@ -12,43 +14,99 @@ def create_meeting(title):
     )
     db = get_db()
     meetings_collection = db["meetings"]
-    meeting_dict = meeting.model_dump()
+    # expires_at only exists while a meeting is idle, keeping the reaper's index small
+    meeting_dict = meeting.model_dump(exclude={"expires_at"})
     meeting_dict["meeting_id"] = str(meeting_dict["meeting_id"])
     result = meetings_collection.insert_one(meeting_dict)
+    meeting_cache.invalidate(meeting_dict["meeting_id"])
     return meeting_dict["meeting_id"]
 
 def get_meeting_by_id(meeting_id: str):
+    found, meeting = meeting_cache.get(meeting_id)
+    if found:
+        return meeting
+    return _load_meeting(meeting_id)
+
+def _load_meeting(meeting_id: str):
+    # Reads through to Mongo and fills the cache; callers check it first
+    generation = meeting_cache.generation(meeting_id)
     db = get_db()
     meetings_collection = db["meetings"]
     doc = meetings_collection.find_one({"meeting_id": meeting_id})
-    if not doc:
-        return None
-    return Meeting(**doc)
+    meeting = Meeting(**doc) if doc else None
+    meeting_cache.put(meeting_id, meeting, generation)
+    return meeting
 
 def delete_meeting_by_id(meeting_id: str):
     db = get_db()
     meetings_collection = db["meetings"]
     result = meetings_collection.delete_one({"meeting_id": meeting_id})
+    meeting_cache.invalidate(meeting_id)
     return result.deleted_count
 
-def end_meeting_by_id(meeting_id: str):
+def end_meeting_by_id(meeting_id: str, expired_before: datetime = None):
+    # A single document write; phrases are not touched, readers get the end
+    # time from the meeting. With expired_before, only ends a meeting whose
+    # expiry is still set and due, so a client rejoining in between wins.
+    db = get_db()
+    meetings_collection = db["meetings"]
+    query = {"meeting_id": meeting_id}
+    if expired_before is not None:
+        query.update({"status": "active", "expires_at": {"$lte": expired_before}})
+    result = meetings_collection.update_one(
+        query,
+        {"$set": {"status": "ended", "ended_at": datetime.now(timezone.utc)},
+         "$unset": {"expires_at": ""}}
+    )
+    meeting_cache.invalidate(meeting_id)
+    return result.modified_count
+
+def schedule_meeting_expiry(meeting_id: str, delay_seconds: float):
+    db = get_db()
+    meetings_collection = db["meetings"]
+    result = meetings_collection.update_one(
+        {"meeting_id": meeting_id, "status": "active"},
+        {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)}}
+    )
+    meeting_cache.invalidate(meeting_id)
+    return result.modified_count
+
+def cancel_meeting_expiry(meeting_id: str):
     db = get_db()
     meetings_collection = db["meetings"]
-    ended_at = datetime.now(timezone.utc)
     result = meetings_collection.update_one(
-        {"meeting_id": meeting_id},
-        {"$set": {"status": "ended", "ended_at": ended_at}}
+        {"meeting_id": meeting_id, "expires_at": {"$exists": True}},
+        {"$unset": {"expires_at": ""}}
     )
     if result.modified_count:
-        try:
-            db["phrases"].update_many(
-                {"meeting_id": meeting_id},
-                {"$set": {"meeting_ended_at": ended_at}}
-            )
-        except Exception:
-            pass
+        meeting_cache.invalidate(meeting_id)
     return result.modified_count
 
+def get_expired_meeting_ids(now: datetime, limit: int = 100) -> List[str]:
+    # Served by the {status, expires_at} index
+    db = get_db()
+    meetings_collection = db["meetings"]
+    cursor = meetings_collection.find(
+        {"status": "active", "expires_at": {"$lte": now}},
+        {"_id": 0, "meeting_id": 1}
+    ).sort("expires_at", 1).limit(limit)
+    return [doc["meeting_id"] for doc in cursor]
+
+# Event-loop callers use these; the blocking calls run on the database thread pool
+create_meeting_async = in_db_pool(create_meeting)
+delete_meeting_by_id_async = in_db_pool(delete_meeting_by_id)
+end_meeting_by_id_async = in_db_pool(end_meeting_by_id)
+schedule_meeting_expiry_async = in_db_pool(schedule_meeting_expiry)
+cancel_meeting_expiry_async = in_db_pool(cancel_meeting_expiry)
+get_expired_meeting_ids_async = in_db_pool(get_expired_meeting_ids)
+
+async def get_meeting_by_id_async(meeting_id: str):
+    # Cache hits don't need a thread
+    found, meeting = meeting_cache.get(meeting_id)
+    if found:
+        return meeting
+    return await run_db(_load_meeting, meeting_id)
+
 if __name__ == "__main__":
     meeting_id = create_meeting(title="Test Meeting")
     print(f"Created meeting with ID: {meeting_id}")
\ No newline at end of file
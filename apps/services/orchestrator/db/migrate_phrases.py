@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+import argparse
+import logging
+from typing import Iterable, Optional
+from apps.services.orchestrator.db.connection import get_db
+from apps.services.orchestrator.db import phrase_buckets
+from apps.services.orchestrator.db.phrases import TRANSCRIPT_SORT
+
+logger = logging.getLogger(__name__)
+
+# Copies phrases from the one-document-per-phrase layout into phrase_buckets.
+# Bucket appends are idempotent, so an interrupted run can simply be started
+# again; source documents are only removed (--drop-source) once a meeting's
+# bucketed phrase count matches its source count.
+
+
+def migrate_meeting(meeting_id: str, batch_size: int = 1000, drop_source: bool = False) -> int:
+    phrases_collection = get_db()["phrases"]
+    # Each phrase keeps its _id as its bucket seq, so resume tokens (and
+    # summary watermarks) carry over to the new layout
+    cursor = phrases_collection.find({"meeting_id": meeting_id}).sort(
+        TRANSCRIPT_SORT).batch_size(batch_size)
+
+    copied = 0
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            copied += phrase_buckets.insert_phrases(batch)
+            batch = []
+    if batch:
+        copied += phrase_buckets.insert_phrases(batch)
+
+    bucketed = phrase_buckets.count_phrases(meeting_id)
+    source = phrases_collection.count_documents({"meeting_id": meeting_id})
+    if bucketed < source:
+        raise RuntimeError(f"Meeting {meeting_id}: {bucketed} bucketed phrases for {source} source phrases")
+    if drop_source:
+        phrases_collection.delete_many({"meeting_id": meeting_id})
+    logger.info(f"Meeting {meeting_id}: migrated {copied} phrases")
+    return copied
+
+def migrate(meeting_ids: Optional[Iterable[str]] = None, batch_size: int = 1000,
+            drop_source: bool = False) -> int:
+    if meeting_ids is None:
+        meeting_ids = get_db()["phrases"].distinct("meeting_id")
+    total = 0
+    for meeting_id in meeting_ids:
+        total += migrate_meeting(meeting_id, batch_size, drop_source)
+    logger.info(f"Migrated {total} phrases into {phrase_buckets.BUCKETS_COLLECTION}")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy phrases into the time-bucketed layout (PHRASE_STORAGE=buckets)")
+    parser.add_argument("--meeting", action="append", dest="meetings",
+                        help="migrate only this meeting (repeatable); all meetings by default")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--drop-source", action="store_true",
+                        help="delete each meeting's phrase documents once its buckets are verified")
+    args = parser.parse_args()
+    migrate(args.meetings, args.batch_size, args.drop_source)
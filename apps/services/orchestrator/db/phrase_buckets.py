@@ -0,0 +1,212 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+try:
+    from bson import ObjectId
+    from pymongo.errors import DuplicateKeyError
+except Exception:
+    from mongomock import DuplicateKeyError, ObjectId
+from apps.services.orchestrator.db.connection import get_db
+from apps.services.orchestrator.models.phrase import Phrase
+
+# Bucketed layout: one document per meeting per time window, with the window's
+# phrases appended to an array. A long meeting becomes a few hundred documents
+# instead of tens of thousands, so the {meeting_id, bucket_start} index stays
+# small and a full transcript read is one short index scan. Phrase ids are
+# not indexed (a multikey index would hold one key per phrase again), so
+# lookups by id are scoped to a meeting's buckets. Arrays are only ever
+# appended to, which keeps each phrase's position in its bucket stable.
+# Each phrase keeps the ObjectId it has (or would have) in the phrases
+# collection as `seq`, so both layouts order ties and resume alike.
+
+BUCKETS_COLLECTION = "phrase_buckets"
+BUCKET_SECONDS = int(os.environ.get("PHRASE_BUCKET_SECONDS", "300"))
+
+_EPOCH = datetime(1970, 1, 1)
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def bucket_start(created_at: datetime, window: int = BUCKET_SECONDS) -> datetime:
+    seconds = int((_naive_utc(created_at) - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % window)
+
+def _bucket_item(doc: dict) -> dict:
+    created_at = _naive_utc(doc["created_at"])
+    created_at = created_at.replace(microsecond=created_at.microsecond // 1000 * 1000)
+    return {
+        "seq": doc["_id"],
+        "phrase_id": str(doc["phrase_id"]),
+        "phrase": doc["phrase"],
+        "created_at": created_at,
+        "processed": doc.get("processed", False),
+    }
+
+def _append(collection, meeting_id: str, start: datetime, items: List[dict], seen: bool):
+    # Each bucket's group is appended in one update, so a retried batch finds
+    # either all or none of its phrases in the bucket. Phrases never handed
+    # to the database before take a single upsert; for the rest the filter
+    # skips the push when they are already there, and a missing bucket is
+    # created with them.
+    first_at = min(i["created_at"] for i in items)
+    last_at = max(i["created_at"] for i in items)
+    key = {"meeting_id": meeting_id, "bucket_start": start}
+    push = {
+        "$push": {"phrases": {"$each": items}},
+        "$min": {"first_at": first_at},
+        "$max": {"last_at": last_at},
+    }
+    if not seen:
+        try:
+            collection.update_one(key, push, upsert=True)
+            return
+        except DuplicateKeyError:
+            # Another writer created the bucket between our match and insert
+            pass
+    guarded = {**key, "phrases.phrase_id": {"$nin": [i["phrase_id"] for i in items]}}
+    create = {"$setOnInsert": {"phrases": items, "first_at": first_at, "last_at": last_at}}
+    for _ in range(2):
+        if collection.update_one(guarded, push).matched_count:
+            return
+        try:
+            if collection.update_one(key, create, upsert=True).upserted_id is not None:
+                return
+        except DuplicateKeyError:
+            pass
+        # The bucket exists: it already holds these phrases, or another
+        # writer created it just now and the next push lands them
+
+def insert_phrases(phrase_docs: List[dict], window: int = BUCKET_SECONDS) -> int:
+    # Like insert_many, this stamps _id on the caller's documents. One that
+    # already carries an _id may have been written before: a PhraseWriter
+    # retry, or a migration copying stored phrases.
+    groups: Dict[Tuple[str, datetime], List[Tuple[dict, bool]]] = {}
+    for doc in phrase_docs:
+        seen = "_id" in doc
+        if not seen:
+            doc["_id"] = ObjectId()
+        item = _bucket_item(doc)
+        key = (str(doc["meeting_id"]), bucket_start(item["created_at"], window))
+        groups.setdefault(key, []).append((item, seen))
+
+    collection = get_db()[BUCKETS_COLLECTION]
+    for (meeting_id, start), entries in groups.items():
+        items = [item for item, _ in entries]
+        _append(collection, meeting_id, start, items, any(was_seen for _, was_seen in entries))
+    return len(phrase_docs)
+
+def _order(item: dict) -> Tuple[datetime, ObjectId]:
+    return item["created_at"], item["seq"]
+
+def iter_phrases(meeting_id: str, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, after: Optional[Tuple[datetime, ObjectId]] = None,
+                 limit: Optional[int] = None, window: int = BUCKET_SECONDS) -> Iterator[dict]:
+    # Transcript order over [start, end), strictly after the (created_at,
+    # seq) position `after` when given. Items keep seq as _id, matching
+    # what the phrases collection returns.
+    query = {"meeting_id": meeting_id}
+    start = _naive_utc(start) if start is not None else None
+    end = _naive_utc(end) if end is not None else None
+    after = (_naive_utc(after[0]), after[1]) if after is not None else None
+    lower = [t for t in (start, after[0] if after else None) if t is not None]
+    bucket_range = {}
+    if lower:
+        bucket_range["$gte"] = bucket_start(max(lower), window)
+    if end is not None:
+        bucket_range["$lt"] = end
+    if bucket_range:
+        query["bucket_start"] = bucket_range
+
+    projection = {"_id": 0, "phrases.seq": 1, "phrases.phrase_id": 1, "phrases.phrase": 1,
+                  "phrases.created_at": 1}
+    cursor = get_db()[BUCKETS_COLLECTION].find(query, projection).sort("bucket_start", 1)
+    emitted = 0
+    for bucket in cursor:
+        for item in sorted(bucket.get("phrases", []), key=_order):
+            if start is not None and item["created_at"] < start:
+                continue
+            if after is not None and _order(item) <= after:
+                continue
+            if end is not None and item["created_at"] >= end:
+                return
+            item["_id"] = item.pop("seq")
+            yield item
+            emitted += 1
+            if limit and emitted >= limit:
+                return
+
+def get_unprocessed_phrases(meeting_id: str) -> List[Phrase]:
+    cursor = get_db()[BUCKETS_COLLECTION].find(
+        {"meeting_id": meeting_id, "phrases.processed": False},
+        {"_id": 0, "phrases": 1},
+    ).sort("bucket_start", 1)
+    unprocessed = []
+    for bucket in cursor:
+        for item in sorted(bucket["phrases"], key=_order):
+            if not item["processed"]:
+                item.pop("seq")
+                unprocessed.append(Phrase(meeting_id=meeting_id, **item))
+    return unprocessed
+
+def mark_phrases_processed(phrase_ids: List[str], meeting_id: Optional[str] = None) -> int:
+    # Sets each phrase's flag by its array position, one update per bucket.
+    # Without meeting_id every bucket is scanned, since phrase ids have no index.
+    wanted = {str(p) for p in phrase_ids}
+    if not wanted:
+        return 0
+    collection = get_db()[BUCKETS_COLLECTION]
+    query = {"phrases.phrase_id": {"$in": list(wanted)}}
+    if meeting_id is not None:
+        query["meeting_id"] = meeting_id
+    cursor = collection.find(query, {"_id": 1, "phrases.phrase_id": 1, "phrases.processed": 1})
+    marked = 0
+    for bucket in cursor:
+        positions = {
+            f"phrases.{i}.processed": True
+            for i, item in enumerate(bucket["phrases"])
+            if item["phrase_id"] in wanted and not item["processed"]
+        }
+        if positions:
+            collection.update_one({"_id": bucket["_id"]}, {"$set": positions})
+            marked += len(positions)
+    return marked
+
+def search_phrases(query: str, meeting_id: Optional[str] = None,
+                   exclude_meetings: Iterable[str] = (), limit: int = 20) -> List[dict]:
+    # The {"phrases.phrase": "text"} index ranks buckets; the phrases inside a
+    # matching bucket that contain a query word inherit its score
+    filters = {"$text": {"$search": query}}
+    if meeting_id is not None:
+        filters["meeting_id"] = meeting_id
+    elif exclude_meetings:
+        filters["meeting_id"] = {"$nin": list(exclude_meetings)}
+    projection = {"_id": 0, "meeting_id": 1, "phrases.phrase_id": 1, "phrases.phrase": 1,
+                  "phrases.created_at": 1, "score": {"$meta": "textScore"}}
+    cursor = get_db()[BUCKETS_COLLECTION].find(filters, projection).sort(
+        [("score", {"$meta": "textScore"})]).limit(limit)
+
+    words = {w.lower() for w in _WORD_RE.findall(query)}
+    results = []
+    for bucket in cursor:
+        for item in bucket["phrases"]:
+            if words & {w.lower() for w in _WORD_RE.findall(item["phrase"])}:
+                results.append({**item, "meeting_id": bucket["meeting_id"], "score": bucket["score"]})
+                if len(results) >= limit:
+                    return results
+    return results
+
+def count_phrases(meeting_id: str) -> int:
+    cursor = get_db()[BUCKETS_COLLECTION].find({"meeting_id": meeting_id}, {"_id": 0, "phrases.phrase_id": 1})
+    return sum(len(bucket.get("phrases", [])) for bucket in cursor)
+
+def delete_phrases_by_meeting(meeting_id: str) -> int:
+    deleted = count_phrases(meeting_id)
+    get_db()[BUCKETS_COLLECTION].delete_many({"meeting_id": meeting_id})
+    return deleted
@@ -1,43 +1,175 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
-from typing import List
+import base64
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
 from uuid import UUID
-from apps.services.orchestrator.db.connection import get_db
+try:
+    from bson import ObjectId
+except Exception:
+    from mongomock import ObjectId
+from apps.services.orchestrator.db.connection import get_db, in_db_pool, iterate_in_db_pool
+from apps.services.orchestrator.db import phrase_buckets
 from apps.services.orchestrator.models.phrase import Phrase
 
-def create_phrase(meeting_id: str, phrase: str):
+# "documents" keeps one document per phrase; "buckets" appends phrases to
+# per-meeting time-window documents (see phrase_buckets.py and
+# migrate_phrases.py for moving an existing database over)
+PHRASE_STORAGE = os.environ.get("PHRASE_STORAGE", "documents")
+
+def _bucketed() -> bool:
+    return PHRASE_STORAGE == "buckets"
+
+def build_phrase_doc(meeting_id: str, phrase: str):
     phrase_obj = Phrase(
         meeting_id=UUID(meeting_id),
         phrase=phrase
     )
-    db = get_db()
-    phrases_collection = db["phrases"]
     phrase_dict = phrase_obj.model_dump()
     phrase_dict["phrase_id"] = str(phrase_dict["phrase_id"])
     phrase_dict["meeting_id"] = str(phrase_dict["meeting_id"])
+    return phrase_dict
+
+def create_phrase(meeting_id: str, phrase: str):
+    phrase_dict = build_phrase_doc(meeting_id, phrase)
+    if _bucketed():
+        phrase_buckets.insert_phrases([phrase_dict])
+        return phrase_dict["phrase_id"]
+    db = get_db()
+    phrases_collection = db["phrases"]
     result = phrases_collection.insert_one(phrase_dict)
     return str(phrase_dict["phrase_id"])
 
+def insert_phrases(phrase_docs: List[dict]):
+    if not phrase_docs:
+        return 0
+    if _bucketed():
+        return phrase_buckets.insert_phrases(phrase_docs)
+    db = get_db()
+    phrases_collection = db["phrases"]
+    result = phrases_collection.insert_many(phrase_docs, ordered=True)
+    return len(result.inserted_ids)
+
+# Fields a transcript reader needs; everything else stays on the server.
+# _id only orders ties and is dropped before rows are handed out.
+TRANSCRIPT_PROJECTION = {"phrase_id": 1, "phrase": 1, "created_at": 1}
+
+# Transcript order. Ties on created_at are common (Mongo keeps milliseconds,
+# and PhraseWriter stamps a batch within one), so the ObjectId, which grows
+# with each insert from a meeting's writer, breaks them in arrival order.
+TRANSCRIPT_SORT = [("created_at", 1), ("_id", 1)]
+
+def encode_resume_token(created_at: datetime, seq: ObjectId) -> str:
+    # Position just after the phrase (created_at, seq)
+    raw = f"{created_at.isoformat()}|{seq}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_resume_token(token: str) -> Tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+        created_at, seq = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), ObjectId(seq)
+    except Exception:
+        raise ValueError("Invalid resume token")
+
+def iter_transcript(meeting_id: str, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None, resume_token: Optional[str] = None,
+                    limit: Optional[int] = None, batch_size: int = 500) -> Iterator[dict]:
+    # Streams raw projected documents in transcript order, each with the
+    # resume token that continues after it
+    after = decode_resume_token(resume_token) if resume_token else None
+    if after is not None and start is not None and after[0] < _naive_utc(start):
+        after = None
+
+    if _bucketed():
+        cursor = phrase_buckets.iter_phrases(meeting_id, start, end, after, limit)
+    else:
+        query = {"meeting_id": meeting_id}
+        created = {}
+        if start is not None:
+            created["$gte"] = start
+        if end is not None:
+            created["$lt"] = end
+        if created:
+            query["created_at"] = created
+        if after is not None:
+            query["$or"] = [{"created_at": {"$gt": after[0]}},
+                            {"created_at": after[0], "_id": {"$gt": after[1]}}]
+        db = get_db()
+        phrases_collection = db["phrases"]
+        cursor = phrases_collection.find(query, TRANSCRIPT_PROJECTION).sort(
+            TRANSCRIPT_SORT).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+
+    for doc in cursor:
+        doc["resume"] = encode_resume_token(doc["created_at"], doc.pop("_id"))
+        yield doc
+
+def _naive_utc(value: datetime) -> datetime:
+    # Mongo hands back naive UTC datetimes
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def search_phrases(query: str, meeting_id: Optional[str] = None,
+                   exclude_meetings: Iterable[str] = (), limit: int = 20) -> List[dict]:
+    # Ranked by the {phrase: "text"} index
+    if _bucketed():
+        return phrase_buckets.search_phrases(query, meeting_id, exclude_meetings, limit)
+    db = get_db()
+    phrases_collection = db["phrases"]
+    filters = {"$text": {"$search": query}}
+    if meeting_id is not None:
+        filters["meeting_id"] = meeting_id
+    elif exclude_meetings:
+        filters["meeting_id"] = {"$nin": list(exclude_meetings)}
+    projection = {"_id": 0, "phrase_id": 1, "meeting_id": 1, "phrase": 1, "created_at": 1,
+                  "score": {"$meta": "textScore"}}
+    cursor = phrases_collection.find(filters, projection).sort(
+        [("score", {"$meta": "textScore"})]).limit(limit)
+    return list(cursor)
+
 def get_unprocessed_phrases(meeting_id: str):
+    if _bucketed():
+        return phrase_buckets.get_unprocessed_phrases(meeting_id)
     db = get_db()
     phrases_collection = db["phrases"]
     cursor = phrases_collection.find(
         {"meeting_id": meeting_id, "processed": False}
-    ).sort("created_at", 1)
+    ).sort(TRANSCRIPT_SORT)
     return [Phrase(**doc) for doc in cursor]
 
-def mark_phrases_processed(phrase_ids: List[str]):
+def mark_phrases_processed(phrase_ids: List[str], meeting_id: Optional[str] = None):
+    if _bucketed():
+        return phrase_buckets.mark_phrases_processed(phrase_ids, meeting_id)
     db = get_db()
     phrases_collection = db["phrases"]
+    query = {"phrase_id": {"$in": phrase_ids}}
+    if meeting_id is not None:
+        query["meeting_id"] = meeting_id
     result = phrases_collection.update_many(
-        {"phrase_id": {"$in": phrase_ids}},
+        query,
         {"$set": {"processed": True}}
     )
     return result.modified_count
 
 def delete_phrases_by_meeting(meeting_id: str):
+    if _bucketed():
+        return phrase_buckets.delete_phrases_by_meeting(meeting_id)
     db = get_db()
     phrases_collection = db["phrases"]
     result = phrases_collection.delete_many({"meeting_id": meeting_id})
-    return result.deleted_count
\ No newline at end of file
+    return result.deleted_count
+
+# Event-loop callers use these; the blocking calls run on the database thread pool
+create_phrase_async = in_db_pool(create_phrase)
+insert_phrases_async = in_db_pool(insert_phrases)
+search_phrases_async = in_db_pool(search_phrases)
+get_unprocessed_phrases_async = in_db_pool(get_unprocessed_phrases)
+mark_phrases_processed_async = in_db_pool(mark_phrases_processed)
+delete_phrases_by_meeting_async = in_db_pool(delete_phrases_by_meeting)
+
+def iter_transcript_async(meeting_id: str, **kwargs):
+    return iterate_in_db_pool(iter_transcript(meeting_id, **kwargs))
@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from datetime import datetime, timezone
+from typing import List, Optional
+from apps.services.orchestrator.db.connection import get_db, in_db_pool
+
+def get_summary(meeting_id: str) -> Optional[dict]:
+    db = get_db()
+    summaries_collection = db["summaries"]
+    return summaries_collection.find_one({"meeting_id": meeting_id}, {"_id": 0})
+
+def save_summary(meeting_id: str, summary: str, sentences: List[dict], state: dict, watermark: str):
+    db = get_db()
+    summaries_collection = db["summaries"]
+    result = summaries_collection.update_one(
+        {"meeting_id": meeting_id},
+        {"$set": {
+            "summary": summary,
+            "sentences": sentences,
+            "state": state,
+            "watermark": watermark,
+            "updated_at": datetime.now(timezone.utc),
+        }},
+        upsert=True
+    )
+    return result.modified_count or int(result.upserted_id is not None)
+
+def delete_summary(meeting_id: str):
+    db = get_db()
+    summaries_collection = db["summaries"]
+    result = summaries_collection.delete_one({"meeting_id": meeting_id})
+    return result.deleted_count
+
+get_summary_async = in_db_pool(get_summary)
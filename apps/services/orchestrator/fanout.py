@@ -0,0 +1,152 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Set, Tuple, Union
+
+from fastapi import WebSocket
+from apps.services.orchestrator.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+send_seconds = registry.histogram(
+    "orchestrator_ws_send_seconds", "Time to send one message to a browser client")
+
+PRESENCE = "presence"
+DATA = "data"
+
+
+class ClientSender:
+    # Outbound queue for one websocket, drained by its own writer task so a
+    # slow browser only ever delays itself.
+
+    def __init__(self, websocket: WebSocket, client_id: str, max_queue: int = 256,
+                 slow_policy: str = "disconnect"):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.max_queue = max_queue
+        self.slow_policy = slow_policy
+
+        self._queue: Deque[Tuple[str, str, float]] = deque()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Held until done; the loop keeps only weak references to tasks
+        self._closing: Set[asyncio.Task] = set()
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.max_lag = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def offer(self, payload: str, kind: str = DATA) -> bool:
+        if self.closed:
+            return False
+        if kind == PRESENCE:
+            # Only the newest presence update matters
+            stale = [item for item in self._queue if item[1] == PRESENCE]
+            for item in stale:
+                self._queue.remove(item)
+            self.dropped += len(stale)
+
+        if len(self._queue) >= self.max_queue:
+            if kind == PRESENCE or self.slow_policy == "drop":
+                self.dropped += 1
+                if kind == PRESENCE:
+                    return False
+                self._queue.popleft()
+            else:
+                logger.warning(f"Disconnecting slow client {self.client_id} "
+                               f"({len(self._queue)} messages queued)")
+                self.closed = True
+                self._queue.clear()
+                task = asyncio.create_task(self._close())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+                return False
+
+        self._queue.append((payload, kind, time.monotonic()))
+        self._ready.set()
+        return True
+
+    async def _close(self):
+        try:
+            await self.websocket.close(code=1013, reason="Client too slow")
+        except Exception:
+            pass
+
+    async def _run(self):
+        while not self.closed:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._queue and not self.closed:
+                payload, _, enqueued_at = self._queue.popleft()
+                try:
+                    with send_seconds.time():
+                        await self.websocket.send_text(payload)
+                except Exception as e:
+                    logger.error(f"Error sending to client {self.client_id}: {e}")
+                    self.closed = True
+                    return
+                self.sent += 1
+                self.max_lag = max(self.max_lag, time.monotonic() - enqueued_at)
+
+
+class Fanout:
+
+    def __init__(self, max_queue: int = 256, slow_policy: str = "disconnect"):
+        self.max_queue = max_queue
+        self.slow_policy = slow_policy
+        self.senders: Set[ClientSender] = set()
+        self.messages = 0
+        self.dropped = 0
+
+    def open(self, websocket: WebSocket, client_id: str) -> ClientSender:
+        sender = ClientSender(websocket, client_id, self.max_queue, self.slow_policy)
+        self.senders.add(sender)
+        sender.start()
+        return sender
+
+    async def close(self, sender: ClientSender):
+        if sender in self.senders:
+            self.senders.discard(sender)
+            self.dropped += sender.dropped
+        await sender.stop()
+
+    def broadcast(self, senders: Iterable[ClientSender], message: Union[dict, str],
+                  kind: str = DATA) -> int:
+        # Encoded once, then queued for every client
+        payload = message if isinstance(message, str) else json.dumps(message)
+        self.messages += 1
+        return sum(sender.offer(payload, kind) for sender in list(senders))
+
+    def stats(self) -> Dict[str, Any]:
+        senders = list(self.senders)
+        return {
+            "clients": len(senders),
+            "messages": self.messages,
+            "queued": sum(s.depth() for s in senders),
+            "max_queue_depth": max((s.depth() for s in senders), default=0),
+            "max_lag_ms": round(1000 * max((s.max_lag for s in senders), default=0.0), 2),
+            "sent": sum(s.sent for s in senders),
+            "dropped": self.dropped + sum(s.dropped for s in senders),
+        }
+
+
+fanout = Fanout()
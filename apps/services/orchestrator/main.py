@@ -3,14 +3,25 @@ import logging
 import json
 import uuid
 import asyncio
+import os
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Path
 from fastapi.middleware.cors import CORSMiddleware
-from db.meetings import create_meeting, end_meeting_by_id
-from db.phrases import create_phrase
-from routes import health, meetings
+from fastapi.responses import PlainTextResponse
+from db.meetings import (create_meeting_async, get_meeting_by_id_async,
+                         schedule_meeting_expiry_async, cancel_meeting_expiry_async)
+from routes import health, meetings, search
 from pydantic import BaseModel
 from typing import NamedTuple, Optional, Dict
-from asr_client import asr_client
+from asr_pool import asr_client
+from phrase_writer import phrase_writer
+from summarizer import summary_worker
+from search_index import live_search
+from meeting_reaper import meeting_reaper
+from db.phrases import iter_transcript
+from apps.services.orchestrator.db.connection import close_db, iterate_in_db_pool, open_db
+from fanout import fanout, ClientSender, PRESENCE
+from apps.services.orchestrator.db.meeting_cache import meeting_cache
+from apps.services.orchestrator.metrics import LogSampler, registry
 ASR_CLIENT_ID_PREFIX = "asr_service_"
 
 logger = logging.getLogger(__name__)
@@ -18,8 +29,21 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await open_db()
     asr_client.set_broadcast_callback(forward_asr_text)
+    asr_client.set_throttle_callback(throttle_host)
+    await phrase_writer.start()
+    summary_worker.active_meetings = lambda: list(connections)
+    summary_worker.busy = lambda: phrase_writer.stats()["pending"] >= phrase_writer.batch_size
+    await summary_worker.start()
+    meeting_reaper.on_end = live_search.drop
+    await meeting_reaper.start()
     yield
+    await meeting_reaper.stop()
+    await summary_worker.stop()
+    await asr_client.close()
+    await phrase_writer.stop()
+    await close_db()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -27,13 +51,31 @@ app = FastAPI(lifespan=lifespan)
 class ClientInfo(NamedTuple):
     websocket: WebSocket
     client_id: str
+    sender: ClientSender
 
 
-end_meeting_tasks = {}
+# Seconds an empty meeting stays active before the reaper ends it
+MEETING_IDLE_TIMEOUT = int(os.environ.get("MEETING_IDLE_TIMEOUT", "600"))
 connections: dict[str, dict[str, ClientInfo]] = {}
 recording_clients: Dict[str, str] = {}
 host_clients: Dict[str, str] = {}
 
+log_sampler = LogSampler(every=int(os.environ.get("LOG_SAMPLE_EVERY", "100")))
+registry.gauge("orchestrator_active_meetings", "Meetings with at least one connected client",
+               lambda: len(connections))
+registry.gauge("orchestrator_connected_clients", "Browser websockets across all meetings",
+               lambda: sum(len(c) for c in list(connections.values())))
+registry.gauge("orchestrator_asr_buffer_bytes", "Audio bytes coalescing before the send to ASR",
+               lambda: asr_client.buffered_bytes())
+registry.gauge("orchestrator_phrase_writer_pending_bytes", "Phrase bytes waiting to be persisted",
+               lambda: phrase_writer.stats()["pending_bytes"])
+registry.gauge("orchestrator_asr_throttled_meetings", "Meetings the ASR service has asked to slow down",
+               lambda: asr_client.flow_stats()["throttled_meetings"])
+registry.gauge("orchestrator_asr_shed_bytes", "Silent audio not sent to ASR because of backpressure",
+               lambda: asr_client.flow_stats()["shed_bytes"])
+registry.gauge("orchestrator_fanout_queued", "Messages queued across client senders",
+               lambda: fanout.stats()["queued"])
+
 origins = [
     "http://localhost",
     "http://localhost:3000",
@@ -55,6 +97,7 @@ app.add_middleware(
 
 app.include_router(health.router)
 app.include_router(meetings.router)
+app.include_router(search.router)
 
 
 class MeetingCreateRequest(BaseModel):
@@ -66,9 +109,9 @@ class TestMessageRequest(BaseModel):
 
 
 @app.post("/meetings")
-def create_meeting_endpoint(meeting: MeetingCreateRequest):
+async def create_meeting_endpoint(meeting: MeetingCreateRequest):
     try:
-        meeting_id = create_meeting(title=meeting.title)
+        meeting_id = await create_meeting_async(title=meeting.title)
         return {"meeting_id": meeting_id}
     except Exception as e:
         raise HTTPException(
@@ -76,20 +119,29 @@ def create_meeting_endpoint(meeting: MeetingCreateRequest):
 
 
 @app.get("/meetings/{meeting_id}")
-def get_meeting(meeting_id: str = Path(...)):
-    from apps.services.orchestrator.db.meetings import get_meeting_by_id
-    meeting = get_meeting_by_id(meeting_id)
+async def get_meeting(meeting_id: str = Path(...)):
+    meeting = await get_meeting_by_id_async(meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     return {"meeting_id": meeting_id, "title": meeting.title}
 
 
-async def delayed_end_meeting(meeting_id: str, delay_seconds: int = 600):
-    logger.info(f"Scheduling meeting {meeting_id} to end in {delay_seconds} seconds")
-    await asyncio.sleep(delay_seconds)
-    logger.info(f"Ending meeting {meeting_id} after delay")
-    end_meeting_by_id(meeting_id)
-    end_meeting_tasks.pop(meeting_id, None)
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/stats")
+def stats():
+    return {
+        "meeting_cache": meeting_cache.stats(),
+        "fanout": fanout.stats(),
+        "phrase_writer": phrase_writer.stats(),
+        "summaries": summary_worker.stats(),
+        "search_index": live_search.stats(),
+        "meeting_reaper": meeting_reaper.stats(),
+        "asr_flow": asr_client.flow_stats(),
+    }
 
 
 async def broadcast_client_list(meeting_id: str):
@@ -110,39 +162,53 @@ async def broadcast_client_list(meeting_id: str):
         "count": len(clients),
     }
 
-    for client_info in connections[meeting_id].values():
-        try:
-            await broadcast_to_meeting(meeting_id, message)
-        except Exception as e:
-            logger.error(f"Error broadcasting client list: {e}")
+    fanout.broadcast((c.sender for c in connections[meeting_id].values()),
+                     message, PRESENCE)
 
 
 async def broadcast_to_meeting(meeting_id: str, message: dict):
     if meeting_id not in connections:
         return
 
-    for client_info in connections[meeting_id].values():
-        try:
-            await client_info.websocket.send_text(json.dumps(message))
-        except Exception as e:
-            logger.error(f"Error broadcasting to client: {e}")
+    fanout.broadcast((c.sender for c in connections[meeting_id].values()), message)
 
 
 async def forward_asr_text(meeting_id: str, message: str):
     try:
         data = json.loads(message)
-        if "text" in data and data["text"]:
-            create_phrase(meeting_id, data["text"])
+        if data.get("type") != "partial" and data.get("text"):
+            doc = phrase_writer.enqueue(meeting_id, data["text"])
+            if doc is not None:
+                live_search.add(meeting_id, doc["phrase_id"], doc["phrase"], doc["created_at"])
     except Exception as e:
         logger.error(f"Failed to store phrase for meeting {meeting_id}: {e}")
 
     if meeting_id not in connections:
         return
-    for client_info in list(connections[meeting_id].values()):
-        try:
-            await client_info.websocket.send_text(message)
-        except Exception as e:
-            logger.error(f"Error forwarding ASR text: {e}")
+    fanout.broadcast((c.sender for c in connections[meeting_id].values()), message)
+
+
+async def backfill_search(meeting_id: str, batch_size: int = 500):
+    # Indexes earlier phrases a batch at a time, so a long meeting's
+    # transcript is never held in memory whole
+    batch = []
+    async for row in iterate_in_db_pool(iter_transcript(meeting_id), batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            live_search.backfill(meeting_id, batch)
+            batch = []
+    live_search.backfill(meeting_id, batch)
+
+
+async def throttle_host(meeting_id: str, level: str):
+    # Only the host is sending audio, so only the host is told to ease off
+    host = connections.get(meeting_id, {}).get(host_clients.get(meeting_id))
+    if host is not None:
+        host.sender.offer(json.dumps({
+            "type": "throttle",
+            "level": level,
+            "paused": level == "critical",
+        }))
 
 
 @app.websocket("/ws/meetings/{meeting_id}")
@@ -155,8 +221,7 @@ async def websocket_meeting(websocket: WebSocket, meeting_id: str):
         msg = json.loads(identify_msg)
         if msg.get("type") == "identify" and "clientId" in msg:
             client_id = msg["clientId"]
-            print(
-                f"Client {client_id} reconnected to meeting {meeting_id} (identify)")
+            logger.debug(f"Client {client_id} reconnected to meeting {meeting_id} (identify)")
         else:
             client_id = str(uuid.uuid4())[:8]
     except Exception:
@@ -165,19 +230,19 @@ async def websocket_meeting(websocket: WebSocket, meeting_id: str):
     # Check if this is the ASR service client
     is_asr_client = client_id.startswith("asr_service_")
 
-    print(f"Client {client_id} connected to meeting {meeting_id}")
+    logger.info(f"Client {client_id} connected to meeting {meeting_id}")
 
     if is_asr_client:
-        print(f"ASR service client connected for meeting {meeting_id}")
+        logger.info(f"ASR service client connected for meeting {meeting_id}")
         try:
             # Just handle ASR messages separately
             while True:
                 message = await websocket.receive()
                 # ASR specific message handling
         except WebSocketDisconnect:
-            print(f"ASR client disconnected from meeting {meeting_id}")
+            logger.info(f"ASR client disconnected from meeting {meeting_id}")
         except Exception as e:
-            print(f"ASR WebSocket error: {e}")
+            logger.warning(f"ASR WebSocket error: {e}")
         finally:
             return  # Exit early for ASR clients
 
@@ -190,25 +255,32 @@ async def websocket_meeting(websocket: WebSocket, meeting_id: str):
             return
         recording_clients[meeting_id] = client_id
         host_clients[meeting_id] = client_id
+        if not live_search.has(meeting_id):
+            try:
+                await backfill_search(meeting_id)
+            except Exception as e:
+                logger.error(f"Failed to index earlier phrases of meeting {meeting_id}: {e}")
     else:
         current_host = host_clients.get(meeting_id)
         if current_host == client_id:
             recording_clients[meeting_id] = client_id
-            print(f"Host {client_id} reconnected")
+            logger.info(f"Host {client_id} reconnected")
 
-    connections[meeting_id][client_id] = ClientInfo(websocket, client_id)
+    sender = fanout.open(websocket, client_id)
+    connections[meeting_id][client_id] = ClientInfo(websocket, client_id, sender)
 
-    if meeting_id in end_meeting_tasks:
-        end_meeting_tasks[meeting_id].cancel()
-        end_meeting_tasks.pop(meeting_id, None)
+    if first_client:
+        try:
+            await cancel_meeting_expiry_async(meeting_id)
+        except Exception as e:
+            logger.error(f"Failed to cancel expiry of meeting {meeting_id}: {e}")
 
-    print(
-        f"Meeting {meeting_id} now has {len(connections[meeting_id])} clients")
+    logger.debug(f"Meeting {meeting_id} now has {len(connections[meeting_id])} clients")
 
     can_record = host_clients.get(meeting_id) == client_id
 
     try:
-        await websocket.send_text(json.dumps({
+        sender.offer(json.dumps({
             "type": "connection_status",
             "status": "connected",
             "canRecord": can_record,
@@ -219,29 +291,35 @@ async def websocket_meeting(websocket: WebSocket, meeting_id: str):
 
         while True:
             message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
             if "text" in message:
                 data = message["text"]
                 msg = json.loads(data)
-                print(f"Meeting {meeting_id} - Received: {data}")
+                logger.debug(f"Meeting {meeting_id} - Received: {data}")
                 if msg.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
+                    sender.offer(json.dumps({"type": "pong"}))
             elif "bytes" in message:
                 host_id = host_clients.get(meeting_id)
                 if host_id == client_id:
                     await asr_client.send_audio(meeting_id, message["bytes"])
                 else:
-                    await websocket.send_text(json.dumps({
+                    sender.offer(json.dumps({
                         "type": "error",
                         "message": "Only the host can record audio"
                     }))
-                    print(
+                    log_sampler.log(
+                        logger, logging.WARNING, f"not_host:{meeting_id}",
                         f"Client {client_id} attempted to send audio, but is not the host. {host_id}")
     except WebSocketDisconnect:
-        print(f"Client {client_id} disconnected from meeting {meeting_id}")
+        pass
     except Exception as e:
-        print(f"WebSocket error for client {client_id}: {e}")
+        logger.warning(f"WebSocket error for client {client_id}: {e}")
     finally:
-        if meeting_id in connections and client_id in connections[meeting_id]:
+        logger.info(f"Client {client_id} disconnected from meeting {meeting_id}")
+        await fanout.close(sender)
+        current = connections.get(meeting_id, {}).get(client_id)
+        if current is not None and current.sender is sender:
             del connections[meeting_id][client_id]
             await broadcast_client_list(meeting_id)
 
@@ -252,10 +330,12 @@ async def websocket_meeting(websocket: WebSocket, meeting_id: str):
             if meeting_id in host_clients:
                 host_clients.pop(meeting_id)
             await asr_client.disconnect_meeting(meeting_id)
+            summary_worker.finish(meeting_id)
 
-            if meeting_id not in end_meeting_tasks:
-                end_meeting_tasks[meeting_id] = asyncio.create_task(
-                    delayed_end_meeting(meeting_id, delay_seconds=600))
+            try:
+                await schedule_meeting_expiry_async(meeting_id, MEETING_IDLE_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Failed to schedule expiry of meeting {meeting_id}: {e}")
 
 
 @app.post("/meetings/{meeting_id}/test-message")
@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from apps.services.orchestrator.db.connection import run_db
+from apps.services.orchestrator.db.meetings import end_meeting_by_id, get_expired_meeting_ids
+
+logger = logging.getLogger(__name__)
+
+
+class MeetingReaper:
+    # Ends idle meetings. Expiry lives on the meeting document (expires_at),
+    # so scheduled ends survive restarts; one task sweeps the indexed field
+    # instead of a sleeping task per meeting.
+
+    def __init__(self, interval: float = 15.0, batch_size: int = 100,
+                 on_end: Callable[[str], None] = None):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.on_end = on_end
+        self._task: Optional[asyncio.Task] = None
+
+        self.sweeps = 0
+        self.ended = 0
+        self.failures = 0
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"sweeps": self.sweeps, "ended": self.ended, "failures": self.failures}
+
+    def sweep_once(self) -> List[str]:
+        now = datetime.now(timezone.utc)
+        ended = []
+        while True:
+            due = get_expired_meeting_ids(now, self.batch_size)
+            for meeting_id in due:
+                if end_meeting_by_id(meeting_id, expired_before=now):
+                    ended.append(meeting_id)
+            if len(due) < self.batch_size:
+                break
+        self.sweeps += 1
+        self.ended += len(ended)
+        return ended
+
+    async def sweep(self) -> List[str]:
+        try:
+            ended = await run_db(self.sweep_once)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Meeting expiry sweep failed: {e}")
+            return []
+        for meeting_id in ended:
+            logger.info(f"Ended idle meeting {meeting_id}")
+            if self.on_end:
+                self.on_end(meeting_id)
+        return ended
+
+    async def _run(self):
+        while True:
+            await self.sweep()
+            await asyncio.sleep(self.interval)
+
+
+meeting_reaper = MeetingReaper(interval=float(os.environ.get("MEETING_REAPER_INTERVAL", "15")))
@@ -0,0 +1,169 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Minimal Prometheus-compatible metrics. Observations are cheap (a bisect and
+# two adds under a lock) so they can sit on hot paths, including the
+# inference threads. The ASR service and the orchestrator each carry an
+# identical copy of this module: each service image is built from its own
+# directory, so neither can import the other. tests/test_metrics.py keeps
+# the copies in sync.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0)
+RTF_BUCKETS = (0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0)
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+
+    def render(self) -> List[str]:
+        counts, total, count = self.snapshot()
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, n in zip(self.buckets + (math.inf,), counts):
+            cumulative += n
+            lines.append(f'{self.name}_bucket{{le="{_number(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+class Gauge:
+    # Either set explicitly or read from a callback when scraped
+
+    def __init__(self, name: str, help: str, fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self._values: Dict[str, float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[_labels(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        if self.fn is not None:
+            try:
+                lines.append(f"{self.name} {self.fn()}")
+            except Exception:
+                pass
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+class Counter:
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items or [("", 0)]:
+            lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, buckets))
+
+    def gauge(self, name: str, help: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge(name, help, fn))
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._register(Counter(name, help))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class LogSampler:
+    # Logs the first occurrence of a key and then every `every`-th one, so
+    # per-message log lines cost almost nothing at volume. Keys often carry
+    # meeting ids, so only the max_keys most recently used are counted; a
+    # key that falls out starts over at its next occurrence.
+
+    def __init__(self, every: int = 100, max_keys: int = 1024):
+        self.every = max(1, every)
+        self.max_keys = max(1, max_keys)
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+
+    def log(self, logger: logging.Logger, level: int, key: str, msg: str):
+        if not logger.isEnabledFor(level):
+            return
+        n = self._seen.get(key, 0) + 1
+        self._seen[key] = n
+        self._seen.move_to_end(key)
+        if len(self._seen) > self.max_keys:
+            self._seen.popitem(last=False)
+        if n == 1 or n % self.every == 0:
+            logger.log(level, f"{msg} ({n} so far)" if n > 1 else msg)
+
+
+registry = Registry()
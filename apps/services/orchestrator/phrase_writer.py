@@ -0,0 +1,174 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+try:
+    from pymongo.errors import ConnectionFailure
+except Exception:
+    class ConnectionFailure(Exception):
+        pass
+from apps.services.orchestrator.db.phrases import build_phrase_doc, insert_phrases_async
+from apps.services.orchestrator.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+insert_seconds = registry.histogram(
+    "orchestrator_mongo_insert_seconds", "Latency of one phrase insert_many batch")
+
+
+class PhraseWriter:
+    # Write-behind queue for transcribed phrases. Phrases are stamped and
+    # queued on the event loop, then persisted with insert_many from a worker
+    # thread, so Mongo latency never sits on the broadcast path. A single
+    # FIFO and ordered inserts keep each meeting's phrases in order.
+    # Failed writes are retried with exponential backoff. Lost connections
+    # are retried indefinitely; any other error that keeps stopping the head
+    # of the queue for max_attempts writes gets those phrases logged and set
+    # aside, so one bad document cannot hold up everything behind it.
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 0.5,
+                 max_pending_bytes: int = 8 * 1024 * 1024, retry_delay: float = 1.0,
+                 max_retry_delay: float = 30.0, max_attempts: int = 5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending_bytes = max_pending_bytes
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max_attempts
+
+        self._pending: Deque[Tuple[dict, int]] = deque()
+        self._pending_bytes = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Consecutive failed writes without progress past the queue head
+        self._attempts = 0
+
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failures = 0
+        self.set_aside = 0
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def enqueue(self, meeting_id: str, phrase: str) -> Optional[dict]:
+        # Returns the queued document, or None when the phrase was dropped
+        doc = build_phrase_doc(meeting_id, phrase)
+        size = len(phrase.encode("utf-8")) + 256
+        if self._pending_bytes + size > self.max_pending_bytes:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(
+                    f"Phrase write-behind queue is full ({self._pending_bytes} bytes); "
+                    f"{self.dropped} phrase(s) dropped so far")
+            return None
+
+        self._pending.append((doc, size))
+        self._pending_bytes += size
+        if self._wakeup is not None and len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return doc
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "pending_bytes": self._pending_bytes,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "set_aside": self.set_aside,
+        }
+
+    def _discard(self, count: int):
+        for _ in range(min(count, len(self._pending))):
+            _, size = self._pending.popleft()
+            self._pending_bytes -= size
+
+    async def _write_batch(self) -> bool:
+        batch: List[dict] = [doc for doc, _ in list(self._pending)[:self.batch_size]]
+        try:
+            with insert_seconds.time():
+                await insert_phrases_async(batch)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Failed to persist {len(batch)} phrase(s): {e}")
+            # Ordered inserts stop at the first error; keep only what wasn't written.
+            # A duplicate phrase_id means that phrase was stored by an earlier attempt.
+            details = getattr(e, "details", None) or {}
+            written = details.get("nInserted", 0)
+            errors = details.get("writeErrors") or []
+            duplicate = bool(errors) and errors[0].get("code") == 11000
+            if duplicate:
+                written += 1
+            self._discard(written)
+            self.written += written
+            # Count attempts against the document now at the head of the queue
+            if duplicate:
+                self._attempts = 0
+            else:
+                self._attempts = 1 if written else self._attempts + 1
+            if (not duplicate and not isinstance(e, ConnectionFailure)
+                    and self._attempts >= self.max_attempts):
+                # A write error names the one document it stopped at; any
+                # other error could be any document of the batch
+                self._set_aside(batch[written:written + 1] if errors else batch[written:], e)
+            return False
+
+        self._discard(len(batch))
+        self.written += len(batch)
+        self.batches += 1
+        self._attempts = 0
+        return True
+
+    def _set_aside(self, docs: List[dict], error: Exception):
+        logger.error(f"Setting aside {len(docs)} phrase(s) after {self._attempts} failed writes "
+                     f"({error}): {docs}")
+        self._discard(len(docs))
+        self.set_aside += len(docs)
+        self._attempts = 0
+
+    def _backoff(self) -> float:
+        return min(self.retry_delay * 2 ** max(self._attempts - 1, 0), self.max_retry_delay)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._pending:
+                if not await self._write_batch():
+                    if self._stopping:
+                        logger.error(
+                            f"Dropping {len(self._pending)} unpersisted phrase(s) on shutdown")
+                        return
+                    await asyncio.sleep(self._backoff())
+                    break
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    break
+
+            if self._stopping and not self._pending:
+                return
+
+
+phrase_writer = PhraseWriter()
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
 from datetime import datetime, timezone
-from apps.services.orchestrator.db.connection import connect_to_mongodb
+from apps.services.orchestrator.db.connection import db_health
 
 router = APIRouter()
 
@@ -10,7 +10,7 @@ async def health_check():
     db_status = "disconnected"
     http_status = status.HTTP_503_SERVICE_UNAVAILABLE
 
-    if connect_to_mongodb():
+    if await db_health.check():
         db_status = "connected"
         http_status = status.HTTP_200_OK
 
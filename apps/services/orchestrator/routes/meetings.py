@@ -1,11 +1,69 @@
-from fastapi import APIRouter, HTTPException
-from db.meetings import get_meeting_by_id
+import json
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from db.meetings import get_meeting_by_id_async
+from db.phrases import decode_resume_token, iter_transcript_async
+from db.summaries import get_summary_async
 
 router = APIRouter()
 
 @router.get("/meetings/{meeting_id}/status")
 async def meeting_status(meeting_id: str):
-    meeting = get_meeting_by_id(meeting_id)
+    meeting = await get_meeting_by_id_async(meeting_id)
     if not meeting or getattr(meeting, "status", None) != "active":
         raise HTTPException(status_code=404, detail="Meeting not found or inactive")
-    return {"status": "active"}
\ No newline at end of file
+    return {"status": "active"}
+
+
+@router.get("/meetings/{meeting_id}/summary")
+async def meeting_summary(meeting_id: str):
+    if not await get_meeting_by_id_async(meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    doc = await get_summary_async(meeting_id) or {}
+    return {
+        "meeting_id": meeting_id,
+        "summary": doc.get("summary", ""),
+        "sentences": doc.get("sentences", []),
+        "phrases_seen": doc.get("state", {}).get("phrases_seen", 0),
+        "updated_at": doc.get("updated_at"),
+    }
+
+
+async def ndjson_lines(rows):
+    async for row in rows:
+        yield json.dumps({
+            "phrase_id": row["phrase_id"],
+            "text": row["phrase"],
+            "created_at": row["created_at"].isoformat(),
+            "resume": row["resume"],
+        }) + "\n"
+
+
+async def text_lines(rows):
+    async for row in rows:
+        yield f"[{row['created_at'].strftime('%H:%M:%S')}] {row['phrase']}\n"
+
+
+@router.get("/meetings/{meeting_id}/transcript")
+async def meeting_transcript(meeting_id: str,
+                             format: Literal["ndjson", "text"] = "ndjson",
+                             start: Optional[datetime] = None,
+                             end: Optional[datetime] = None,
+                             resume: Optional[str] = None,
+                             limit: Optional[int] = Query(default=None, ge=1)):
+    if not await get_meeting_by_id_async(meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    if resume:
+        try:
+            decode_resume_token(resume)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # Rows go from the cursor to the socket one at a time, so memory stays
+    # flat however long the meeting ran
+    rows = iter_transcript_async(meeting_id, start=start, end=end, resume_token=resume, limit=limit)
+    if format == "text":
+        return StreamingResponse(text_lines(rows), media_type="text/plain; charset=utf-8")
+    return StreamingResponse(ndjson_lines(rows), media_type="application/x-ndjson")
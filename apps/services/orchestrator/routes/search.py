@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import APIRouter, Query
+from db.phrases import search_phrases
+from apps.services.orchestrator.db.connection import run_db
+from search_index import live_search, make_snippet, tokenize
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Cross-meeting BM25 over a large live index takes tens to hundreds of
+# milliseconds; it runs here, one search at a time, off the event loop
+_search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-search")
+
+
+def _normalized(results, source):
+    # BM25 and Mongo text scores aren't comparable; rank each relative to its best hit
+    top = max((r["score"] for r in results), default=0) or 1
+    for r in results:
+        r["source"] = source
+        r["rank"] = r["score"] / top
+    return results
+
+
+@router.get("/search")
+async def search(q: str = Query(..., min_length=1), meeting_id: Optional[str] = None,
+                 limit: int = Query(default=20, ge=1, le=100)):
+    live = []
+    if meeting_id is None or live_search.has(meeting_id):
+        live = await asyncio.get_running_loop().run_in_executor(
+            _search_executor, lambda: live_search.search(q, meeting_id=meeting_id, limit=limit))
+
+    archived = []
+    if meeting_id is None or not live_search.has(meeting_id):
+        try:
+            rows = await run_db(search_phrases, q, meeting_id, live_search.meetings(), limit)
+        except Exception as e:
+            logger.error(f"Text search failed for {q!r}: {e}")
+            rows = []
+        terms = tokenize(q)
+        archived = [{
+            "meeting_id": row["meeting_id"],
+            "phrase_id": row["phrase_id"],
+            "text": row["phrase"],
+            "snippet": make_snippet(row["phrase"], terms),
+            "created_at": row["created_at"],
+            "score": row.get("score", 0.0),
+        } for row in rows]
+
+    results = _normalized(live, "live") + _normalized(archived, "archive")
+    results.sort(key=lambda r: r.pop("rank"), reverse=True)
+    return {"query": q, "results": results[:limit]}
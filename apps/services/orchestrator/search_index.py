@@ -0,0 +1,164 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+import heapq
+import logging
+import math
+import re
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def make_snippet(text: str, terms: Iterable[str], width: int = 120) -> str:
+    # Window of the phrase around the first query term it contains
+    if len(text) <= width:
+        return text
+    lowered = text.lower()
+    hits = [m.start() for m in (re.search(rf"\b{re.escape(t)}\b", lowered) for t in terms) if m]
+    start = max(0, min(hits) - width // 3) if hits else 0
+    end = min(len(text), start + width)
+    return ("…" if start else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+
+
+class _MeetingIndex:
+    __slots__ = ("phrases", "postings", "ids")
+
+    def __init__(self):
+        # ordinal -> (phrase_id, text, created_at, length)
+        self.phrases: List[Tuple[str, str, Any, int]] = []
+        # term -> [(ordinal, term frequency)]
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.ids: Set[str] = set()
+
+
+class LiveSearchIndex:
+    # In-memory inverted index over the phrases of meetings that are live in
+    # this process, ranked with BM25. Meetings leave the index when they end,
+    # or least-recently-updated first once max_phrases is exceeded; searches
+    # for them go to Mongo's text index instead.
+    # add() and drop() run on the event loop while search() may run on a
+    # worker thread. Postings and phrase lists are only ever appended to, and
+    # a search holds on to the meeting indexes it started with, so it never
+    # needs a lock.
+
+    def __init__(self, max_phrases: int = 1_000_000, k1: float = 1.2, b: float = 0.75):
+        self.max_phrases = max_phrases
+        self.k1 = k1
+        self.b = b
+        self._meetings: "OrderedDict[str, _MeetingIndex]" = OrderedDict()
+        self._df: Counter = Counter()
+        self._phrases = 0
+        self._length = 0
+        self.evictions = 0
+
+    def has(self, meeting_id: str) -> bool:
+        return meeting_id in self._meetings
+
+    def meetings(self) -> List[str]:
+        return list(self._meetings)
+
+    def add(self, meeting_id: str, phrase_id: str, text: str, created_at: datetime):
+        index = self._meetings.get(meeting_id)
+        if index is None:
+            index = self._meetings[meeting_id] = _MeetingIndex()
+        self._meetings.move_to_end(meeting_id)
+        if phrase_id in index.ids:
+            return
+        terms = Counter(tokenize(text))
+        if not terms:
+            return
+
+        ordinal = len(index.phrases)
+        length = sum(terms.values())
+        index.phrases.append((phrase_id, text, created_at, length))
+        index.ids.add(phrase_id)
+        for term, tf in terms.items():
+            index.postings.setdefault(term, []).append((ordinal, tf))
+        self._df.update(terms.keys())
+        self._phrases += 1
+        self._length += length
+
+        while self._phrases > self.max_phrases and len(self._meetings) > 1:
+            evicted = next(iter(self._meetings))
+            logger.info(f"Search index full; meeting {evicted} falls back to Mongo")
+            self.drop(evicted)
+            self.evictions += 1
+
+    def backfill(self, meeting_id: str, rows: Iterable[dict]):
+        # Phrases stored before this process started indexing the meeting
+        for row in rows:
+            self.add(meeting_id, row["phrase_id"], row["phrase"], row["created_at"])
+        if meeting_id not in self._meetings:
+            self._meetings[meeting_id] = _MeetingIndex()
+
+    def drop(self, meeting_id: str):
+        index = self._meetings.pop(meeting_id, None)
+        if index is None:
+            return
+        for term, postings in index.postings.items():
+            self._df[term] -= len(postings)
+            if self._df[term] <= 0:
+                del self._df[term]
+        self._phrases -= len(index.phrases)
+        self._length -= sum(p[3] for p in index.phrases)
+
+    def search(self, query: str, meeting_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._phrases:
+            return []
+        if meeting_id is not None:
+            indexes = [(meeting_id, self._meetings[meeting_id])] if meeting_id in self._meetings else []
+        else:
+            indexes = list(self._meetings.items())
+
+        meeting_indexes = dict(indexes)
+        n = self._phrases
+        if not n:
+            return []
+        avg_length = self._length / n
+        idf = {t: math.log(1 + (n - self._df[t] + 0.5) / (self._df[t] + 0.5))
+               for t in terms if self._df.get(t)}
+
+        scored = []
+        for mid, index in indexes:
+            scores: Dict[int, float] = {}
+            for term, weight in idf.items():
+                for ordinal, tf in index.postings.get(term, ()):
+                    length = index.phrases[ordinal][3]
+                    norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+                    scores[ordinal] = scores.get(ordinal, 0.0) + weight * norm
+            scored.extend((score, mid, ordinal) for ordinal, score in scores.items())
+
+        results = []
+        for score, mid, ordinal in heapq.nlargest(limit, scored, key=lambda s: s[0]):
+            phrase_id, text, created_at, _ = meeting_indexes[mid].phrases[ordinal]
+            results.append({
+                "meeting_id": mid,
+                "phrase_id": phrase_id,
+                "text": text,
+                "snippet": make_snippet(text, terms),
+                "created_at": created_at,
+                "score": round(score, 4),
+            })
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "meetings": len(self._meetings),
+            "phrases": self._phrases,
+            "terms": len(self._df),
+            "evictions": self.evictions,
+        }
+
+
+live_search = LiveSearchIndex(
+    max_phrases=int(os.environ.get("SEARCH_INDEX_MAX_PHRASES", "1000000")))
@@ -0,0 +1,163 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+import asyncio
+import logging
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from apps.services.orchestrator.db.connection import run_db
+from apps.services.orchestrator.db.phrases import iter_transcript, mark_phrases_processed
+from apps.services.orchestrator.db.summaries import get_summary, save_summary
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset("""
+about after again all also and any are because been before being but can could did does
+doing don't down for from had has have having her here hers him his how i'm into it's its
+just like more most not now off once only other our out over own really right same she
+should some such than that that's the their them then there these they this those through
+too under until very was we're were what when where which while who why will with would
+yeah yes you you're your okay gonna want know think going get got
+""".split())
+
+
+class RollingSummary:
+    # Extractive summary folded forward one batch at a time. Term counts over
+    # everything seen so far score a bounded pool of candidate phrases, and the
+    # summary is the best few candidates in the order they were spoken. Work
+    # per batch depends on the batch and pool size, not the meeting length.
+
+    def __init__(self, state: Optional[dict] = None, max_sentences: int = 5,
+                 pool_size: int = 50, max_terms: int = 1000, min_words: int = 3):
+        state = state or {}
+        self.max_sentences = max_sentences
+        self.pool_size = pool_size
+        self.max_terms = max_terms
+        self.min_words = min_words
+        self.terms: Counter = Counter(state.get("terms", {}))
+        self.pool: List[dict] = list(state.get("pool", []))
+        self.phrases_seen: int = state.get("phrases_seen", 0)
+
+    def add(self, rows: Iterable[dict]):
+        for row in rows:
+            self.phrases_seen += 1
+            words = [w for w in WORD_RE.findall(row["phrase"].lower())
+                     if len(w) > 2 and w not in STOPWORDS]
+            if not words:
+                continue
+            self.terms.update(words)
+            if len(words) >= self.min_words:
+                self.pool.append({"text": row["phrase"].strip(),
+                                  "created_at": row["created_at"],
+                                  "terms": sorted(set(words))})
+
+        if len(self.terms) > self.max_terms:
+            self.terms = Counter(dict(self.terms.most_common(self.max_terms)))
+        self.pool.sort(key=self.score, reverse=True)
+        del self.pool[self.pool_size:]
+
+    def score(self, candidate: dict) -> float:
+        # Phrases about the meeting's recurring topics rank highest; the square
+        # root keeps long rambling phrases from winning on length alone
+        terms = candidate["terms"]
+        return sum(self.terms.get(t, 0) for t in terms) / len(terms) ** 0.5
+
+    def sentences(self) -> List[dict]:
+        best = sorted(self.pool[:self.max_sentences], key=lambda c: c["created_at"])
+        return [{"text": c["text"], "created_at": c["created_at"]} for c in best]
+
+    def text(self) -> str:
+        return " ".join(s["text"] for s in self.sentences())
+
+    def state(self) -> dict:
+        return {"terms": dict(self.terms), "pool": self.pool, "phrases_seen": self.phrases_seen}
+
+
+class SummaryWorker:
+    # Background task that keeps a rolling summary per active meeting. Each
+    # round folds at most batch_size new phrases per meeting, read from the
+    # stored watermark, one meeting at a time on a single worker thread. Rounds
+    # are skipped while the phrase writer is backed up so summaries never hold
+    # up persisting live transcription.
+
+    def __init__(self, interval: float = 30.0, batch_size: int = 200,
+                 active_meetings: Callable[[], Iterable[str]] = None,
+                 busy: Callable[[], bool] = None):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.active_meetings = active_meetings or (lambda: ())
+        self.busy = busy or (lambda: False)
+        self._finishing: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.phrases = 0
+        self.skipped_rounds = 0
+        self.failures = 0
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def finish(self, meeting_id: str):
+        # Meeting has no clients left; fold in its remaining phrases once more
+        self._finishing.add(meeting_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "batches": self.batches,
+            "phrases": self.phrases,
+            "skipped_rounds": self.skipped_rounds,
+            "failures": self.failures,
+            "finishing": len(self._finishing),
+        }
+
+    def summarize_batch(self, meeting_id: str) -> int:
+        doc = get_summary(meeting_id) or {}
+        rows = list(iter_transcript(meeting_id, resume_token=doc.get("watermark"),
+                                    limit=self.batch_size))
+        if not rows:
+            return 0
+        rolling = RollingSummary(doc.get("state"))
+        rolling.add(rows)
+        # The watermark moves first; the processed flag only records it
+        save_summary(meeting_id, rolling.text(), rolling.sentences(), rolling.state(),
+                     rows[-1]["resume"])
+        mark_phrases_processed([row["phrase_id"] for row in rows], meeting_id)
+        self.batches += 1
+        self.phrases += len(rows)
+        return len(rows)
+
+    async def run_round(self):
+        if self.busy():
+            self.skipped_rounds += 1
+            return
+        meetings = list(dict.fromkeys([*self.active_meetings(), *self._finishing]))
+        for meeting_id in meetings:
+            try:
+                count = await run_db(self.summarize_batch, meeting_id)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to summarize meeting {meeting_id}: {e}")
+                continue
+            if count < self.batch_size:
+                self._finishing.discard(meeting_id)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_round()
+
+
+summary_worker = SummaryWorker(
+    interval=float(os.environ.get("SUMMARY_INTERVAL", "30")),
+    batch_size=int(os.environ.get("SUMMARY_BATCH_SIZE", "200")),
+)
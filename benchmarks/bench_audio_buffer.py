@@ -0,0 +1,130 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from apps.services.asr.audio_buffer import MeetingAudioBuffer, webrtcvad
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 2560  # 160ms, the orchestrator's default ASR_AUDIO_BATCH_MS
+# Phrase lengths up to the default 9 s soft split (ASR_SOFT_PHRASE_SECONDS)
+PHRASE_SECONDS = (1, 3, 5, 9)
+PHRASES = 10
+WORD_GAP = 0.2  # pause between words, too short to end a phrase
+TURN_GAP = 1.5  # pause between phrases
+
+
+class EnergyStandInVad:
+    # Used when webrtcvad is not installed. It is far cheaper per call than
+    # webrtcvad, which hides most of what skipping quiet frames saves, and is
+    # silent on the near-zero samples of the pauses below.
+    def is_speech(self, frame, sample_rate):
+        return frame[1::16].strip(b"\x00\xff") != b""
+
+
+def make_vad():
+    return webrtcvad.Vad(3) if webrtcvad is not None else EnergyStandInVad()
+
+
+class LegacyMeetingAudioBuffer:
+    # The bytes-concatenation implementation this benchmark compares against.
+    # It timed pauses by wall clock; audio arrives in real time, so the sample
+    # clock used here ends phrases at the same points. Every frame is
+    # classified, as endpointing on silence requires, so both buffers make
+    # the same decisions.
+
+    def __init__(self, phrase_timeout: float = 0.5, max_phrase_duration: float = 30.0):
+        self.phrase_timeout = phrase_timeout
+        self.max_phrase_duration = max_phrase_duration
+        self.vad = make_vad()
+        self.phrase_bytes = bytes()
+        self.frame_buffer = bytes()
+        self.frame_size = 320 * 2
+        self.clock = 0
+        self.last_audio_time = None
+        self.min_audio_duration = 0.2
+
+    def _has_speech_webrtc(self, audio_bytes: bytes):
+        self.frame_buffer += audio_bytes
+        while len(self.frame_buffer) >= self.frame_size:
+            frame = self.frame_buffer[:self.frame_size]
+            self.frame_buffer = self.frame_buffer[self.frame_size:]
+            self.clock += self.frame_size // 2
+            if self.vad.is_speech(frame, SAMPLE_RATE):
+                self.last_audio_time = self.clock
+
+    def add_audio_chunk(self, audio_bytes: bytes):
+        self._has_speech_webrtc(audio_bytes)
+        self.phrase_bytes += audio_bytes
+
+        phrase_duration = len(self.phrase_bytes) / (SAMPLE_RATE * 2)
+        silence_timeout = self.last_audio_time is not None and (
+            self.clock - self.last_audio_time >= self.phrase_timeout * SAMPLE_RATE)
+        phrase_complete = silence_timeout or phrase_duration >= self.max_phrase_duration
+        if phrase_complete and phrase_duration >= self.min_audio_duration and self.last_audio_time:
+            audio_np = np.frombuffer(
+                self.phrase_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+            self.phrase_bytes = bytes()
+            self.last_audio_time = None
+            return audio_np
+        return None
+
+
+def voiced(samples: int, rng) -> np.ndarray:
+    # A gliding harmonic series with some noise, which webrtcvad takes for speech
+    t = np.arange(samples) / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(140 + 20 * np.sin(2 * np.pi * 3 * t)) / SAMPLE_RATE
+    wave = sum(np.sin(k * phase) / k for k in range(1, 20))
+    wave = wave / np.abs(wave).max() * 3000 + rng.normal(0, 100, samples)
+    return wave.astype(np.int16)
+
+
+def make_stream(seconds: float) -> bytes:
+    # Each phrase is `seconds` of 300 ms words with WORD_GAP pauses, followed
+    # by TURN_GAP before the next. Pauses are near-zero, as browser noise
+    # suppression (on in AudioChunkRecorder) leaves them.
+    rng = np.random.default_rng(0)
+    word = int(0.3 * SAMPLE_RATE)
+    word_gap = int(WORD_GAP * SAMPLE_RATE)
+    phrase = int(seconds * SAMPLE_RATE)
+    speech = voiced(phrase, rng)
+    speech[np.arange(phrase) % (word + word_gap) >= word] = 0
+    parts = []
+    for _ in range(PHRASES):
+        parts.append(speech + rng.normal(0, 1, phrase).astype(np.int16))
+        parts.append(rng.normal(0, 1, int(TURN_GAP * SAMPLE_RATE)).astype(np.int16))
+    return np.concatenate(parts).tobytes()
+
+
+def run_stream(buffer, chunks) -> float:
+    phrases = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        if buffer.add_audio_chunk(chunk) is not None:
+            phrases += 1
+    elapsed = time.perf_counter() - start
+    assert phrases == PHRASES, phrases
+    return elapsed
+
+
+def bench(seconds: float, repeats: int = 10):
+    pcm = make_stream(seconds)
+    step = CHUNK_SAMPLES * 2
+    chunks = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+
+    legacy = min(run_stream(LegacyMeetingAudioBuffer(), chunks) for _ in range(repeats))
+    ring = min(run_stream(MeetingAudioBuffer("bench", vad=make_vad()), chunks)
+               for _ in range(repeats))
+    return legacy / PHRASES, ring / PHRASES
+
+
+if __name__ == "__main__":
+    print(f"vad: {'webrtcvad' if webrtcvad is not None else 'energy stand-in (webrtcvad not installed)'}")
+    print(f"{'phrase':>7} {'legacy ms':>10} {'ring ms':>10} {'speedup':>8}   (per phrase, pause included)")
+    for seconds in PHRASE_SECONDS:
+        legacy, ring = bench(seconds)
+        print(f"{seconds:>6}s {legacy * 1000:>10.2f} {ring * 1000:>10.2f} {legacy / ring:>7.1f}x")
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from apps.services.asr.inference_scheduler import InferenceScheduler
+from apps.services.asr.whisper_processor import WhisperProcessor
+
+CONFIGS = [(1, 0), (4, 25), (4, 100), (8, 100), (8, 250)]
+
+
+def load_phrase(path, seconds):
+    if path:
+        with wave.open(path, "rb") as f:
+            pcm = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        return pcm[:int(seconds * 16000)].astype(np.float32) / 32768.0
+    t = np.arange(int(seconds * 16000)) / 16000
+    return (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+async def run_config(processor, phrase, meetings, phrases_per_meeting, batch_size, wait_ms):
+    scheduler = InferenceScheduler(
+        processor.transcribe_audio, max_queue=meetings * phrases_per_meeting,
+        transcribe_batch=processor.transcribe_batch,
+        batch_size=batch_size, max_batch_wait=wait_ms / 1000)
+    await scheduler.start()
+    latencies = []
+    done = asyncio.Event()
+    total = meetings * phrases_per_meeting
+
+    async def submit_meeting(meeting_id):
+        for _ in range(phrases_per_meeting):
+            await asyncio.sleep(random.uniform(0, 0.2))
+            submitted = time.perf_counter()
+
+            async def cb(result, submitted=submitted):
+                latencies.append(time.perf_counter() - submitted)
+                if len(latencies) == total:
+                    done.set()
+            await scheduler.submit(meeting_id, phrase, cb)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(submit_meeting(f"bench-{i}") for i in range(meetings)))
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    await scheduler.stop()
+
+    latencies.sort()
+    return {
+        "throughput": total / elapsed,
+        "p50_ms": 1000 * latencies[len(latencies) // 2],
+        "p95_ms": 1000 * latencies[int(len(latencies) * 0.95) - 1],
+        "batch_avg": scheduler.stats()["batch_size_avg"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Throughput vs latency of cross-meeting batched inference")
+    parser.add_argument("--model", default="base.en")
+    parser.add_argument("--audio", help="16 kHz mono wav used as every phrase")
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--meetings", type=int, default=8)
+    parser.add_argument("--phrases", type=int, default=4)
+    args = parser.parse_args()
+
+    processor = WhisperProcessor(model_name=args.model, transcripts_dir=tempfile.mkdtemp())
+    if not processor.load_model():
+        sys.exit("faster-whisper model could not be loaded")
+    phrase = load_phrase(args.audio, args.seconds)
+
+    print(f"{'batch':>5} {'wait ms':>8} {'phrases/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'avg batch':>9}")
+    for batch_size, wait_ms in CONFIGS:
+        random.seed(0)
+        r = asyncio.run(run_config(processor, phrase, args.meetings, args.phrases,
+                                   batch_size, wait_ms))
+        print(f"{batch_size:>5} {wait_ms:>8} {r['throughput']:>10.2f} {r['p50_ms']:>8.0f} "
+              f"{r['p95_ms']:>8.0f} {r['batch_avg']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
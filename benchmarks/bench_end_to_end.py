@@ -0,0 +1,331 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+ASR_DIR = ROOT / "apps" / "services" / "asr"
+ORCHESTRATOR_DIR = ROOT / "apps" / "services" / "orchestrator"
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 2048  # ~128ms, what the browser worklet posts
+
+
+# --- servers (run in child processes via --serve) ---------------------------
+
+def install_stub_model(main, rtf: float):
+    # Stands in for faster-whisper: holds the inference thread for rtf x the
+    # phrase duration and returns a fixed transcript through the real result path
+    processor = main.whisper_processor
+
+    def transcribe(audio, meeting_id):
+        duration = len(audio) / SAMPLE_RATE
+        time.sleep(duration * rtf)
+        return processor._build_result(meeting_id, ["stub transcript"], duration, 1.0,
+                                       processor.tier)
+
+    processor.load_model = lambda: True
+    processor.transcribe_words = lambda audio, prompt="": []
+    main.scheduler.transcribe = transcribe
+    main.scheduler.transcribe_batch = lambda items: [transcribe(a, m) for a, m in items]
+
+
+def serve_asr(port: int, model: str, rtf: float):
+    import uvicorn
+    sys.path.insert(0, str(ASR_DIR))
+    import audio_buffer
+    if audio_buffer.webrtcvad is None:
+        # Without webrtcvad the energy gate alone decides what is speech
+        class EnergyOnlyVad:
+            def __init__(self, mode=3):
+                pass
+
+            def is_speech(self, frame, sample_rate):
+                return True
+        audio_buffer.webrtcvad = types.SimpleNamespace(Vad=EnergyOnlyVad)
+    import main
+    if model == "stub":
+        install_stub_model(main, rtf)
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve_orchestrator(port: int):
+    import mongomock
+    import uvicorn
+    sys.path.insert(0, str(ORCHESTRATOR_DIR))
+    import apps.services.orchestrator.db.connection as connection
+    connection.client = mongomock.MongoClient()
+    import main
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# --- process accounting ------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class ProcessSampler:
+    def __init__(self, pids):
+        self.pids = pids
+        self.start_cpu = {name: cpu_seconds(pid) for name, pid in pids.items()}
+        self.peak_rss = {name: rss_mb(pid) for name, pid in pids.items()}
+        self.started = time.monotonic()
+
+    async def run(self, interval: float = 0.5):
+        while True:
+            await asyncio.sleep(interval)
+            for name, pid in self.pids.items():
+                self.peak_rss[name] = max(self.peak_rss[name], rss_mb(pid))
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        report = {}
+        for name, pid in self.pids.items():
+            used = cpu_seconds(pid) - self.start_cpu[name]
+            report[name] = {
+                "cpu_seconds": round(used, 3),
+                "cpu_percent": round(100 * used / elapsed, 1),
+                "rss_peak_mb": round(self.peak_rss[name], 1),
+            }
+        return report
+
+
+def launch(role: str, port: int, args, env, cwd):
+    cmd = [sys.executable, __file__, "--serve", role, "--port", str(port),
+           "--model", args.model, "--rtf", str(args.rtf)]
+    return subprocess.Popen(cmd, env=env, cwd=cwd)
+
+
+def wait_healthy(port: int, proc, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server on port {port} exited with {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as r:
+                if r.status == 200:
+                    return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not become healthy")
+
+
+# --- load generator ----------------------------------------------------------
+
+def speech_schedule(rng: random.Random, seconds: float):
+    # Alternating talk spurts and pauses, like a speaker taking breaths
+    t, schedule = 0.0, []
+    while t < seconds:
+        talk, pause = rng.uniform(1.5, 5.0), rng.uniform(0.8, 2.0)
+        schedule += [("speech", talk), ("silence", pause)]
+        t += talk + pause
+    return schedule
+
+
+def synth(kind: str, seconds: float, rng: np.random.Generator) -> np.ndarray:
+    n = int(seconds * SAMPLE_RATE)
+    if kind == "silence":
+        return rng.normal(0, 8, n).astype(np.int16)
+    # Noise shaped by a ~4 Hz syllable envelope
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * np.arange(n) / SAMPLE_RATE)
+    return (rng.normal(0, 3000, n) * envelope).clip(-32768, 32767).astype(np.int16)
+
+
+class MeetingLoad:
+    def __init__(self, index: int, seconds: float, seed: int):
+        self.index = index
+        self.seconds = seconds
+        self.rng = random.Random(seed + index)
+        self.np_rng = np.random.default_rng(seed + index)
+        self.speech_ends = []
+        self.meeting_id = None
+
+
+async def create_meeting(orchestrator: str, title: str) -> str:
+    def post():
+        req = urllib.request.Request(f"http://{orchestrator}/meetings", method="POST",
+                                     data=json.dumps({"title": title}).encode(),
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=10) as r:
+            return json.loads(r.read())["meeting_id"]
+    return await asyncio.to_thread(post)
+
+
+async def drain(ws, results):
+    async for _ in ws:
+        results["messages"] += 1
+
+
+async def listen(ws, load: MeetingLoad, results):
+    # The k-th final transcript is matched to the k-th end of speech
+    matched = 0
+    async for raw in ws:
+        now = time.monotonic()
+        results["messages"] += 1
+        data = json.loads(raw)
+        if data.get("type") != "transcript" or not data.get("text"):
+            continue
+        if matched < len(load.speech_ends) and load.speech_ends[matched] <= now:
+            results["latencies"].append(now - load.speech_ends[matched])
+            matched += 1
+        else:
+            results["unmatched"] += 1
+
+
+async def run_meeting(load: MeetingLoad, orchestrator: str, listeners: int, results, tail: float):
+    import websockets
+    await asyncio.sleep(load.rng.uniform(0, 2.0))
+    load.meeting_id = await create_meeting(orchestrator, f"Load {load.index}")
+    url = f"ws://{orchestrator}/ws/meetings/{load.meeting_id}"
+
+    host = await websockets.connect(url, max_size=None)
+    await host.send(json.dumps({"type": "identify", "clientId": f"host-{load.index}"}))
+    await host.recv()  # connection_status; the first client is the host
+    tasks = [asyncio.create_task(drain(host, results))]
+    sockets = [host]
+    for i in range(listeners):
+        ws = await websockets.connect(url, max_size=None)
+        await ws.send(json.dumps({"type": "identify", "clientId": f"listener-{load.index}-{i}"}))
+        sockets.append(ws)
+        tasks.append(asyncio.create_task(listen(ws, load, results)))
+
+    loop = asyncio.get_running_loop()
+    started, sent = loop.time(), 0
+    for kind, seconds in speech_schedule(load.rng, load.seconds):
+        pcm = synth(kind, seconds, load.np_rng)
+        for i in range(0, len(pcm), CHUNK_SAMPLES):
+            chunk = pcm[i:i + CHUNK_SAMPLES]
+            await host.send(chunk.tobytes())
+            sent += len(chunk)
+            # Real-time pacing, as a microphone would deliver it
+            delay = started + sent / SAMPLE_RATE - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if kind == "speech":
+            load.speech_ends.append(time.monotonic())
+        results["audio_seconds"] += seconds
+
+    await asyncio.sleep(tail)
+    for ws in sockets:
+        await ws.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    ms = np.array(values) * 1000
+    return {
+        "count": len(values),
+        "p50": round(float(np.percentile(ms, 50)), 1),
+        "p90": round(float(np.percentile(ms, 90)), 1),
+        "p99": round(float(np.percentile(ms, 99)), 1),
+        "max": round(float(ms.max()), 1),
+        "mean": round(float(ms.mean()), 1),
+    }
+
+
+async def generate_load(args, orchestrator: str, sampler: ProcessSampler):
+    results = {"messages": 0, "latencies": [], "unmatched": 0, "audio_seconds": 0.0}
+    loads = [MeetingLoad(i, args.seconds, args.seed) for i in range(args.meetings)]
+    sampling = asyncio.create_task(sampler.run())
+    started = time.monotonic()
+    outcomes = await asyncio.gather(
+        *(run_meeting(load, orchestrator, args.listeners, results, args.tail) for load in loads),
+        return_exceptions=True)
+    elapsed = time.monotonic() - started
+    sampling.cancel()
+    errors = [repr(o) for o in outcomes if isinstance(o, Exception)]
+    return {
+        "config": {k: getattr(args, k) for k in ("meetings", "listeners", "seconds", "model", "rtf", "seed")},
+        "duration_s": round(elapsed, 2),
+        "audio_seconds": round(results["audio_seconds"], 1),
+        "final_latency_ms": percentiles(results["latencies"]),
+        "unmatched_finals": results["unmatched"],
+        "messages": results["messages"],
+        "messages_per_second": round(results["messages"] / elapsed, 2),
+        "processes": sampler.report(),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="End-to-end load test: N meetings stream PCM through both services to M listeners each")
+    parser.add_argument("--meetings", type=int, default=10)
+    parser.add_argument("--listeners", type=int, default=5, help="listener clients per meeting")
+    parser.add_argument("--seconds", type=float, default=30.0, help="audio streamed per meeting")
+    parser.add_argument("--tail", type=float, default=5.0, help="seconds to wait for the last finals")
+    parser.add_argument("--model", default="stub", help="'stub' or a faster-whisper model name, e.g. tiny.en")
+    parser.add_argument("--rtf", type=float, default=0.1, help="real-time factor of the stub model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--serve", choices=["asr", "orchestrator"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve == "asr":
+        return serve_asr(args.port, args.model, args.rtf)
+    if args.serve == "orchestrator":
+        return serve_orchestrator(args.port)
+
+    asr_port, orchestrator_port = free_port(), free_port()
+    workdir = tempfile.mkdtemp(prefix="verbatim-e2e-")
+    env = {**os.environ,
+           "ASR_MODEL": args.model if args.model != "stub" else "tiny.en",
+           "ASR_SERVICE_URL": f"ws://127.0.0.1:{asr_port}",
+           "MONGODB_URI": os.environ.get("MONGODB_URI", "mongodb://localhost:27017"),
+           "DB_NAME": os.environ.get("DB_NAME", "verbatim-bench")}
+    procs = {"asr": launch("asr", asr_port, args, env, workdir)}
+    try:
+        wait_healthy(asr_port, procs["asr"])
+        procs["orchestrator"] = launch("orchestrator", orchestrator_port, args, env, workdir)
+        wait_healthy(orchestrator_port, procs["orchestrator"])
+
+        sampler = ProcessSampler({name: p.pid for name, p in procs.items()})
+        report = asyncio.run(generate_load(args, f"127.0.0.1:{orchestrator_port}", sampler))
+    finally:
+        for proc in procs.values():
+            proc.terminate()
+        for proc in procs.values():
+            proc.wait(timeout=10)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import mongomock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "verbatim-bench")
+
+import apps.services.orchestrator.db.connection as connection
+from apps.services.orchestrator.db import meetings
+from apps.services.orchestrator.db.meeting_cache import MeetingCache
+
+queries = 0
+_find_one = mongomock.collection.Collection.find_one
+
+
+def counting_find_one(self, *args, **kwargs):
+    global queries
+    queries += 1
+    return _find_one(self, *args, **kwargs)
+
+
+def run(cache: MeetingCache, meeting_ids, requests: int, unknown_ratio: float, end_every: int):
+    # Frontends polling /meetings/{id}/status: mostly live meetings, some
+    # stale or mistyped ids, and meetings ending every so often
+    global queries
+    queries = 0
+    meetings.meeting_cache = cache
+    rng = random.Random(0)
+    unknown = [str(uuid.uuid4()) for _ in range(50)]
+    started = time.perf_counter()
+    for i in range(requests):
+        if rng.random() < unknown_ratio:
+            meetings.get_meeting_by_id(rng.choice(unknown))
+        else:
+            meetings.get_meeting_by_id(rng.choice(meeting_ids))
+        if end_every and i % end_every == end_every - 1:
+            meetings.end_meeting_by_id(rng.choice(meeting_ids))
+    return queries, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mongo lookups per status poll, with and without the meeting cache")
+    parser.add_argument("--meetings", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--unknown-ratio", type=float, default=0.05)
+    parser.add_argument("--end-every", type=int, default=1000,
+                        help="end a random meeting every N requests (0 disables)")
+    args = parser.parse_args()
+
+    connection.client = mongomock.MongoClient()
+    mongomock.collection.Collection.find_one = counting_find_one
+    meeting_ids = [meetings.create_meeting(f"Meeting {i}") for i in range(args.meetings)]
+
+    print(f"{'cache':>8} {'mongo queries':>14} {'per request':>12} {'wall ms':>10}")
+    for name, cache in (("off", MeetingCache(ttl=0, negative_ttl=0)), ("on", MeetingCache())):
+        count, elapsed = run(cache, meeting_ids, args.requests, args.unknown_ratio, args.end_every)
+        print(f"{name:>8} {count:>14} {count / args.requests:>12.3f} {elapsed * 1000:>10.1f}")
+        if name == "on":
+            print(f"cache stats: {cache.stats()}")
@@ -0,0 +1,65 @@
+import argparse
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from apps.services.asr.whisper_processor import WhisperProcessor, available_cores
+
+
+def load_audio(path, seconds):
+    if path:
+        with wave.open(path, "rb") as f:
+            pcm = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        return pcm.astype(np.float32) / 32768.0
+    rng = np.random.default_rng(0)
+    return (0.05 * rng.standard_normal(int(seconds * 16000))).astype(np.float32)
+
+
+def configurations(cores):
+    threads = sorted({1, max(1, cores // 2), cores})
+    for compute_type in ("float32", "int8_float32", "int8"):
+        for cpu_threads in threads:
+            yield compute_type, cpu_threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Real-time factor per CPU model configuration")
+    parser.add_argument("--model", default="base.en")
+    parser.add_argument("--audio", help="16 kHz mono wav fixture; synthetic noise if omitted")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio, args.seconds)
+    duration = len(audio) / 16000
+    transcripts_dir = tempfile.mkdtemp()
+
+    print(f"{'compute_type':>13} {'threads':>7} {'load s':>7} {'first s':>8} {'RTF':>6}")
+    for compute_type, cpu_threads in configurations(available_cores()):
+        processor = WhisperProcessor(
+            model_name=args.model, transcripts_dir=transcripts_dir, device="cpu",
+            compute_type=compute_type, cpu_threads=cpu_threads, warmup=True)
+        start = time.perf_counter()
+        if not processor.load_model():
+            sys.exit("faster-whisper model could not be loaded")
+        load_s = time.perf_counter() - start
+
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            processor.transcribe_audio(audio, "bench")
+            timings.append(time.perf_counter() - start)
+
+        print(f"{compute_type:>13} {cpu_threads:>7} {load_s:>7.2f} {timings[0]:>8.2f} "
+              f"{min(timings) / duration:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import os
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import bson
+import mongomock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "verbatim-bench")
+
+import apps.services.orchestrator.db.connection as connection
+from apps.services.orchestrator.db import phrase_buckets, phrases
+
+# Indexes each layout carries in production (db/mongo-init)
+INDEXES = {
+    "phrases": [([("phrase_id", 1)], {"unique": True}),
+                ([("meeting_id", 1), ("created_at", 1), ("_id", 1)], {}),
+                ([("phrase", "text")], {"default_language": "none"})],
+    phrase_buckets.BUCKETS_COLLECTION: [([("meeting_id", 1), ("bucket_start", 1)], {"unique": True}),
+                                        ([("phrases.phrase", "text")], {"default_language": "none"})],
+}
+
+
+def make_batches(meetings: int, per_meeting: int, batch: int, interval: float):
+    # Meetings run side by side; each PhraseWriter flush carries a few
+    # phrases from every live meeting
+    meeting_ids = [str(uuid.uuid4()) for _ in range(meetings)]
+    base = datetime(2026, 1, 1, 9, 0, 0)
+    docs = []
+    for i in range(per_meeting):
+        for meeting_id in meeting_ids:
+            doc = phrases.build_phrase_doc(meeting_id, f"phrase {i} of the weekly planning sync")
+            doc["created_at"] = base + timedelta(seconds=i * interval)
+            docs.append(doc)
+    return meeting_ids, [docs[i:i + batch] for i in range(0, len(docs), batch)]
+
+
+def index_keys(docs, collection: str) -> int:
+    # Keys the collection's indexes hold: one per document for _id and each
+    # regular index, and one per distinct word per document for the text
+    # index, which is where bucketing saves on repeated vocabulary
+    regular = len(INDEXES[collection])  # the text index's slot stands in for _id
+    keys = 0
+    for doc in docs:
+        texts = [doc["phrase"]] if "phrase" in doc else [p["phrase"] for p in doc["phrases"]]
+        keys += regular + len({w for text in texts for w in re.findall(r"\w+", text.lower())})
+    return keys
+
+
+def storage(db, collection: str, real: bool):
+    docs = list(db[collection].find())
+    keys = index_keys(docs, collection)
+    if real:
+        stats = db.command("collStats", collection)
+        return stats["count"], stats["size"], keys, stats["totalIndexSize"]
+    # mongomock has no collStats or index sizes; sum the documents' BSON size
+    return len(docs), sum(len(bson.encode(d)) for d in docs), keys, None
+
+
+def run(layout: str, db, batches, meeting_ids, real: bool):
+    phrases.PHRASE_STORAGE = layout
+    collection = "phrases" if layout == "documents" else phrase_buckets.BUCKETS_COLLECTION
+    db[collection].drop()
+    if real:
+        for keys, options in INDEXES[collection]:
+            db[collection].create_index(keys, **options)
+
+    started = time.perf_counter()
+    inserted = 0
+    for batch in batches:
+        # insert_many stamps _id on its input, so each layout gets fresh dicts
+        inserted += phrases.insert_phrases([dict(d) for d in batch])
+    insert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    read = 0
+    for meeting_id in meeting_ids:
+        read += sum(1 for _ in phrases.iter_transcript(meeting_id))
+    read_seconds = time.perf_counter() - started
+    assert read == inserted, (read, inserted)
+
+    count, size, keys, index_size = storage(db, collection, real)
+    return inserted / insert_seconds, read_seconds / len(meeting_ids), count, size, keys, index_size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-phrase documents vs time-bucketed phrase storage")
+    parser.add_argument("--meetings", type=int, default=20)
+    parser.add_argument("--phrases", type=int, default=1000, help="phrases per meeting")
+    parser.add_argument("--batch", type=int, default=64, help="phrases per insert call (PhraseWriter flush)")
+    parser.add_argument("--interval", type=float, default=4.0, help="seconds between a meeting's phrases")
+    parser.add_argument("--mongo-uri", help="benchmark against a real server instead of mongomock")
+    args = parser.parse_args()
+
+    real = bool(args.mongo_uri)
+    if real:
+        from pymongo import MongoClient
+        connection.client = MongoClient(args.mongo_uri)
+    else:
+        connection.client = mongomock.MongoClient()
+    db = connection.get_db()
+    meeting_ids, batches = make_batches(args.meetings, args.phrases, args.batch, args.interval)
+
+    if not real:
+        # mongomock scans and deep-copies every document on each update, so
+        # its insert rates say little about a server; the other columns hold
+        print("mongomock: insert rates are not representative; pass --mongo-uri for server numbers")
+    print(f"{'layout':>10} {'inserts/s':>11} {'read ms/mtg':>12} {'docs':>8} {'data KiB':>10} "
+          f"{'index keys':>11} {'index KiB':>10}")
+    for layout in ("documents", "buckets"):
+        rate, read_seconds, count, size, keys, index_size = run(layout, db, batches, meeting_ids, real)
+        index = f"{index_size / 1024:>10.1f}" if index_size is not None else f"{'n/a':>10}"
+        print(f"{layout:>10} {rate:>11.0f} {read_seconds * 1000:>12.2f} {count:>8} {size / 1024:>10.1f} "
+              f"{keys:>11} {index}")
+    if real:
+        for collection in INDEXES:
+            db[collection].drop()
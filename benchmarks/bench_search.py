@@ -0,0 +1,76 @@
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from apps.services.orchestrator.search_index import LiveSearchIndex
+
+
+def synthetic_corpus(meetings: int, phrases: int, vocabulary: int, seed: int = 0):
+    # Zipf-distributed words, so a few terms are everywhere and most are rare
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    weights = [1 / (i + 1) for i in range(vocabulary)]
+    start = datetime(2026, 1, 1)
+    for m in range(meetings):
+        for p in range(phrases):
+            text = " ".join(rng.choices(words, weights, k=rng.randint(4, 20)))
+            yield f"meeting-{m}", f"{m}-{p}", text, start + timedelta(seconds=p)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def linear_scan(corpus, query, limit=20):
+    # What answering from memory looks like without an index
+    pattern = re.compile("|".join(rf"\b{re.escape(t)}\b" for t in query.split()))
+    hits = [(len(pattern.findall(text)), phrase_id) for _, phrase_id, text, _ in corpus]
+    return sorted((h for h in hits if h[0]), reverse=True)[:limit]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live inverted index vs linear scan on a synthetic corpus")
+    parser.add_argument("--meetings", type=int, default=200)
+    parser.add_argument("--phrases", type=int, default=1000, help="phrases per meeting")
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=10)
+    args = parser.parse_args()
+
+    corpus = list(synthetic_corpus(args.meetings, args.phrases, args.vocabulary))
+    index = LiveSearchIndex(max_phrases=len(corpus))
+    started = time.perf_counter()
+    for row in corpus:
+        index.add(*row)
+    build = time.perf_counter() - started
+    print(f"indexed {len(corpus)} phrases in {build:.2f}s "
+          f"({len(corpus) / build:,.0f} phrases/s), {index.stats()['terms']} terms")
+
+    rng = random.Random(1)
+    queries = [" ".join(f"w{int(rng.paretovariate(1.2)) % args.vocabulary}" for _ in range(rng.randint(1, 3)))
+               for _ in range(args.queries)]
+    rows = [("all meetings", None), ("one meeting", "meeting-0")]
+    print(f"{'scope':>14} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, meeting_id in rows:
+        timings = []
+        for q in queries:
+            t = time.perf_counter()
+            index.search(q, meeting_id=meeting_id)
+            timings.append(1000 * (time.perf_counter() - t))
+        print(f"{label:>14} {statistics.median(timings):>8.2f} {percentile(timings, 0.99):>8.2f}")
+
+    timings = []
+    for q in queries[:args.scan_queries]:
+        t = time.perf_counter()
+        linear_scan(corpus, q)
+        timings.append(1000 * (time.perf_counter() - t))
+    print(f"{'linear scan':>14} {statistics.median(timings):>8.2f} {percentile(timings, 0.99):>8.2f}")
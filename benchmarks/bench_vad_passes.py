@@ -0,0 +1,78 @@
+import argparse
+import difflib
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from apps.services.asr.audio_buffer import MeetingAudioBuffer
+from apps.services.asr.whisper_processor import WhisperProcessor
+
+CHUNK_SAMPLES = 2048
+
+
+def phrases_from(path, trim_silence):
+    with wave.open(str(path), "rb") as f:
+        pcm = f.readframes(f.getnframes())
+    buf = MeetingAudioBuffer(path.stem, trim_silence=trim_silence)
+    step = CHUNK_SAMPLES * 2
+    phrases = []
+    for i in range(0, len(pcm), step):
+        phrase = buf.add_audio_chunk(pcm[i:i + step])
+        while phrase is not None:
+            phrases.append(phrase)
+            phrase = buf.pop_phrase()
+    # Trailing silence so the last phrase completes
+    phrase = buf.add_audio_chunk(np.zeros(16000, dtype=np.int16).tobytes())
+    if phrase is not None:
+        phrases.append(phrase)
+    return phrases
+
+
+def run(processor, phrases, meeting_id):
+    texts = []
+    start = time.perf_counter()
+    for phrase in phrases:
+        result = processor.transcribe_audio(phrase, meeting_id)
+        if result and result["text"]:
+            texts.append(result["text"])
+    return " ".join(texts), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latency saved by skipping faster-whisper's internal VAD")
+    parser.add_argument("fixtures", help="directory of 16 kHz mono wav files")
+    parser.add_argument("--model", default="base.en")
+    args = parser.parse_args()
+
+    transcripts_dir = tempfile.mkdtemp()
+    double = WhisperProcessor(model_name=args.model, transcripts_dir=transcripts_dir,
+                              internal_vad=True)
+    single = WhisperProcessor(model_name=args.model, transcripts_dir=transcripts_dir,
+                              internal_vad=False)
+    if not (double.load_model() and single.load_model()):
+        sys.exit("faster-whisper model could not be loaded")
+
+    print(f"{'fixture':>20} {'2x VAD s':>9} {'1x VAD s':>9} {'saved':>7} {'similarity':>10}")
+    totals = [0.0, 0.0]
+    for path in sorted(Path(args.fixtures).glob("*.wav")):
+        text_a, time_a = run(double, phrases_from(path, trim_silence=False), path.stem)
+        text_b, time_b = run(single, phrases_from(path, trim_silence=True), path.stem)
+        totals[0] += time_a
+        totals[1] += time_b
+        similarity = difflib.SequenceMatcher(None, text_a.lower().split(),
+                                             text_b.lower().split()).ratio()
+        print(f"{path.stem[:20]:>20} {time_a:>9.2f} {time_b:>9.2f} "
+              f"{(1 - time_b / time_a) * 100 if time_a else 0:>6.1f}% {similarity:>10.3f}")
+    print(f"{'total':>20} {totals[0]:>9.2f} {totals[1]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,18 @@
 
   targetDb.meetings.createIndex({ meeting_id: 1 }, { unique: true });
   targetDb.meetings.createIndex({ status: 1, created_at: 1 });
+  targetDb.meetings.createIndex({ status: 1, expires_at: 1 },
+    { partialFilterExpression: { expires_at: { $exists: true } } });
 
   targetDb.phrases.createIndex({ phrase_id: 1 }, { unique: true });
-  targetDb.phrases.createIndex({ meeting_id: 1, created_at: 1 });
+  targetDb.phrases.createIndex({ meeting_id: 1, created_at: 1, _id: 1 });
   targetDb.phrases.createIndex({ phrase: "text" }, { default_language: "none" });
 
+  // PHRASE_STORAGE=buckets
+  targetDb.phrase_buckets.createIndex({ meeting_id: 1, bucket_start: 1 }, { unique: true });
+  targetDb.phrase_buckets.createIndex({ "phrases.phrase": "text" }, { default_language: "none" });
+
+  targetDb.summaries.createIndex({ meeting_id: 1 }, { unique: true });
+
   print("Index creation complete.");
 })();
\ No newline at end of file
@@ -31,6 +31,8 @@ def patch_get_db(monkeypatch, mongomock_client):
     def _get_db():
         return mongocl[os.getenv("DB_NAME")]
     monkeypatch.setattr(connection, "get_db", _get_db, raising=False)
+    from apps.services.orchestrator.db.meeting_cache import meeting_cache
+    meeting_cache.clear()
     yield
 
 
@@ -0,0 +1,214 @@
+import asyncio
+import json
+
+from websockets.asyncio.server import serve
+
+from apps.services.asr.audio_framing import decode_frame, unpack_mux
+from apps.services.orchestrator.asr_client import ASRMuxClient
+from apps.services.orchestrator.audio_framing import pack_mux
+
+
+class StubMuxServer:
+    # Speaks the ASR service's /mux protocol and records what it receives
+    def __init__(self, credit=1 << 20):
+        self.credit = credit
+        self.connections = 0
+        self.control = []
+        self.audio = []
+        self.sockets = []
+
+    async def handler(self, ws):
+        self.connections += 1
+        self.sockets.append(ws)
+        async for message in ws:
+            if isinstance(message, str):
+                control = json.loads(message)
+                self.control.append((control["type"], control["meeting_id"]))
+                if control["type"] == "open":
+                    await ws.send(json.dumps({"type": "opened", "meeting_id": control["meeting_id"],
+                                              "encoding": "pcm16", "credit": self.credit}))
+            else:
+                meeting_id, payload = unpack_mux(message)
+                self.audio.append((meeting_id, len(message), decode_frame(bytes(payload))))
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_mux_tag_round_trip():
+    meeting_id, payload = unpack_mux(pack_mux("meeting-1", b"\x01\x02"))
+    assert meeting_id == "meeting-1"
+    assert bytes(payload) == b"\x01\x02"
+
+
+def test_meetings_share_one_connection():
+    async def run():
+        server = StubMuxServer()
+        async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            client = ASRMuxClient(f"ws://127.0.0.1:{port}", pool_size=1, batch_ms=10)
+            received = []
+
+            async def on_text(meeting_id, message):
+                received.append((meeting_id, json.loads(message)["text"]))
+            client.set_broadcast_callback(on_text)
+
+            assert await client.connect_to_meeting("m1")
+            assert await client.connect_to_meeting("m2")
+            await client.send_audio("m1", b"\x00\x01" * 160)
+            await client.send_audio("m2", b"\x00\x02" * 160)
+            await wait_until(lambda: len(server.audio) == 2)
+
+            await server.sockets[0].send(json.dumps({"meeting_id": "m2", "text": "hello"}))
+            await wait_until(lambda: received)
+
+            await client.disconnect_meeting("m1")
+            await wait_until(lambda: ("close", "m1") in server.control)
+            await client.close()
+
+            assert server.connections == 1
+            assert [m for m, _, _ in server.audio] == ["m1", "m2"]
+            assert received == [("m2", "hello")]
+            assert server.control[:2] == [("open", "m1"), ("open", "m2")]
+
+    asyncio.run(run())
+
+
+def test_stream_waits_for_credit():
+    async def run():
+        server = StubMuxServer(credit=100)
+        async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            client = ASRMuxClient(f"ws://127.0.0.1:{port}", pool_size=1, batch_ms=10)
+            assert await client.connect_to_meeting("m1")
+
+            for _ in range(3):
+                await client.send_audio("m1", b"\x00\x01" * 160)
+            await asyncio.sleep(0.1)
+            # The first frame overdraws the window; the rest is held back
+            assert len(server.audio) == 1
+            assert len(client.streams["m1"].buffer) == 640
+
+            await server.sockets[0].send(json.dumps(
+                {"type": "credit", "meeting_id": "m1", "bytes": server.audio[0][1]}))
+            await wait_until(lambda: len(server.audio) == 2)
+            seq, offset, pcm = server.audio[1][2]
+            assert (seq, offset, len(pcm)) == (1, 160, 320)
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_streams_reopen_after_connection_loss():
+    async def run():
+        server = StubMuxServer()
+        async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            client = ASRMuxClient(f"ws://127.0.0.1:{port}", pool_size=1, batch_ms=10)
+            client.pool[0].reconnect_delay = 0.01
+            assert await client.connect_to_meeting("m1")
+
+            await server.sockets[0].close()
+            await wait_until(lambda: server.control.count(("open", "m1")) == 2)
+            await wait_until(lambda: client.streams["m1"].credit > 0)
+            await client.send_audio("m1", b"\x00\x01" * 160)
+            await wait_until(lambda: server.audio)
+
+            assert server.connections == 2
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_pressure_sheds_silence_pauses_and_throttles_host():
+    async def run():
+        server = StubMuxServer()
+        async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            client = ASRMuxClient(f"ws://127.0.0.1:{port}", pool_size=1, batch_ms=10,
+                                  silence_hangover_ms=20)
+            throttles = []
+
+            async def on_throttle(meeting_id, level):
+                throttles.append((meeting_id, level))
+            client.set_throttle_callback(on_throttle)
+            assert await client.connect_to_meeting("m1")
+
+            async def pressure(level):
+                await server.sockets[0].send(json.dumps(
+                    {"type": "pressure", "meeting_id": "m1", "level": level}))
+                await wait_until(lambda: client.streams["m1"].pressure == level)
+
+            speech = b"\x00\x10" * 160
+            silence = b"\x00\x00" * 160
+            await pressure("high")
+            # 10ms batches become 40ms ones; silence past the 20ms hangover is shed
+            for chunk in (speech, silence, silence, silence, silence, speech):
+                await client.send_audio("m1", chunk)
+            assert client.shed_bytes == 2 * len(silence)
+            await wait_until(lambda: len(server.audio) == 1)
+            seq, offset, pcm = server.audio[0][2]
+            assert (seq, offset, len(pcm)) == (0, 0, 4 * 160)
+
+            await pressure("critical")
+            for _ in range(3):
+                await client.send_audio("m1", speech)
+            await asyncio.sleep(0.1)
+            assert len(server.audio) == 1
+
+            await pressure("ok")
+            await wait_until(lambda: len(server.audio) == 2)
+            seq, offset, pcm = server.audio[1][2]
+            assert (seq, offset, len(pcm)) == (1, 640, 3 * 160)
+            assert throttles == [("m1", "high"), ("m1", "critical"), ("m1", "ok")]
+            assert client.flow_stats()["throttled_meetings"] == 0
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_dedicated_listener_only_treats_pressure_messages_as_pressure():
+    from apps.services.orchestrator.asr_client import ASRClient, AudioStream
+
+    class FakeSocket:
+        def __init__(self, messages):
+            self.messages = messages
+
+        async def __aiter__(self):
+            for message in self.messages:
+                yield message
+
+        async def close(self):
+            pass
+
+    async def run():
+        client = ASRClient("ws://asr")
+        broadcast = []
+
+        async def on_message(meeting_id, message):
+            broadcast.append(json.loads(message)["text"])
+        client.set_broadcast_callback(on_message)
+
+        client.streams["m1"] = AudioStream()
+        levels = []
+        original = client._apply_pressure
+
+        async def apply_pressure(meeting_id, level):
+            levels.append(level)
+            await original(meeting_id, level)
+        client._apply_pressure = apply_pressure
+        client.connections["m1"] = FakeSocket([
+            json.dumps({"type": "final", "text": 'blood "pressure" is up'}),
+            json.dumps({"type": "pressure", "level": "high"}),
+            json.dumps({"type": "final", "text": "done"}),
+        ])
+        await client.listen_for_messages("m1")
+        return broadcast, levels
+
+    broadcast, levels = asyncio.run(run())
+    assert broadcast == ['blood "pressure" is up', "done"]
+    assert levels == ["high"]
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+from pathlib import Path
+
+from apps.services.orchestrator.asr_client import ASRClient, ASRMuxClient
+from apps.services.orchestrator.asr_pool import ASREndpoint, ShardedASRClient, create_asr_client, load_weight
+
+
+def run_stub_asr():
+    # Stub ASR instance: answers /load and speaks the /mux protocol, replying
+    # to every audio message with a transcript naming its own port
+    from websockets.asyncio.server import serve
+    from apps.services.asr.audio_framing import unpack_mux
+
+    async def main():
+        port = None
+        sessions = set()
+
+        def process_request(connection, request):
+            if request.path == "/load":
+                return connection.respond(HTTPStatus.OK, json.dumps(
+                    {"sessions": len(sessions), "queue_depth": 0, "rtf": 0.1}))
+
+        async def handler(ws):
+            async for message in ws:
+                if isinstance(message, str):
+                    control = json.loads(message)
+                    if control["type"] == "open":
+                        sessions.add(control["meeting_id"])
+                        await ws.send(json.dumps({"type": "opened", "encoding": "pcm16",
+                                                  "meeting_id": control["meeting_id"],
+                                                  "credit": 1 << 20}))
+                    else:
+                        sessions.discard(control["meeting_id"])
+                else:
+                    meeting_id, _ = unpack_mux(message)
+                    await ws.send(json.dumps({"type": "transcript", "meeting_id": meeting_id,
+                                              "text": str(port)}))
+
+        async with serve(handler, "127.0.0.1", 0, process_request=process_request) as server:
+            port = server.sockets[0].getsockname()[1]
+            print(port, flush=True)
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def launch_stubs(count):
+    procs, urls = [], []
+    for _ in range(count):
+        env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parent.parent)}
+        proc = subprocess.Popen([sys.executable, __file__], stdout=subprocess.PIPE,
+                                text=True, env=env)
+        procs.append(proc)
+        urls.append(f"ws://127.0.0.1:{int(proc.stdout.readline())}")
+    return procs, urls
+
+
+async def wait_until(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.02)
+
+
+def test_busy_instances_get_less_weight():
+    assert load_weight({"sessions": 0, "queue_depth": 0}) == 1.0
+    assert load_weight({"sessions": 10, "rtf": 0.5}) < load_weight({"sessions": 10, "rtf": 0.1})
+    assert load_weight({"sessions": 2, "queue_depth": 8}) < load_weight({"sessions": 2})
+    assert ASREndpoint("wss://asr:8001", None).load_url == "https://asr:8001/load"
+
+
+def test_multiplexing_is_opt_in(monkeypatch):
+    # ASR instances without /mux keep working unless multiplexing is asked for
+    monkeypatch.delenv("ASR_SERVICE_URLS", raising=False)
+    monkeypatch.delenv("ASR_MUX_CONNECTIONS", raising=False)
+    client = create_asr_client()
+    assert type(client) is ASRClient
+
+    monkeypatch.setenv("ASR_MUX_CONNECTIONS", "2")
+    client = create_asr_client()
+    assert isinstance(client, ASRMuxClient) and len(client.pool) == 2
+
+
+def test_removing_an_instance_only_moves_its_meetings():
+    client = ShardedASRClient(["ws://a", "ws://b", "ws://c"])
+    meetings = [f"meeting-{i}" for i in range(300)]
+    before = {m: client.rank(m)[0].url for m in meetings}
+    assert set(before.values()) == {"ws://a", "ws://b", "ws://c"}
+
+    client.endpoints[1].alive = False
+    after = {m: client.rank(m)[0].url for m in meetings}
+    assert all(after[m] == before[m] for m in meetings if before[m] != "ws://b")
+    assert "ws://b" not in after.values()
+
+
+def test_meetings_fail_over_between_processes():
+    procs, urls = launch_stubs(3)
+    try:
+        async def run():
+            client = ShardedASRClient(
+                urls, lambda url: ASRMuxClient(url, pool_size=1, batch_ms=10),
+                poll_interval=0.1, poll_timeout=0.5)
+            replies = {}
+
+            async def on_text(meeting_id, message):
+                replies[meeting_id] = json.loads(message)["text"]
+            client.set_broadcast_callback(on_text)
+
+            meetings = [f"meeting-{i}" for i in range(12)]
+            for meeting_id in meetings:
+                assert await client.connect_to_meeting(meeting_id)
+            await wait_until(lambda: all(e.load for e in client.endpoints))
+            placed = {m: client.placements[m].url for m in meetings}
+            assert len(set(placed.values())) > 1
+
+            for meeting_id in meetings:
+                await client.send_audio(meeting_id, b"\x00\x01" * 160)
+            await wait_until(lambda: len(replies) == len(meetings))
+            assert all(placed[m].endswith(replies[m]) for m in meetings)
+
+            victim = client.placements[meetings[0]]
+            procs[urls.index(victim.url)].kill()
+            await wait_until(lambda: not victim.alive)
+            await wait_until(lambda: all(client.placements.get(m) not in (None, victim)
+                                         for m in meetings))
+
+            replies.clear()
+            for meeting_id in meetings:
+                await client.send_audio(meeting_id, b"\x00\x01" * 160)
+            await wait_until(lambda: len(replies) == len(meetings))
+            stats = client.stats()
+            await client.close()
+            return placed, victim.url, stats
+
+        placed, dead_url, stats = asyncio.run(run())
+        assert stats["failovers"] == sum(1 for url in placed.values() if url == dead_url)
+        assert all(e["meetings"] == 0 for e in stats["endpoints"] if e["url"] == dead_url)
+    finally:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    run_stub_asr()
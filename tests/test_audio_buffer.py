@@ -38,3 +38,135 @@ def test_audio_buffer_reset():
     buf.reset_buffer()
 
     assert buf.phrase_bytes == b""
+
+
+def test_ring_buffer_wraps_and_keeps_latest():
+    from apps.services.asr.audio_buffer import PCMRingBuffer
+
+    ring = PCMRingBuffer(5)
+    ring.write(np.arange(1, 4, dtype=np.int16))
+    ring.write(np.arange(4, 8, dtype=np.int16))
+
+    assert len(ring) == 5
+    assert np.frombuffer(ring.tobytes(), dtype=np.int16).tolist() == [3, 4, 5, 6, 7]
+    assert np.allclose(ring.to_float32() * 32768.0, [3, 4, 5, 6, 7])
+
+
+def test_audio_buffer_overflow_carries_into_next_phrase():
+
+    class SpeechVad:
+        def is_speech(self, frame, sample_rate):
+            return True
+
+    buf = MeetingAudioBuffer("meeting-1", max_phrase_duration=0.25, vad=SpeechVad())
+    phrase = buf.add_audio_chunk((np.ones(5000) * 1000).astype(np.int16).tobytes())
+
+    assert len(phrase) == 4000
+    assert len(buf.phrase_ring) == 1000
+
+
+class _LoudVad:
+    def __init__(self):
+        self.calls = 0
+
+    def is_speech(self, frame, sample_rate):
+        self.calls += 1
+        return True
+
+
+def _speech_then_silence(speech_s, silence_s):
+    speech = (np.ones(int(speech_s * 16000)) * 1000).astype(np.int16)
+    silence = np.zeros(int(silence_s * 16000), dtype=np.int16)
+    return np.concatenate([speech, silence])
+
+
+def test_energy_gate_skips_vad_for_silent_frames():
+    vad = _LoudVad()
+    buf = MeetingAudioBuffer("meeting-1", vad=vad)
+    buf.add_audio_chunk(_speech_then_silence(0.2, 0.2).tobytes())
+
+    assert vad.calls == 10
+    assert buf.speech_mask().sum() == 10
+
+
+def test_phrase_boundary_is_independent_of_chunking():
+    pcm = _speech_then_silence(1.0, 1.0)
+
+    def phrases(chunk_samples):
+        buf = MeetingAudioBuffer("meeting-1", vad=_LoudVad())
+        out = []
+        for i in range(0, len(pcm), chunk_samples):
+            phrase = buf.add_audio_chunk(pcm[i:i + chunk_samples].tobytes())
+            if phrase is not None:
+                out.append(len(phrase))
+        return out
+
+    # Speech ends at 1.0s; the phrase is cut exactly phrase_timeout later
+    assert phrases(1000) == phrases(4096) == phrases(len(pcm)) == [24000]
+
+
+def test_speech_regions_pad_and_merge():
+    from apps.services.asr.audio_buffer import speech_regions
+
+    mask = np.array([0, 1, 1, 0, 0, 0, 1, 0], dtype=bool)
+    assert speech_regions(mask, 0, 2560, 0) == [(320, 960), (1920, 2240)]
+    assert speech_regions(mask, 0, 2560, 500) == [(0, 2560)]
+    assert speech_regions(np.zeros(4, dtype=bool), 0, 1280, 100) == []
+
+
+def test_trim_silence_keeps_only_padded_speech():
+    class EnergyVad:
+        def is_speech(self, frame, sample_rate):
+            return True
+
+    buf = MeetingAudioBuffer("meeting-1", vad=EnergyVad(), trim_silence=True, speech_pad=0.1)
+    pcm = np.concatenate([
+        np.zeros(8000, dtype=np.int16),
+        (np.ones(16000) * 1000).astype(np.int16),
+        np.zeros(16000, dtype=np.int16),
+    ])
+    phrase = buf.add_audio_chunk(pcm.tobytes())
+
+    # One second of speech plus 0.1s of padding either side
+    assert len(phrase) == 16000 + 2 * 1600
+    assert np.count_nonzero(phrase) == 16000
+
+
+def test_long_speech_splits_at_quietest_point_with_overlap():
+
+    class SpeechVad:
+        def is_speech(self, frame, sample_rate):
+            return True
+
+    # 3 s of continuous speech with a short dip in level at 2.5 s
+    pcm = (np.ones(3 * 16000) * 3000).astype(np.int16)
+    dip = int(2.5 * 16000)
+    pcm[dip - 800:dip + 800] = 300
+    buf = MeetingAudioBuffer("meeting-1", vad=SpeechVad(), soft_phrase_duration=2.8,
+                             split_window=1.0, split_overlap=0.2)
+
+    phrases = []
+    for i in range(0, len(pcm), 2048):
+        phrase = buf.add_audio_chunk(pcm[i:i + 2048].tobytes())
+        while phrase is not None:
+            phrases.append((phrase, buf.continues_previous))
+            phrase = buf.pop_phrase()
+
+    assert len(phrases) == 1
+    head, continues = phrases[0]
+    assert not continues
+    assert dip - 800 <= len(head) <= dip + 800
+    # The next phrase starts split_overlap before the cut
+    assert buf.phrase_start == len(head) - int(0.2 * 16000)
+
+    rest = buf.add_audio_chunk(np.zeros(16000, dtype=np.int16).tobytes())
+    assert rest is not None and buf.continues_previous
+    assert len(rest) >= len(pcm) - len(head)
+
+
+def test_quietest_point_finds_energy_valley():
+    from apps.services.asr.audio_buffer import quietest_point
+
+    audio = np.ones(16000, dtype=np.float32)
+    audio[12000:12400] = 0.01
+    assert abs(quietest_point(audio, 8000, 16000) - 12200) <= 160
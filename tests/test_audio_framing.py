@@ -0,0 +1,71 @@
+import asyncio
+
+import numpy as np
+from apps.services.asr.audio_framing import FrameSequencer, decode_frame, mulaw_decode, negotiate
+from apps.services.orchestrator.audio_framing import encode_frame, framing_offer, mulaw_encode
+from apps.services.orchestrator.asr_client import ASRClient, AudioStream
+
+
+def test_frames_round_trip_between_services():
+    pcm = (np.sin(np.arange(320) / 5) * 8000).astype(np.int16)
+
+    seq, offset, decoded = decode_frame(encode_frame(7, 3200, pcm.tobytes()))
+    assert (seq, offset) == (7, 3200)
+    assert np.array_equal(decoded, pcm)
+
+    _, _, decoded = decode_frame(encode_frame(8, 3520, pcm.tobytes(), "mulaw"))
+    # mu-law keeps roughly 14-bit precision, within 1/16 of the sample
+    assert np.all(np.abs(decoded.astype(np.int32) - pcm) <= np.abs(pcm) // 16 + 8)
+
+
+def test_mulaw_matches_g711_reference_points():
+    samples = np.array([0, -1, 32767, -32768], dtype=np.int16)
+    assert mulaw_encode(samples).tolist() == [0xFF, 0x7F, 0x80, 0x00]
+    assert mulaw_decode(np.array([0xFF, 0x80], dtype=np.uint8)).tolist() == [0, 32124]
+
+
+def test_sequencer_fills_gaps_with_silence():
+    seq = FrameSequencer("meeting-1")
+    chunk = np.ones(100, dtype=np.int16)
+
+    assert len(seq.accept(encode_frame(0, 0, chunk.tobytes()))) == 100
+    # Frame 1 (samples 100-199) was lost
+    filled = seq.accept(encode_frame(2, 200, chunk.tobytes()))
+
+    assert len(filled) == 200
+    assert not filled[:100].any()
+    assert seq.gaps == 1 and seq.lost_samples == 100
+
+
+def test_negotiation_falls_back_to_raw_for_old_clients():
+    assert negotiate({"type": "identify", "clientId": "x"}) is None
+    reply = negotiate({"type": "identify", "framing": framing_offer("mulaw")})
+    assert reply == {"type": "protocol", "framing": 1, "encoding": "mulaw"}
+
+
+def test_asr_client_coalesces_small_chunks():
+    class FakeWs:
+        def __init__(self):
+            self.sent = []
+
+        async def send(self, payload):
+            self.sent.append(payload)
+
+    async def run():
+        client = ASRClient("ws://asr", batch_ms=20, max_delay_ms=50)
+        ws = FakeWs()
+        client.connections["m1"] = ws
+        client.streams["m1"] = stream = AudioStream()
+        stream.encoding = "pcm16"
+
+        chunk = np.ones(128, dtype=np.int16).tobytes()
+        for _ in range(6):
+            await client.send_audio("m1", chunk)
+        await asyncio.sleep(0.1)
+        return ws.sent
+
+    sent = asyncio.run(run())
+
+    # 640 bytes per 20ms batch: one full frame, then the remainder on the latency cap
+    frames = [decode_frame(payload) for payload in sent]
+    assert [(seq, offset, len(pcm)) for seq, offset, pcm in frames] == [(0, 0, 384), (1, 384, 384)]
@@ -18,3 +18,54 @@ def test_connect_to_mongodb_failure(monkeypatch):
 
     result = connection.connect_to_mongodb()
     assert result is None
+
+
+def test_health_check_is_cached_and_shared(monkeypatch):
+    import asyncio
+
+    pings = []
+
+    def fake_connect():
+        pings.append(1)
+        return object()
+
+    monkeypatch.setattr(connection, "connect_to_mongodb", fake_connect)
+    health = connection.HealthCache(ttl=60)
+
+    async def run():
+        results = await asyncio.gather(*(health.check() for _ in range(5)))
+        results.append(await health.check())
+        return results
+
+    assert asyncio.run(run()) == [True] * 6
+    assert len(pings) == 1
+
+    health.checked_at -= 61
+    monkeypatch.setattr(connection, "connect_to_mongodb", lambda: None)
+    assert asyncio.run(health.check()) is False
+
+
+def test_async_data_layer_runs_on_db_pool():
+    import asyncio
+    import threading
+    from apps.services.orchestrator.db.meetings import create_meeting_async, get_meeting_by_id_async
+    from apps.services.orchestrator.db.meeting_cache import meeting_cache
+    from apps.services.orchestrator.db.phrases import create_phrase_async, iter_transcript_async
+
+    async def run():
+        meeting_id = await create_meeting_async("Async meeting")
+        for text in ("one", "two", "three"):
+            await create_phrase_async(meeting_id, text)
+        misses = meeting_cache.misses
+        meeting = await get_meeting_by_id_async(meeting_id)
+        await get_meeting_by_id_async(meeting_id)
+        # One miss loads the meeting; the second lookup is a hit
+        assert meeting_cache.misses == misses + 1
+        rows = [row["phrase"] async for row in iter_transcript_async(meeting_id)]
+        thread = await connection.run_db(lambda: threading.current_thread().name)
+        return meeting, rows, thread
+
+    meeting, rows, thread = asyncio.run(run())
+    assert meeting.title == "Async meeting"
+    assert rows == ["one", "two", "three"]
+    assert thread.startswith("mongo")
@@ -1,3 +1,4 @@
+import base64
 import pytest
 from apps.services.orchestrator.db.phrases import create_phrase, get_unprocessed_phrases, mark_phrases_processed
 
@@ -21,3 +22,80 @@ def test_create_get_mark_phrase():
     remaining = get_unprocessed_phrases(meeting_id)
     remaining_ids = [str(p.phrase_id) for p in remaining]
     assert str(pid1) not in remaining_ids
+
+
+def test_transcript_pages_resume_across_equal_timestamps():
+    from datetime import datetime, timedelta
+    from apps.services.orchestrator.db.meetings import create_meeting
+    from apps.services.orchestrator.db.phrases import build_phrase_doc, insert_phrases, iter_transcript
+    meeting_id = create_meeting("Transcript meeting")
+
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    docs = []
+    for i in range(7):
+        doc = build_phrase_doc(meeting_id, f"phrase {i}")
+        # Pairs of phrases share a timestamp
+        doc["created_at"] = base + timedelta(seconds=i // 2)
+        docs.append(doc)
+    insert_phrases(docs)
+
+    first = list(iter_transcript(meeting_id, limit=3))
+    assert set(first[0]) == {"phrase_id", "phrase", "created_at", "resume"}
+    rest = list(iter_transcript(meeting_id, resume_token=first[-1]["resume"]))
+    assert [r["phrase"] for r in first + rest] == [f"phrase {i}" for i in range(7)]
+
+    ranged = list(iter_transcript(meeting_id, start=base + timedelta(seconds=1),
+                                  end=base + timedelta(seconds=3)))
+    assert [r["phrase"] for r in ranged] == ["phrase 2", "phrase 3", "phrase 4", "phrase 5"]
+
+
+def test_transcript_pages_through_a_run_of_equal_timestamps():
+    from datetime import datetime
+    from apps.services.orchestrator.db.meetings import create_meeting
+    from apps.services.orchestrator.db.phrases import build_phrase_doc, insert_phrases, iter_transcript
+    meeting_id = create_meeting("Tied transcript")
+
+    docs = [build_phrase_doc(meeting_id, f"phrase {i}") for i in range(9)]
+    for doc in docs:
+        doc["created_at"] = datetime(2026, 1, 1, 12, 0, 0)
+    insert_phrases(docs)
+
+    seen, token = [], None
+    while True:
+        page = list(iter_transcript(meeting_id, resume_token=token, limit=2))
+        if not page:
+            break
+        seen += [r["phrase"] for r in page]
+        token = page[-1]["resume"]
+    assert seen == [f"phrase {i}" for i in range(9)]
+
+
+def test_transcript_endpoint_streams_ndjson_and_text(monkeypatch):
+    import json
+    from pathlib import Path
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from apps.services.orchestrator.db.meetings import create_meeting
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parent.parent / "apps/services/orchestrator"))
+    from routes import meetings as meeting_routes
+
+    app = FastAPI()
+    app.include_router(meeting_routes.router)
+    client = TestClient(app)
+    meeting_id = create_meeting("Streamed meeting")
+    for text in ("one", "two", "three"):
+        create_phrase(meeting_id, text)
+
+    response = client.get(f"/meetings/{meeting_id}/transcript", params={"limit": 2})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["text"] for r in rows] == ["one", "two"]
+
+    response = client.get(f"/meetings/{meeting_id}/transcript",
+                          params={"format": "text", "resume": rows[-1]["resume"]})
+    assert response.text.endswith("] three\n")
+
+    assert client.get(f"/meetings/{meeting_id}/transcript", params={"resume": "!!"}).status_code == 400
+    numeric = base64.urlsafe_b64encode(b"2026-01-01T12:00:00|3").decode("ascii")
+    assert client.get(f"/meetings/{meeting_id}/transcript", params={"resume": numeric}).status_code == 400
+    assert client.get("/meetings/00000000-0000-0000-0000-00000000dead/transcript").status_code == 404
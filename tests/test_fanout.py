@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from apps.services.orchestrator.fanout import DATA, PRESENCE, Fanout
+
+
+class FakeWebSocket:
+    def __init__(self, block=False):
+        self.sent = []
+        self.closed_with = None
+        self._gate = asyncio.Event()
+        if not block:
+            self._gate.set()
+
+    async def send_text(self, payload):
+        await self._gate.wait()
+        self.sent.append(payload)
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+
+
+def test_broadcast_encodes_once_and_reaches_every_client():
+    async def run():
+        fanout = Fanout()
+        sockets = [FakeWebSocket() for _ in range(3)]
+        senders = [fanout.open(ws, f"c{i}") for i, ws in enumerate(sockets)]
+        assert fanout.broadcast(senders, {"type": "message", "content": "hi"}) == 3
+        await asyncio.sleep(0.01)
+        for sender in senders:
+            await fanout.close(sender)
+        return sockets, fanout.stats()
+
+    sockets, stats = asyncio.run(run())
+
+    assert all(ws.sent == [json.dumps({"type": "message", "content": "hi"})] for ws in sockets)
+    assert stats["messages"] == 1
+
+
+def test_slow_client_does_not_block_others_and_is_disconnected():
+    async def run():
+        fanout = Fanout(max_queue=2)
+        slow, fast = FakeWebSocket(block=True), FakeWebSocket()
+        senders = [fanout.open(slow, "slow"), fanout.open(fast, "fast")]
+        for i in range(4):
+            fanout.broadcast(senders, {"n": i})
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        return slow, fast, senders
+
+    slow, fast, senders = asyncio.run(run())
+
+    assert len(fast.sent) == 4
+    assert senders[0].closed
+    assert slow.closed_with == 1013
+    assert not senders[0]._closing
+
+
+def test_presence_updates_are_coalesced():
+    async def run():
+        fanout = Fanout()
+        ws = FakeWebSocket(block=True)
+        sender = fanout.open(ws, "c1")
+        await asyncio.sleep(0)
+        for count in range(5):
+            fanout.broadcast([sender], {"type": "client_list", "count": count}, PRESENCE)
+        fanout.broadcast([sender], {"type": "transcript", "text": "kept"}, DATA)
+        queued = sender.depth()
+        ws._gate.set()
+        await asyncio.sleep(0.01)
+        await fanout.close(sender)
+        return queued, ws.sent
+
+    queued, sent = asyncio.run(run())
+
+    # One message may already be in flight when the writer is blocked
+    assert queued <= 2
+    assert json.loads(sent[-1])["text"] == "kept"
+    assert sum(json.loads(m).get("type") == "client_list" for m in sent) <= 2
@@ -0,0 +1,157 @@
+import asyncio
+import time
+
+import numpy as np
+from apps.services.asr.inference_scheduler import InferenceScheduler
+
+
+def test_scheduler_keeps_per_meeting_order():
+
+    def transcribe(audio, meeting_id):
+        # Earlier phrases take longer, so ordering has to come from the scheduler
+        time.sleep(0.01 * (3 - int(audio[0])))
+        return {"meeting_id": meeting_id, "index": int(audio[0])}
+
+    async def run():
+        scheduler = InferenceScheduler(transcribe, max_queue=8, workers=3)
+        await scheduler.start()
+        delivered = {"a": [], "b": []}
+
+        for i in range(3):
+            for meeting_id in ("a", "b"):
+                async def cb(result, meeting_id=meeting_id):
+                    delivered[meeting_id].append(result["index"])
+                await scheduler.submit(meeting_id, np.array([i], dtype=np.float32), cb)
+
+        while scheduler.queue_depth() or scheduler.stats()["running"]:
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+        return delivered, scheduler.stats()
+
+    delivered, stats = asyncio.run(run())
+
+    assert delivered == {"a": [0, 1, 2], "b": [0, 1, 2]}
+    assert stats["completed"] == 6
+    assert stats["queue_depth"] == 0
+    assert stats["rtf"] > 0
+
+
+def test_scheduler_applies_backpressure():
+
+    def transcribe(audio, meeting_id):
+        time.sleep(0.05)
+        return None
+
+    async def noop(result):
+        pass
+
+    async def run():
+        scheduler = InferenceScheduler(transcribe, max_queue=1, workers=1)
+        await scheduler.start()
+        await scheduler.submit("a", np.zeros(1, dtype=np.float32), noop)
+        blocked = asyncio.create_task(
+            scheduler.submit("b", np.zeros(1, dtype=np.float32), noop))
+        await asyncio.sleep(0.01)
+        was_blocked = not blocked.done()
+        await blocked
+        await scheduler.stop()
+        return was_blocked
+
+    assert asyncio.run(run())
+
+
+def test_scheduler_batches_across_meetings():
+    batches = []
+
+    def transcribe(audio, meeting_id):
+        batches.append([meeting_id])
+        return {"meeting_id": meeting_id}
+
+    def transcribe_batch(items):
+        batches.append([meeting_id for _, meeting_id in items])
+        return [{"meeting_id": meeting_id} for _, meeting_id in items]
+
+    async def run():
+        scheduler = InferenceScheduler(transcribe, max_queue=8, workers=1,
+                                       transcribe_batch=transcribe_batch,
+                                       batch_size=4, max_batch_wait=0.05)
+        await scheduler.start()
+        routed = []
+
+        for meeting_id in ("a", "b", "c"):
+            async def cb(result, meeting_id=meeting_id):
+                routed.append((meeting_id, result["meeting_id"]))
+            await scheduler.submit(meeting_id, np.zeros(1, dtype=np.float32), cb)
+
+        while scheduler.queue_depth() or scheduler.stats()["running"]:
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+        return routed
+
+    routed = asyncio.run(run())
+
+    assert batches == [["a", "b", "c"]]
+    assert all(expected == actual for expected, actual in routed)
+
+
+def test_scheduler_reports_pressure_from_queue_fill():
+    from apps.services.asr.inference_scheduler import PRESSURE_CRITICAL, PRESSURE_HIGH, PRESSURE_OK
+
+    scheduler = InferenceScheduler(lambda audio, meeting_id: None, max_queue=10)
+    levels = []
+    for depth in (0, 4, 5, 8, 9, 10):
+        scheduler._depth = depth
+        levels.append(scheduler.pressure())
+    assert levels == [PRESSURE_OK, PRESSURE_OK, PRESSURE_HIGH, PRESSURE_HIGH,
+                      PRESSURE_CRITICAL, PRESSURE_CRITICAL]
+
+
+def test_partials_are_capped_and_do_not_delay_finals():
+
+    def partial(_):
+        time.sleep(0.1)
+        return ["word"]
+
+    def transcribe(audio, meeting_id):
+        return {"meeting_id": meeting_id}
+
+    async def run():
+        scheduler = InferenceScheduler(transcribe, max_queue=8, workers=1, partial_workers=1)
+        await scheduler.start()
+        partials = [asyncio.create_task(scheduler.run_partial(partial, i)) for i in range(20)]
+        await asyncio.sleep(0.01)
+        done = asyncio.Event()
+
+        async def deliver(result):
+            done.set()
+
+        started = time.monotonic()
+        await scheduler.submit("m", np.zeros(1600, dtype=np.float32), deliver)
+        await asyncio.wait_for(done.wait(), timeout=2)
+        final_wait = time.monotonic() - started
+        results = await asyncio.gather(*partials)
+        await scheduler.stop()
+        return final_wait, results, scheduler.stats()
+
+    final_wait, results, stats = asyncio.run(run())
+    assert final_wait < 0.05
+    assert sum(r is not None for r in results) == 1
+    assert stats["partials_dropped"] == 19
+
+
+def test_quality_is_restored_after_the_queue_drains():
+    from apps.services.asr.quality_governor import QualityGovernor
+
+    governor = QualityGovernor(restore_hold=0)
+    scheduler = InferenceScheduler(lambda audio, meeting_id: None, governor=governor)
+    governor.level = 1
+    # The last phrases ran too slowly to restore quality, and nothing has run since
+    scheduler._timings.append((0.6, 1.0))
+
+    scheduler._depth = 1
+    scheduler.review_quality()
+    assert governor.level == 1
+
+    scheduler._depth = 0
+    scheduler.review_quality()
+    assert governor.level == 0
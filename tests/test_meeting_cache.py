@@ -0,0 +1,61 @@
+import time
+import uuid
+
+import apps.services.orchestrator.db.connection as connection
+from apps.services.orchestrator.db.meeting_cache import MeetingCache, meeting_cache
+from apps.services.orchestrator.db.meetings import (
+    create_meeting, delete_meeting_by_id, end_meeting_by_id, get_meeting_by_id)
+
+
+def test_lookups_are_served_from_cache_until_invalidated():
+    meeting_id = create_meeting("Cached")
+    hits = meeting_cache.hits
+    assert get_meeting_by_id(meeting_id).status == "active"
+    assert get_meeting_by_id(meeting_id).status == "active"
+    assert meeting_cache.hits == hits + 1
+
+    end_meeting_by_id(meeting_id)
+    assert get_meeting_by_id(meeting_id).status == "ended"
+
+    delete_meeting_by_id(meeting_id)
+    assert get_meeting_by_id(meeting_id) is None
+
+
+def test_unknown_ids_are_cached_as_missing():
+    unknown = str(uuid.uuid4())
+    negative_hits = meeting_cache.negative_hits
+    assert get_meeting_by_id(unknown) is None
+    # Written behind the cache's back; the negative entry still answers
+    connection.get_db()["meetings"].insert_one(
+        {"meeting_id": unknown, "title": "Late", "status": "active"})
+    assert get_meeting_by_id(unknown) is None
+    assert meeting_cache.negative_hits == negative_hits + 1
+
+    meeting_cache.invalidate(unknown)
+    assert get_meeting_by_id(unknown).title == "Late"
+
+
+def test_entries_expire_and_least_recently_used_are_evicted():
+    cache = MeetingCache(max_entries=2, ttl=0.05, negative_ttl=0.05)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, "A")
+    assert cache.evictions == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") == (False, None)
+
+
+def test_lookup_racing_an_invalidation_is_not_cached():
+    cache = MeetingCache()
+    generation = cache.generation("a")
+    other = cache.generation("b")
+    cache.invalidate("a")
+    cache.put("a", "stale", generation)
+    assert cache.get("a") == (False, None)
+    # Invalidating one meeting leaves lookups of others cacheable
+    cache.put("b", "B", other)
+    assert cache.get("b") == (True, "B")
@@ -0,0 +1,47 @@
+import asyncio
+
+import apps.services.orchestrator.db.connection as connection
+from apps.services.orchestrator.db.meetings import (
+    cancel_meeting_expiry, create_meeting, get_meeting_by_id, schedule_meeting_expiry)
+from apps.services.orchestrator.db.phrases import create_phrase
+from apps.services.orchestrator.meeting_reaper import MeetingReaper
+
+
+def test_reaper_ends_only_meetings_whose_expiry_is_due():
+    due = create_meeting("Idle")
+    later = create_meeting("Idle, not yet due")
+    rejoined = create_meeting("Rejoined")
+    create_phrase(due, "last words")
+
+    schedule_meeting_expiry(due, -1)
+    schedule_meeting_expiry(later, 600)
+    schedule_meeting_expiry(rejoined, -1)
+    cancel_meeting_expiry(rejoined)
+
+    # A fresh reaper stands in for a restarted process; the schedule is in Mongo
+    dropped = []
+    reaper = MeetingReaper(on_end=dropped.append)
+    assert asyncio.run(reaper.sweep()) == [due]
+    assert dropped == [due]
+
+    meeting = get_meeting_by_id(due)
+    assert meeting.status == "ended" and meeting.ended_at is not None
+    assert meeting.expires_at is None
+    assert get_meeting_by_id(later).status == "active"
+    assert get_meeting_by_id(rejoined).status == "active"
+
+    # Ending a meeting is one meeting write; its phrases are left alone
+    phrase = connection.get_db()["phrases"].find_one({"meeting_id": due})
+    assert "meeting_ended_at" not in phrase
+
+    assert asyncio.run(reaper.sweep()) == []
+    assert reaper.stats() == {"sweeps": 2, "ended": 1, "failures": 0}
+
+
+def test_reaper_drains_more_than_one_batch():
+    meeting_ids = [create_meeting(f"Idle {i}") for i in range(5)]
+    for meeting_id in meeting_ids:
+        schedule_meeting_expiry(meeting_id, -1)
+
+    reaper = MeetingReaper(batch_size=2)
+    assert sorted(asyncio.run(reaper.sweep())) == sorted(meeting_ids)
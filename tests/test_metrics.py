@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from pathlib import Path
+
+import numpy as np
+from apps.services.asr.inference_scheduler import InferenceScheduler
+from apps.services.asr.metrics import Histogram, LogSampler, Registry, registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_seconds_count 4" in lines
+    assert "test_seconds_sum 4.05" in lines
+
+
+def test_registry_renders_gauges_and_reuses_metrics():
+    reg = Registry()
+    depth = [3]
+    reg.gauge("test_depth", "Queue depth", lambda: depth[0])
+    assert reg.histogram("test_latency", "Latency") is reg.histogram("test_latency", "Latency")
+
+    depth[0] = 7
+    text = reg.render()
+    assert "# TYPE test_depth gauge" in text
+    assert "test_depth 7" in text
+    assert "# TYPE test_latency histogram" in text
+
+
+def test_log_sampler_logs_first_and_every_nth(caplog):
+    logger = logging.getLogger("test_metrics.sampler")
+    sampler = LogSampler(every=10)
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        for _ in range(25):
+            sampler.log(logger, logging.WARNING, "noisy", "Dropped frame")
+        sampler.log(logger, logging.WARNING, "other", "Other event")
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages == [
+        "Dropped frame",
+        "Dropped frame (10 so far)",
+        "Dropped frame (20 so far)",
+        "Other event",
+    ]
+
+
+def test_scheduler_records_queue_wait_and_inference_time():
+
+    def transcribe(audio, meeting_id):
+        return {"meeting_id": meeting_id}
+
+    async def run():
+        scheduler = InferenceScheduler(transcribe, max_queue=4, workers=1)
+        await scheduler.start()
+        done = asyncio.Event()
+
+        async def deliver(result):
+            done.set()
+
+        await scheduler.submit("m", np.zeros(16000, dtype=np.float32), deliver)
+        await asyncio.wait_for(done.wait(), timeout=2)
+        await scheduler.stop()
+
+    before = registry.histogram("asr_inference_seconds", "").snapshot()[2]
+    asyncio.run(run())
+    text = registry.render()
+    assert registry.histogram("asr_inference_seconds", "").snapshot()[2] == before + 1
+    assert "asr_inference_queue_wait_seconds_count" in text
+    assert "asr_real_time_factor_bucket" in text
+
+
+def test_log_sampler_bounds_its_keys(caplog):
+    logger = logging.getLogger("test_metrics.bounded")
+    sampler = LogSampler(every=2, max_keys=2)
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        for key in ("a", "b", "c", "a"):
+            sampler.log(logger, logging.WARNING, key, f"event {key}")
+
+    assert len(sampler._seen) == 2
+    # "a" was dropped to make room for "c", so it counts as new again
+    assert [r.getMessage() for r in caplog.records] == ["event a", "event b", "event c", "event a"]
+
+
+def test_service_metrics_modules_are_identical():
+    services = Path(__file__).resolve().parent.parent / "apps" / "services"
+    assert (services / "asr" / "metrics.py").read_text() == (services / "orchestrator" / "metrics.py").read_text()
@@ -0,0 +1,50 @@
+import numpy as np
+from apps.services.asr.partial_transcriber import PartialTranscriber, agreed_prefix
+
+
+def test_agreed_prefix_ignores_case_and_punctuation():
+    previous = [(" Hello", 0.0, 0.4), (" world.", 0.4, 0.8)]
+    current = [(" hello", 0.0, 0.4), (" world", 0.4, 0.8), (" again", 0.8, 1.2)]
+
+    assert agreed_prefix(previous, current) == 2
+
+
+def test_partial_commits_agreed_words_and_skips_committed_audio():
+    pt = PartialTranscriber("meeting-1", interval=0.5)
+    audio = np.zeros(16000, dtype=np.float32)
+
+    first = pt.begin(audio)
+    msg = pt.finish(first, [(" hello", 0.0, 0.4), (" word", 0.4, 0.8)])
+    assert msg["type"] == "partial"
+    assert msg["committed"] == ""
+    assert msg["text"] == "hello word"
+
+    audio = np.zeros(24000, dtype=np.float32)
+    second = pt.begin(audio)
+    msg = pt.finish(second, [(" hello", 0.0, 0.4), (" world", 0.4, 0.8), (" again", 0.8, 1.2)])
+    assert msg["committed"] == "hello"
+    assert msg["tentative"] == "world again"
+
+    third = pt.begin(np.zeros(32000, dtype=np.float32))
+    assert third.start_sample == int(0.4 * 16000)
+    assert third.prompt == "hello"
+
+
+def test_partial_is_dropped_after_phrase_reset():
+    pt = PartialTranscriber("meeting-1", interval=0.5)
+    job = pt.begin(np.zeros(16000, dtype=np.float32))
+    pt.reset()
+
+    assert pt.finish(job, [(" late", 0.0, 0.4)]) is None
+
+
+def test_partial_respects_interval_and_compute_budget():
+    pt = PartialTranscriber("meeting-1", interval=0.5, compute_budget=0.25)
+    assert not pt.due(4000)
+    assert pt.due(8000)
+
+    job = pt.begin(np.zeros(8000, dtype=np.float32))
+    assert not pt.due(16000)
+    pt.finish(job, [], elapsed=2.0)
+
+    assert not pt.due(16000)
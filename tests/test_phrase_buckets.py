@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+from apps.services.orchestrator.db import phrase_buckets, phrases
+from apps.services.orchestrator.db.connection import get_db
+from apps.services.orchestrator.db.meetings import create_meeting
+
+
+@pytest.fixture
+def bucketed(monkeypatch):
+    monkeypatch.setattr(phrases, "PHRASE_STORAGE", "buckets")
+
+
+def test_bucketed_phrases_unprocessed_and_mark(bucketed):
+    meeting_id = create_meeting("Bucketed meeting")
+    pid1 = phrases.create_phrase(meeting_id, "Hello world")
+    pid2 = phrases.create_phrase(meeting_id, "Second phrase")
+
+    assert get_db()["phrases"].count_documents({"meeting_id": meeting_id}) == 0
+    assert get_db()[phrase_buckets.BUCKETS_COLLECTION].count_documents({"meeting_id": meeting_id}) == 1
+    assert [p.phrase for p in phrases.get_unprocessed_phrases(meeting_id)] == ["Hello world", "Second phrase"]
+
+    assert phrases.mark_phrases_processed([pid1], meeting_id) == 1
+    assert phrases.mark_phrases_processed([pid1], meeting_id) == 0
+    assert [str(p.phrase_id) for p in phrases.get_unprocessed_phrases(meeting_id)] == [pid2]
+
+
+def test_bucketed_insert_is_idempotent_and_splits_windows(bucketed):
+    meeting_id = create_meeting("Bucket windows")
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    docs = []
+    for i in range(6):
+        doc = phrases.build_phrase_doc(meeting_id, f"phrase {i}")
+        doc["created_at"] = base + timedelta(seconds=i * 120, microseconds=123456)
+        docs.append(doc)
+
+    phrases.insert_phrases(docs)
+    # A retried batch is recognised by phrase id, even after a phrase in it
+    # was marked processed
+    phrases.mark_phrases_processed([docs[2]["phrase_id"]], meeting_id)
+    phrases.insert_phrases(docs[2:4])
+    buckets = list(get_db()[phrase_buckets.BUCKETS_COLLECTION].find({"meeting_id": meeting_id}))
+    assert [len(b["phrases"]) for b in sorted(buckets, key=lambda b: b["bucket_start"])] == [3, 2, 1]
+    assert phrase_buckets.count_phrases(meeting_id) == 6
+
+
+def test_bucketed_transcript_pages_resume_and_range(bucketed):
+    meeting_id = create_meeting("Bucketed transcript")
+    base = datetime(2026, 1, 1, 12, 4, 58)
+    docs = []
+    for i in range(7):
+        doc = phrases.build_phrase_doc(meeting_id, f"phrase {i}")
+        # Pairs share a timestamp, and the run straddles a bucket boundary
+        doc["created_at"] = base + timedelta(seconds=i // 2)
+        docs.append(doc)
+    phrases.insert_phrases(docs)
+
+    first = list(phrases.iter_transcript(meeting_id, limit=3))
+    assert set(first[0]) == {"phrase_id", "phrase", "created_at", "resume"}
+    rest = list(phrases.iter_transcript(meeting_id, resume_token=first[-1]["resume"]))
+    assert [r["phrase"] for r in first + rest] == [f"phrase {i}" for i in range(7)]
+
+    ranged = list(phrases.iter_transcript(meeting_id, start=base + timedelta(seconds=1),
+                                          end=base + timedelta(seconds=3)))
+    assert [r["phrase"] for r in ranged] == ["phrase 2", "phrase 3", "phrase 4", "phrase 5"]
+
+
+def test_migrate_copies_phrases_and_drops_source(monkeypatch):
+    from apps.services.orchestrator.db.migrate_phrases import migrate
+    meeting_id = create_meeting("Migrated meeting")
+    ids = [phrases.create_phrase(meeting_id, f"phrase {i}") for i in range(5)]
+    phrases.mark_phrases_processed(ids[:2])
+
+    assert migrate([meeting_id], batch_size=2) == 5
+    # Re-running after an interruption adds nothing
+    assert migrate([meeting_id], batch_size=2, drop_source=True) == 5
+    assert get_db()["phrases"].count_documents({"meeting_id": meeting_id}) == 0
+
+    monkeypatch.setattr(phrases, "PHRASE_STORAGE", "buckets")
+    assert [str(p.phrase_id) for p in phrases.get_unprocessed_phrases(meeting_id)] == ids[2:]
+    assert [r["phrase"] for r in phrases.iter_transcript(meeting_id)] == [f"phrase {i}" for i in range(5)]
+    assert phrases.delete_phrases_by_meeting(meeting_id) == 5
@@ -0,0 +1,69 @@
+import asyncio
+
+from apps.services.orchestrator.db.meetings import create_meeting
+from apps.services.orchestrator.db.phrases import get_unprocessed_phrases
+from apps.services.orchestrator.phrase_writer import PhraseWriter
+
+
+def test_phrase_writer_batches_in_order_and_drains_on_stop():
+    meeting_id = create_meeting("Write-behind meeting")
+
+    async def run():
+        writer = PhraseWriter(batch_size=3, flush_interval=60)
+        await writer.start()
+        for i in range(7):
+            assert writer.enqueue(meeting_id, f"phrase {i}")
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(run())
+
+    assert stats["written"] == 7
+    assert stats["batches"] == 3
+    assert stats["pending"] == 0
+    assert [p.phrase for p in get_unprocessed_phrases(meeting_id)] == [f"phrase {i}" for i in range(7)]
+
+
+def test_phrase_writer_reports_overflow():
+    meeting_id = create_meeting("Overflow meeting")
+    writer = PhraseWriter(max_pending_bytes=600)
+
+    assert writer.enqueue(meeting_id, "first")
+    assert writer.enqueue(meeting_id, "second")
+    assert not writer.enqueue(meeting_id, "third")
+    assert writer.stats()["dropped"] == 1
+
+
+def test_phrase_writer_sets_aside_a_phrase_that_keeps_failing(monkeypatch):
+    from pymongo.errors import BulkWriteError
+    from apps.services.orchestrator import phrase_writer as module
+
+    meeting_id = create_meeting("Bad phrase meeting")
+    stored = []
+
+    async def insert(docs):
+        for i, doc in enumerate(docs):
+            if doc["phrase"] == "bad":
+                raise BulkWriteError({"nInserted": i, "writeErrors": [{"index": i, "code": 121}]})
+            stored.append(doc["phrase"])
+
+    monkeypatch.setattr(module, "insert_phrases_async", insert)
+
+    async def run():
+        writer = PhraseWriter(batch_size=10, flush_interval=0.01, retry_delay=0.001, max_attempts=3)
+        await writer.start()
+        for phrase in ("one", "bad", "two"):
+            writer.enqueue(meeting_id, phrase)
+        for _ in range(200):
+            if not writer.stats()["pending"]:
+                break
+            await asyncio.sleep(0.01)
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(run())
+
+    assert stored == ["one", "two"]
+    assert stats["set_aside"] == 1
+    assert stats["failures"] == 3
+    assert stats["pending"] == 0
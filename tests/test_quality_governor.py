@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from apps.services.asr.quality_governor import DEFAULT_TIERS, QualityGovernor, parse_tiers
+from apps.services.asr.whisper_processor import WhisperProcessor
+
+
+def test_governor_steps_down_one_tier_per_hold():
+    changes = []
+    governor = QualityGovernor(degrade_depth=4, degrade_hold=5, on_change=changes.append)
+
+    assert governor.update(depth=6, rtf=0.3, now=0).name == "fast"
+    # Still overloaded, but the last step has not had time to take effect
+    assert governor.update(depth=6, rtf=0.3, now=2).name == "fast"
+    assert governor.update(depth=2, rtf=0.9, now=5).name == "lean"
+    # Already at the last tier
+    assert governor.update(depth=9, rtf=0.9, now=10).name == "lean"
+    assert [t.name for t in changes] == ["fast", "lean"]
+
+
+def test_governor_restores_only_after_sustained_calm():
+    governor = QualityGovernor(degrade_depth=4, restore_depth=1, restore_hold=30)
+    governor.update(depth=8, rtf=0.5, now=0)
+    assert governor.level == 1
+
+    # Between the thresholds: neither degrades nor counts as calm
+    governor.update(depth=2, rtf=0.5, now=40)
+    assert governor.update(depth=0, rtf=0.2, now=41).name == "fast"
+    assert governor.update(depth=0, rtf=0.2, now=60).name == "fast"
+    governor.update(depth=3, rtf=0.2, now=65)
+    assert governor.update(depth=0, rtf=0.2, now=80).name == "fast"
+    assert governor.update(depth=0, rtf=0.2, now=110).name == "full"
+    assert governor.stats() == {"tier": "full", "level": 0, "degrades": 1, "restores": 1}
+
+
+def test_parse_tiers():
+    assert parse_tiers(None) == list(DEFAULT_TIERS)
+    tiers = parse_tiers("best:5:1, quick:1:0:tiny.en")
+    assert [(t.name, t.beam_size, t.word_timestamps, t.model) for t in tiers] == [
+        ("best", 5, True, None), ("quick", 1, False, "tiny.en")]
+    with pytest.raises(ValueError):
+        parse_tiers("broken:1")
+
+
+def test_transcribe_uses_current_tier(tmp_path):
+    calls = []
+
+    class FakeModel:
+        def __init__(self, name):
+            self.name = name
+
+        def transcribe(self, audio, **kwargs):
+            calls.append((self.name, kwargs["beam_size"], kwargs["word_timestamps"]))
+            return iter([SimpleNamespace(text="hello there")]), SimpleNamespace(language_probability=0.9)
+
+    wp = WhisperProcessor(transcripts_dir=str(tmp_path), tiers=DEFAULT_TIERS)
+    wp.model = FakeModel("base.en")
+    audio = np.ones(16000, dtype=np.float32) * 0.1
+
+    assert wp.transcribe_audio(audio, "m")["quality"] == "full"
+    wp.set_tier(DEFAULT_TIERS[2])
+    assert wp.transcribe_audio(audio, "m")["quality"] == "lean"
+    assert calls == [("base.en", 3, True), ("base.en", 1, False)]
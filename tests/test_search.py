@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from apps.services.orchestrator.search_index import LiveSearchIndex, make_snippet
+
+
+def build_index(**kwargs):
+    index = LiveSearchIndex(**kwargs)
+    start = datetime(2026, 1, 1, 9, 0, 0)
+    phrases = {
+        "m1": ["The budget review is on Thursday",
+               "Budget budget budget, we keep talking about the budget",
+               "Lunch is at noon"],
+        "m2": ["The quarterly budget was approved",
+               "Hiring plan for the platform team"],
+    }
+    for meeting_id, texts in phrases.items():
+        for i, text in enumerate(texts):
+            index.add(meeting_id, f"{meeting_id}-{i}", text, start + timedelta(seconds=i))
+    return index
+
+
+def test_live_index_ranks_across_and_within_meetings():
+    index = build_index()
+    results = index.search("budget review")
+    assert results[0]["phrase_id"] == "m1-0"
+    assert {r["meeting_id"] for r in results} == {"m1", "m2"}
+    assert all("budget" in r["text"].lower() for r in results)
+
+    assert [r["phrase_id"] for r in index.search("budget", meeting_id="m2")] == ["m2-0"]
+    assert index.search("nothing matches") == []
+
+
+def test_dropping_and_evicting_meetings_keeps_stats_consistent():
+    index = build_index(max_phrases=4)
+    # Five phrases were added with room for four; the oldest meeting went
+    assert not index.has("m1") and index.has("m2")
+    assert index.stats()["phrases"] == 2 and index.evictions == 1
+
+    index.drop("m2")
+    assert index.stats() == {"meetings": 0, "phrases": 0, "terms": 0, "evictions": 1}
+
+
+def test_snippets_center_on_the_match():
+    text = "word " * 60 + "needle in the haystack " + "word " * 60
+    snippet = make_snippet(text, ["needle"], width=60)
+    assert "needle" in snippet and snippet.startswith("…") and snippet.endswith("…")
+    assert make_snippet("short phrase", ["phrase"]) == "short phrase"
+
+
+def test_search_endpoint_merges_live_and_archived_results(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parent.parent / "apps/services/orchestrator"))
+    from routes import search as search_routes
+
+    index = build_index()
+    monkeypatch.setattr(search_routes, "live_search", index)
+    calls = []
+
+    def fake_text_search(query, meeting_id, exclude, limit):
+        calls.append((query, meeting_id, sorted(exclude)))
+        return [{"meeting_id": "old", "phrase_id": "old-0", "phrase": "Old budget notes",
+                 "created_at": datetime(2025, 1, 1), "score": 1.5}]
+    monkeypatch.setattr(search_routes, "search_phrases", fake_text_search)
+
+    client = TestClient(FastAPI())
+    client.app.include_router(search_routes.router)
+
+    body = client.get("/search", params={"q": "budget"}).json()
+    assert calls == [("budget", None, ["m1", "m2"])]
+    assert {r["source"] for r in body["results"]} == {"live", "archive"}
+
+    calls.clear()
+    body = client.get("/search", params={"q": "budget", "meeting_id": "m2"}).json()
+    assert calls == []
+    assert [r["phrase_id"] for r in body["results"]] == ["m2-0"]
+
+    body = client.get("/search", params={"q": "budget", "meeting_id": "old"}).json()
+    assert [r["source"] for r in body["results"]] == ["archive"]
+
+
+def test_first_client_backfill_indexes_stored_phrases_in_batches(monkeypatch):
+    import asyncio
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parent.parent / "apps/services/orchestrator"))
+    import apps.services.orchestrator.main as orchestrator
+    from apps.services.orchestrator.db.meetings import create_meeting
+    from apps.services.orchestrator.db.phrases import create_phrase
+
+    meeting_id = create_meeting("Backfilled meeting")
+    for i in range(7):
+        create_phrase(meeting_id, f"budget item {i}")
+    index = LiveSearchIndex()
+    batches = []
+    backfill = index.backfill
+    monkeypatch.setattr(index, "backfill", lambda m, rows: (batches.append(len(rows)), backfill(m, rows)))
+    monkeypatch.setattr(orchestrator, "live_search", index)
+
+    asyncio.run(orchestrator.backfill_search(meeting_id, batch_size=3))
+    assert batches == [3, 3, 1]
+    assert index.has(meeting_id)
+    assert len(index.search("budget", meeting_id=meeting_id)) == 7
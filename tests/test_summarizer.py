@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from apps.services.orchestrator.db.meetings import create_meeting
+from apps.services.orchestrator.db.phrases import build_phrase_doc, get_unprocessed_phrases, insert_phrases
+from apps.services.orchestrator.db.summaries import get_summary
+from apps.services.orchestrator.summarizer import RollingSummary, SummaryWorker
+
+PHRASES = [
+    "Good morning everyone, thanks for joining.",
+    "The database migration is blocking the release this week.",
+    "Can someone grab coffee?",
+    "We should split the database migration into two smaller steps.",
+    "The release notes still need review.",
+    "Let's move the release to Friday once the database migration lands.",
+]
+
+
+def insert(meeting_id, texts, start):
+    docs = []
+    for i, text in enumerate(texts):
+        doc = build_phrase_doc(meeting_id, text)
+        doc["created_at"] = start + timedelta(seconds=i)
+        docs.append(doc)
+    insert_phrases(docs)
+
+
+def test_rolling_summary_prefers_recurring_topics():
+    rows = [{"phrase": text, "created_at": i} for i, text in enumerate(PHRASES)]
+    summary = RollingSummary(max_sentences=2)
+    summary.add(rows[:3])
+    summary.add(rows[3:])
+
+    texts = [s["text"] for s in summary.sentences()]
+    assert all("database migration" in t for t in texts)
+    # Spoken order, not score order
+    assert [s["created_at"] for s in summary.sentences()] == sorted(s["created_at"] for s in summary.sentences())
+
+    restored = RollingSummary(summary.state(), max_sentences=2)
+    assert restored.text() == summary.text()
+    assert restored.phrases_seen == len(PHRASES)
+
+
+def test_worker_folds_batches_from_watermark():
+    meeting_id = create_meeting("Summarized")
+    start = datetime(2026, 1, 1, 9, 0, 0)
+    insert(meeting_id, PHRASES[:4], start)
+
+    worker = SummaryWorker(batch_size=3, active_meetings=lambda: [meeting_id])
+    asyncio.run(worker.run_round())
+    assert get_summary(meeting_id)["state"]["phrases_seen"] == 3
+    assert len(get_unprocessed_phrases(meeting_id)) == 1
+
+    insert(meeting_id, PHRASES[4:], start + timedelta(seconds=10))
+    asyncio.run(worker.run_round())
+    asyncio.run(worker.run_round())
+
+    doc = get_summary(meeting_id)
+    assert doc["state"]["phrases_seen"] == len(PHRASES)
+    assert "database migration" in doc["summary"]
+    assert get_unprocessed_phrases(meeting_id) == []
+    assert worker.stats()["phrases"] == len(PHRASES)
+
+
+def test_worker_yields_while_phrase_writes_are_backed_up():
+    meeting_id = create_meeting("Busy")
+    insert(meeting_id, PHRASES, datetime(2026, 1, 1, 9, 0, 0))
+
+    worker = SummaryWorker(active_meetings=lambda: [meeting_id], busy=lambda: True)
+    asyncio.run(worker.run_round())
+    assert worker.stats()["skipped_rounds"] == 1
+    assert get_summary(meeting_id) is None
+
+    worker.busy = lambda: False
+    worker.active_meetings = lambda: []
+    worker.finish(meeting_id)
+    asyncio.run(worker.run_round())
+    assert get_summary(meeting_id)["state"]["phrases_seen"] == len(PHRASES)
+    assert worker.stats()["finishing"] == 0
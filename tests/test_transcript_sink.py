@@ -0,0 +1,37 @@
+from apps.services.asr.transcript_sink import TranscriptSink
+
+
+def test_sink_buffers_until_flush(tmp_path):
+    sink = TranscriptSink(str(tmp_path), flush_interval=60, flush_bytes=1 << 20)
+    sink.write("m1", "[00:00:01] Hello.\n")
+    sink.write("m1", "[00:00:02] World.\n")
+    assert sink.flush(timeout=5)
+
+    with open(sink.path_for("m1"), encoding="utf-8") as f:
+        assert f.read() == "[00:00:01] Hello.\n[00:00:02] World.\n"
+    sink.shutdown(timeout=5)
+
+
+def test_sink_bounds_open_handles(tmp_path):
+    sink = TranscriptSink(str(tmp_path), max_open=2, flush_interval=60, flush_bytes=1)
+    for i in range(5):
+        sink.write(f"m{i}", f"line {i}\n")
+    sink.write("m0", "again\n")
+    assert sink.flush(timeout=5)
+
+    assert sink.open_handles() == 2
+    with open(sink.path_for("m0"), encoding="utf-8") as f:
+        assert f.read() == "line 0\nagain\n"
+    sink.shutdown(timeout=5)
+
+
+def test_sink_shutdown_flushes_everything(tmp_path):
+    sink = TranscriptSink(str(tmp_path), flush_interval=60, flush_bytes=1 << 20)
+    sink.write("m1", "pending\n")
+    sink.close_meeting("m1")
+    sink.write("m2", "also pending\n")
+    sink.shutdown(timeout=5)
+
+    assert (tmp_path / "m1.txt").read_text(encoding="utf-8") == "pending\n"
+    assert (tmp_path / "m2.txt").read_text(encoding="utf-8") == "also pending\n"
+    assert sink.open_handles() == 0
@@ -17,6 +17,7 @@ def test_save_and_load_transcript(tmp_path):
     meeting_id = "meeting-1"
     now = datetime.now(timezone.utc)
     wp.save_to_file(meeting_id, "Test sentence", now)
+    assert wp.transcript_sink.flush(timeout=5)
 
     path = Path(wp.get_transcript_path(meeting_id))
     assert path.exists()
@@ -24,3 +25,95 @@ def test_save_and_load_transcript(tmp_path):
     with open(path, "r", encoding="utf-8") as f:
         content = f.read()
     assert "Test sentence" in content
+
+
+def test_transcribe_batch_routes_segments_to_meetings(tmp_path):
+    import numpy as np
+    from types import SimpleNamespace
+
+    class FakeBatchedModel:
+        def transcribe(self, audio, clip_timestamps, **kwargs):
+            segments = [SimpleNamespace(start=clip["start"], text=f"clip starting {clip['start']:.1f}")
+                        for clip in clip_timestamps]
+            return iter(segments), SimpleNamespace(language_probability=0.9)
+
+    wp = WhisperProcessor(model_name="base.en", transcripts_dir=str(tmp_path))
+    wp.model = object()
+    wp.batched_model = FakeBatchedModel()
+
+    results = wp.transcribe_batch([
+        (np.zeros(16000, dtype=np.float32), "meeting-a"),
+        (np.zeros(8000, dtype=np.float32), "meeting-b"),
+    ])
+
+    assert results[0]["text"] == "clip starting 0.0."
+    assert results[1]["text"] == "clip starting 1.0."
+    assert results[1]["audio_duration"] == 0.5
+
+
+def test_runtime_options_default_to_int8_split_across_replicas(tmp_path, monkeypatch):
+    import apps.services.asr.whisper_processor as wp_module
+    monkeypatch.setattr(wp_module, "detect_device", lambda: "cpu")
+    monkeypatch.setattr(wp_module, "available_cores", lambda: 8)
+
+    wp = WhisperProcessor(transcripts_dir=str(tmp_path), replicas=2)
+    options = wp._runtime_options()
+
+    assert options["device"] == "cpu"
+    assert options["compute_type"] == "int8"
+    assert options["cpu_threads"] == 4
+
+    wp = WhisperProcessor(transcripts_dir=str(tmp_path), compute_type="int8_float32", cpu_threads=3)
+    options = wp._runtime_options()
+    assert options["compute_type"] == "int8_float32"
+    assert options["cpu_threads"] == 3
+
+
+def test_drop_overlap_removes_repeated_leading_words():
+    from apps.services.asr.whisper_processor import drop_overlap
+
+    assert drop_overlap("We should ship the release on Friday.", "Friday, and then rest.") == "and then rest."
+    assert drop_overlap("So the plan is.", "the plan is to wait.") == "to wait."
+    assert drop_overlap("Nothing in common.", "Entirely new words.") == "Entirely new words."
+    assert drop_overlap("", "Hello there.") == "Hello there."
+
+
+def test_partials_only_borrow_a_spare_replica(tmp_path):
+    import queue
+    import threading
+    import numpy as np
+    from types import SimpleNamespace
+    from apps.services.asr.whisper_processor import _Replica
+
+    class FakeModel:
+        def __init__(self):
+            self.calls = 0
+
+        def transcribe(self, audio, **kwargs):
+            self.calls += 1
+            word = SimpleNamespace(word=" hello", start=0.0, end=0.5)
+            return iter([SimpleNamespace(text="hello", words=[word])]), \
+                SimpleNamespace(language_probability=0.9)
+
+    wp = WhisperProcessor(model_name="base.en", transcripts_dir=str(tmp_path), internal_vad=False)
+    models = [FakeModel(), FakeModel()]
+    wp.model = models[0]
+    wp._pool = queue.Queue()
+    wp._pool.put(_Replica(models[0], None))
+    audio = np.zeros(16000, dtype=np.float32)
+
+    # One replica: it is kept for finals and the partial is skipped
+    assert wp.transcribe_words(audio) is None
+    assert models[0].calls == 0
+    assert wp.transcribe_audio(audio, "meeting-1")["text"] == "hello."
+
+    # Two replicas: a partial takes one and a final still gets the other at once
+    wp._pool.put(_Replica(models[1], None))
+    assert wp.transcribe_words(audio) == [(" hello", 0.0, 0.5)]
+    with wp._replica(spare=True) as held:
+        assert held is not None
+        assert wp.transcribe_words(audio) is None
+        done = threading.Event()
+        threading.Thread(target=lambda: (wp.transcribe_audio(audio, "meeting-1"), done.set())).start()
+        assert done.wait(2)
+    assert wp._pool.qsize() == 2